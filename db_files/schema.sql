@@ -229,6 +229,27 @@ ALTER SEQUENCE "public"."enneagrams_id_seq" OWNED BY "public"."enneagrams"."id";
 
 
 
+CREATE TABLE IF NOT EXISTS "public"."event_catalog" (
+    "id" character varying(40) NOT NULL,
+    "location_key" "text" NOT NULL,
+    "title" "text" NOT NULL,
+    "description" "text",
+    "venue" "text",
+    "start_time" timestamp without time zone NOT NULL,
+    "event_type" "text",
+    "source" "text" NOT NULL,
+    "url" "text",
+    "is_free" boolean,
+    "payload" "jsonb" DEFAULT '{}'::"jsonb" NOT NULL,
+    "search_vector" "tsvector" GENERATED ALWAYS AS ("to_tsvector"('english'::"regconfig", ((((COALESCE("title", ''::"text") || ' '::"text") || COALESCE("description", ''::"text")) || ' '::"text") || COALESCE("event_type", ''::"text")))) STORED,
+    "first_seen_at" timestamp with time zone DEFAULT "now"(),
+    "last_seen_at" timestamp with time zone DEFAULT "now"() NOT NULL
+);
+
+
+ALTER TABLE "public"."event_catalog" OWNER TO "postgres";
+
+
 CREATE TABLE IF NOT EXISTS "public"."events" (
     "id" "uuid" DEFAULT "gen_random_uuid"() NOT NULL,
     "user_id" "uuid" NOT NULL,
@@ -452,6 +473,11 @@ ALTER TABLE ONLY "public"."enneagrams"
 
 
 
+ALTER TABLE ONLY "public"."event_catalog"
+    ADD CONSTRAINT "event_catalog_pkey" PRIMARY KEY ("id");
+
+
+
 ALTER TABLE ONLY "public"."events"
     ADD CONSTRAINT "events_pkey" PRIMARY KEY ("id");
 
@@ -537,6 +563,18 @@ ALTER TABLE ONLY "public"."user_recommendations"
 
 
 
+CREATE INDEX "ix_event_catalog_location_start" ON "public"."event_catalog" USING "btree" ("location_key", "start_time");
+
+
+
+CREATE INDEX "ix_event_catalog_search" ON "public"."event_catalog" USING "gin" ("search_vector");
+
+
+
+CREATE INDEX "ix_event_catalog_start" ON "public"."event_catalog" USING "btree" ("start_time");
+
+
+
 CREATE INDEX "messages_room_id_idx" ON "public"."messages" USING "btree" ("room_id");
 
 
@@ -684,6 +722,9 @@ ALTER TABLE "public"."cache_locks" ENABLE ROW LEVEL SECURITY;
 ALTER TABLE "public"."enneagrams" ENABLE ROW LEVEL SECURITY;
 
 
+ALTER TABLE "public"."event_catalog" ENABLE ROW LEVEL SECURITY;
+
+
 ALTER TABLE "public"."events" ENABLE ROW LEVEL SECURITY;
 
 
@@ -1294,6 +1335,10 @@ GRANT ALL ON SEQUENCE "public"."enneagrams_id_seq" TO "service_role";
 
 
 
+GRANT ALL ON TABLE "public"."event_catalog" TO "service_role";
+
+
+
 GRANT ALL ON TABLE "public"."events" TO "anon";
 GRANT ALL ON TABLE "public"."events" TO "authenticated";
 GRANT ALL ON TABLE "public"."events" TO "service_role";
@@ -0,0 +1,29 @@
+-- Catalog of external (provider and scraped) events, filled by the backend's
+-- scheduled event ingestion (python-backend/app/models/event_catalog.py)
+CREATE TABLE IF NOT EXISTS public.event_catalog (
+  id VARCHAR(40) NOT NULL PRIMARY KEY,
+  location_key TEXT NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  venue TEXT,
+  start_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+  event_type TEXT,
+  source TEXT NOT NULL,
+  url TEXT,
+  is_free BOOLEAN,
+  payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(event_type, ''))
+  ) STORED,
+  first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+  last_seen_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+-- Reads are by location and start time; expiry is by start time
+CREATE INDEX IF NOT EXISTS ix_event_catalog_location_start ON public.event_catalog (location_key, start_time);
+CREATE INDEX IF NOT EXISTS ix_event_catalog_start ON public.event_catalog (start_time);
+CREATE INDEX IF NOT EXISTS ix_event_catalog_search ON public.event_catalog USING GIN (search_vector);
+
+-- Only the backend (service role) reads and writes the catalog
+ALTER TABLE public.event_catalog ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON TABLE public.event_catalog TO service_role;
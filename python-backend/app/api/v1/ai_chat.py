@@ -2,15 +2,47 @@
 AI Chat API endpoints with enhanced Lifestring features.
 """
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+import asyncio
 import json
 
 from app.core.database import get_db, get_db_optional
 from app.core.config import settings
+from app.core.cancellation import run_until_disconnect, run_sync_to_completion, ClientDisconnected, cancellation_stats
+from app.core.deadline import Deadline, deadline_stats
+from app.core.admission import (
+    Priority, AdmissionRejected, set_request_priority, admission_priority, admission_controller
+)
+from app.core.database import apply_statement_timeout
+from app.core.rate_limit import rate_limit_stats
+from app.core.degradation import degradation_controller
+from app.services.speculative_prefetch import speculative_prefetcher, prefetch_stats
+from app.services.fast_path import fast_path
+from app.services.message_matcher import match_message
+from app.services import prompt_templates
+from app.services.prompt_templates import (
+    ENHANCED_PROMPT,
+    ENHANCED_PROMPT_WITH_FUNCTIONS,
+    LIFESTRING_CHAT_PROMPT,
+    PUBLIC_GUEST_PROMPT,
+    PUBLIC_PROFILE_PROMPT,
+    PromptTemplate,
+    timezone_reference_section,
+)
+from app.services.tool_cache import tool_result_cache
+from app.services.event_dedup import event_deduplicator
+from app.services.event_ingestion import event_ingestion
+from app.services.gazetteer import gazetteer
+from app.services.html_scraper import html_scraper
+from app.services.interest_scorer import interest_scorer
+from app.services.sports_scoreboard import sports_scoreboard
+from app.services.weather_cache import weather_cache
+from app.services.tool_registry import ToolContext
+from app.services.agent_loop import agent_loop, agent_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -130,94 +162,23 @@ async def search_real_time_events(user_message: str, user_profile: dict = None)
     """Search for real-time events based on user query and interests."""
     try:
         # Check if user is asking about real-time events
-        real_time_keywords = [
-            # Sports events
-            'nfl games', 'nba games', 'mlb games', 'nhl games',
-            'football games', 'basketball games', 'baseball games', 'hockey games',
-            'games today', 'games tonight', 'games this week',
-            'sports schedule', 'game schedule',
-            # Local events
-            'concerts', 'shows', 'events', 'what\'s happening',
-            'events today', 'events tonight', 'events this week',
-            'local events', 'things to do', 'activities',
-            'festivals', 'farmers market', 'art shows',
-            'live music', 'theater', 'comedy shows',
-            'community events', 'meetups', 'workshops',
-            'what can i do', 'weekend',
-            # Time-specific queries that should prioritize real events
-            'tomorrow', 'today', 'tonight', 'this evening',
-            'next week', 'this month', 'upcoming',
-            'this weekend', 'weekend'
-        ]
-
-        # Time-specific queries that should ONLY show real-time events (no joins)
-        real_time_only_keywords = [
-            'tomorrow', 'today', 'tonight', 'this evening',
-            'this weekend', 'weekend', 'next week', 'this month',
-            'what can i do tomorrow', 'what can i do today',
-            'what can i do this weekend', 'what\'s happening tomorrow',
-            'what\'s happening today', 'what\'s happening this weekend'
-        ]
-
-        message_lower = user_message.lower()
-        is_real_time_query = any(keyword in message_lower for keyword in real_time_keywords)
-
-        if not is_real_time_query:
+        match = match_message(user_message)
+        if not match.has('realtime_events'):
             return []
 
-        # Extract location if mentioned
-        location = None
-        location_keywords = ['in ', 'at ', 'near ']
-        for keyword in location_keywords:
-            if keyword in message_lower:
-                parts = message_lower.split(keyword)
-                if len(parts) > 1:
-                    # Extract potential location (next few words)
-                    location_part = parts[1].split()[:3]  # Take up to 3 words
-                    location = ' '.join(location_part).strip()
-                    break
-
         # Search for events using real-time service
         events = []
 
-        # Extract location from message or use default
-        location = 'Salt Lake City'  # Default location
-        location_keywords = {
-            'salt lake': 'Salt Lake City',
-            'utah': 'Salt Lake City',
-            'slc': 'Salt Lake City',
-            'san francisco': 'San Francisco',
-            'sf': 'San Francisco',
-            'bay area': 'San Francisco',
-            'berkeley': 'Berkeley',
-            'new york': 'New York',
-            'nyc': 'New York',
-            'los angeles': 'Los Angeles',
-            'la': 'Los Angeles',
-            'chicago': 'Chicago',
-            'denver': 'Denver'
-        }
-
-        for keyword, loc in location_keywords.items():
-            if keyword in message_lower:
-                location = loc
-                break
+        # Location mentioned in the message, or the default
+        location = match.city or 'Salt Lake City'
 
         from app.services.realtime_service import realtime_service
 
         # 1. Check for sports events
-        sport_type = None
-        if 'nfl' in message_lower or 'football' in message_lower:
-            sport_type = 'nfl'
-        elif 'nba' in message_lower or 'basketball' in message_lower:
-            sport_type = 'nba'
-        elif 'mlb' in message_lower or 'baseball' in message_lower:
-            sport_type = 'mlb'
-        elif 'nhl' in message_lower or 'hockey' in message_lower:
-            sport_type = 'nhl'
+        sport_type = match.sport
 
         # Get sports events if requested
-        if sport_type or any(keyword in message_lower for keyword in ['games', 'sports', 'schedule']):
+        if sport_type or match.has('sports_generic'):
             try:
                 sports_events = await realtime_service.get_sports_events(sport_type, limit=5)
                 events.extend(sports_events)
@@ -225,14 +186,7 @@ async def search_real_time_events(user_message: str, user_profile: dict = None)
                 print(f"Error fetching sports events: {e}")
 
         # 2. Check for local events (concerts, shows, festivals, etc.)
-        local_event_keywords = [
-            'concerts', 'shows', 'events', 'festivals', 'live music',
-            'theater', 'comedy', 'art shows', 'farmers market',
-            'community events', 'meetups', 'workshops', 'things to do',
-            'activities', 'what\'s happening', 'what can i do', 'weekend'
-        ]
-
-        if any(keyword in message_lower for keyword in local_event_keywords):
+        if match.has('local_events'):
             try:
                 # Extract user interests from profile
                 user_interests = []
@@ -322,8 +276,7 @@ def extract_joins_from_response(response_text: str, user_message: str, user_prof
         return []
 
     # Check if the response mentions specific activities that could be joins
-    message_lower = user_message.lower()
-    response_lower = response_text.lower()
+    match = match_message(user_message)
 
     # Sample joins data - Interest-based groups with locations
     sample_joins = {
@@ -586,17 +539,7 @@ def extract_joins_from_response(response_text: str, user_message: str, user_prof
     }
 
     # Only suggest joins if user explicitly asks for group activities or events
-    group_activity_keywords = [
-        'group', 'join', 'activity', 'event', 'meetup', 'together',
-        'group activity', 'things to do', 'activities', 'events near me',
-        'what can i do', 'looking for', 'want to do', 'interested in doing',
-        'learn', 'meet', 'connect', 'find people', 'enthusiasts', 'community',
-        'club', 'groups', 'sailing', 'hiking', 'climbing', 'boating', 'photography',
-        'people who like', 'people who enjoy', 'others who', 'someone who'
-    ]
-
-    # Check if user is asking for group activities
-    is_group_activity_request = any(keyword in message_lower for keyword in group_activity_keywords)
+    is_group_activity_request = match.has('group_activity')
 
     if not is_group_activity_request:
         return joins  # Return empty list if not asking for group activities
@@ -615,44 +558,21 @@ def extract_joins_from_response(response_text: str, user_message: str, user_prof
     # If no user location available, try to extract from message context or default
     if not user_location:
         # Check if location is mentioned in the message
-        location_keywords = {
-            'salt lake': 'salt lake city',
-            'utah': 'salt lake city',
-            'slc': 'salt lake city',
-            'san francisco': 'san francisco',
-            'sf': 'san francisco',
-            'bay area': 'san francisco'
-        }
-
-        for keyword, location in location_keywords.items():
-            if keyword in message_lower:
-                user_location = location
-                break
+        if match.city:
+            user_location = match.city.lower()
 
     # Determine if user is in Salt Lake City area (check both message and profile location)
     is_salt_lake = (
-        any(keyword in message_lower for keyword in ['salt lake', 'slc', 'utah', 'antelope island']) or
+        match.has('salt_lake') or
         (user_location and any(keyword in user_location for keyword in ['salt lake', 'utah', 'slc']))
     )
 
-    # Check for activity keywords and add location-appropriate joins
-    if any(word in message_lower for word in ['hiking', 'hike', 'trail', 'mountain', 'nature', 'outdoor']):
-        if is_salt_lake:
-            joins.append(salt_lake_joins['hiking_slc'])
-        else:
-            joins.append(sample_joins['hiking_bay_area'])
-
-    if any(word in message_lower for word in ['photography', 'photo', 'camera', 'picture']):
-        joins.append(sample_joins['photography_sf'])
-
-    if any(word in message_lower for word in ['boating', 'boat', 'sailing', 'sail', 'marina', 'water sports']):
-        joins.append(sample_joins['boating_peninsula'])
-
-    if any(word in message_lower for word in ['climbing', 'climb', 'rock', 'boulder']):
-        if is_salt_lake:
-            joins.append(salt_lake_joins['climbing_slc'])
-        else:
-            joins.append(sample_joins['climbing_oakland'])
+    # Rank location-appropriate joins against the activities the user mentioned
+    if is_salt_lake:
+        candidates = list(salt_lake_joins.values()) + [sample_joins['photography_sf'], sample_joins['boating_peninsula']]
+    else:
+        candidates = list(sample_joins.values())
+    joins = interest_scorer.rank_by_text(candidates, user_message, limit=4)
 
     # If no specific activity mentioned, suggest one popular group based on location
     if not joins:
@@ -709,6 +629,17 @@ class SimpleChatResponse(BaseModel):
     cost: float = 0.0  # Add cost field
 
 
+async def room_fast_reply(request: ChatRequest, current_user: User, db: Session):
+    """Fast-path answer for an AI chat room message, or None to ask the model."""
+    context = request.context or {}
+    return await fast_path.answer(
+        request.message,
+        profile_data=context.get('profile') or context.get('profile_data'),
+        user_id=str(current_user.user_id),
+        db=db
+    )
+
+
 @router.post("/ai/chat", response_model=ChatResponse)
 async def create_ai_chat(
     request: ChatRequest,
@@ -754,16 +685,21 @@ async def create_ai_chat(
     db.add(user_message)
     db.commit()
     
-    # Build context for AI
-    system_prompt = await build_system_prompt(current_user, request.context)
-    
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": request.message}
-    ]
-    
-    # Get AI response
-    ai_response = await openai_service.chat_completion(messages)
+    # Time, weather, profile, Joins and connections questions skip the model
+    fast_reply = await room_fast_reply(request, current_user, db)
+    if fast_reply:
+        ai_response = {"content": fast_reply.message, "tokens": 0, "cost": 0.0}
+    else:
+        # Build context for AI
+        system_prompt = await build_system_prompt(current_user, request.context)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": request.message}
+        ]
+
+        # Get AI response
+        ai_response = await openai_service.chat_completion(messages)
     
     # Save AI response
     ai_message = Message(
@@ -822,21 +758,26 @@ async def send_ai_chat_message(
     db.add(user_message)
     db.commit()
     
-    # Get conversation history
-    history = db.query(Message).filter(
-        Message.room_id == room_id
-    ).order_by(Message.created_at).limit(20).all()
-    
-    # Build messages for AI
-    system_prompt = await build_system_prompt(current_user, request.context)
-    messages = [{"role": "system", "content": system_prompt}]
-    
-    for msg in history:
-        role = "assistant" if msg.user_id == settings.AI_BOT_USER_ID else "user"
-        messages.append({"role": role, "content": msg.content})
-    
-    # Get AI response
-    ai_response = await openai_service.chat_completion(messages)
+    # Time, weather, profile, Joins and connections questions skip the model
+    fast_reply = await room_fast_reply(request, current_user, db)
+    if fast_reply:
+        ai_response = {"content": fast_reply.message, "tokens": 0, "cost": 0.0}
+    else:
+        # Get conversation history
+        history = db.query(Message).filter(
+            Message.room_id == room_id
+        ).order_by(Message.created_at).limit(20).all()
+
+        # Build messages for AI
+        system_prompt = await build_system_prompt(current_user, request.context)
+        messages = [{"role": "system", "content": system_prompt}]
+
+        for msg in history:
+            role = "assistant" if msg.user_id == settings.AI_BOT_USER_ID else "user"
+            messages.append({"role": role, "content": msg.content})
+
+        # Get AI response
+        ai_response = await openai_service.chat_completion(messages)
     
     # Save AI response
     ai_message = Message(
@@ -858,6 +799,7 @@ async def send_ai_chat_message(
 async def stream_ai_chat_message(
     room_id: str,
     request: ChatRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -888,6 +830,17 @@ async def stream_ai_chat_message(
     db.add(user_message)
     db.commit()
     
+    # A fast-path answer is sent as a single chunk
+    fast_reply = await room_fast_reply(request, current_user, db)
+    if fast_reply:
+        db.add(Message(
+            room_id=room.id,
+            user_id=settings.AI_BOT_USER_ID,
+            content=fast_reply.message
+        ))
+        db.commit()
+        return StreamingResponse(iter([fast_reply.message]), media_type="text/event-stream")
+    
     # Get conversation history
     history = db.query(Message).filter(
         Message.room_id == room_id
@@ -904,9 +857,21 @@ async def stream_ai_chat_message(
     # Stream response
     async def generate():
         full_response = ""
-        async for chunk in openai_service.chat_completion_stream(messages):
-            full_response += chunk
-            yield chunk
+        stream = openai_service.chat_completion_stream(messages)
+        try:
+            async for chunk in stream:
+                if await http_request.is_disconnected():
+                    cancellation_stats.record("chat_stream")
+                    logger.info(f"Client disconnected from stream in room {room_id}, closing upstream")
+                    return
+                full_response += chunk
+                yield chunk
+        except asyncio.CancelledError:
+            cancellation_stats.record("chat_stream")
+            raise
+        finally:
+            # Closes the upstream OpenAI stream instead of draining it
+            await stream.aclose()
         
         # Save complete response
         ai_message = Message(
@@ -929,6 +894,7 @@ async def lifestring_ai_chat_public(
     """
     import logging
     logger = logging.getLogger(__name__)
+    set_request_priority(Priority.PUBLIC)
 
     try:
         from app.services.realtime_service import realtime_service
@@ -943,82 +909,26 @@ async def lifestring_ai_chat_public(
             profile_data = request.context.get('profile_data')
             logger.info(f"Profile data extracted from context: {profile_data}")
 
+        # Time, weather and profile questions are answered without a model call
+        fast_reply = await fast_path.answer(request.message, profile_data=profile_data)
+        if fast_reply:
+            return SimpleChatResponse(
+                message=fast_reply.message,
+                intent=fast_reply.intent,
+                confidence=fast_reply.confidence,
+                joins=[],
+                tokens=0,
+                cost=0.0
+            )
+
         if profile_data:
             logger.info(f"Using profile data: {profile_data}")
             logger.info(f"🔍 PROFILE DATA FOUND - WILL PROCESS WITH JOINS")
 
-            # Handle profile-specific queries directly
-            message_lower = request.message.lower()
-            if "passions" in message_lower or "interests" in message_lower or "hobbies" in message_lower:
-                interests = profile_data.get('interests', []) or []
-                passions = profile_data.get('passions', []) or []
-                hobbies = profile_data.get('hobbies', []) or []
-                bio = profile_data.get('bio', '') or ''
-
-                # If asking specifically about passions
-                if "passions" in message_lower:
-                    if passions:
-                        passions_text = ", ".join(passions)
-                        message = f"Based on your profile, your passions include: {passions_text}!"
-                        if bio:
-                            message += f" Your bio says: '{bio}'"
-                        message += " Would you like to explore these passions further or connect with others who share them?"
-                    else:
-                        message = "I don't see any passions listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return SimpleChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        joins=[],
-                        tokens=0,
-                        cost=0.0
-                    )
-
-                # If asking specifically about hobbies
-                elif "hobbies" in message_lower:
-                    if hobbies:
-                        hobbies_text = ", ".join(hobbies)
-                        message = f"Based on your profile, your hobbies include: {hobbies_text}."
-                    else:
-                        message = "I don't see any hobbies listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return SimpleChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        joins=[],
-                        tokens=0,
-                        cost=0.0
-                    )
-
-                # For interests query
-                else:
-                    all_interests = list(set(interests + passions))
-                    if all_interests:
-                        interests_text = ", ".join(all_interests)
-                        message = f"Based on your profile, I can see you're interested in: {interests_text}!"
-                        if bio:
-                            message += f" Your bio says: '{bio}'"
-                        message += " Would you like to explore these interests further or connect with others who share them?"
-                    else:
-                        message = "I don't see any specific interests listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return SimpleChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        joins=[],
-                        tokens=0,
-                        cost=0.0
-                    )
-
             # For other messages with profile data, use enhanced OpenAI with real-time capabilities
             import json
 
             # Build comprehensive personalized system prompt with current time/date
-            import datetime
-            import pytz
             from app.services.realtime_service import realtime_service
 
             # Get user's location from profile data for timezone detection
@@ -1028,16 +938,6 @@ async def lifestring_ai_chat_public(
 
             # Get current time in user's timezone
             time_info = await realtime_service.get_current_time(user_location)
-            current_time = time_info["current_time"]
-            current_date = time_info["current_date"]
-
-            # Also get times for major US timezones for reference
-            import pytz
-            utc_now = datetime.datetime.now(pytz.UTC)
-            pst_time = utc_now.astimezone(pytz.timezone('US/Pacific')).strftime("%I:%M %p")
-            mst_time = utc_now.astimezone(pytz.timezone('US/Mountain')).strftime("%I:%M %p")
-            cst_time = utc_now.astimezone(pytz.timezone('US/Central')).strftime("%I:%M %p")
-            est_time = utc_now.astimezone(pytz.timezone('US/Eastern')).strftime("%I:%M %p")
 
             # Extract potential joins from user message to include in system prompt
             logger.info(f"🔍 EXTRACTING JOINS FOR SYSTEM PROMPT")
@@ -1068,68 +968,6 @@ DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention t
             else:
                 logger.info(f"🔍 NO JOINS FOUND for message: {request.message}")
 
-            system_prompt = f"""You are Strings, Lifestring's AI assistant. You can answer any questions the user has naturally and conversationally.
-
-Current time: {current_time} on {current_date}.
-
-TIMEZONE REFERENCE (for location-specific time queries):
-- Pacific Time: {pst_time}
-- Mountain Time: {mst_time} (Utah, Colorado, etc.)
-- Central Time: {cst_time}
-- Eastern Time: {est_time}
-
-You are having a conversation with a user on Lifestring. Here's how Lifestring works:
-
-**YOU ARE STRINGS**: You are the AI that users chat with about what they want to do and who they want to meet.
-
-**JOINS**: These are specific events/activities with set times and locations that users can join. Joins are integrated directly into the main Strings interface - there is NO separate "Joins section". When users tell you what they want to do, recommend relevant Joins they can find in their main Strings feed.
-
-**CONNECTIONS**: This is how users find friends - they get recommended people based on interests, location, and age. When users want to meet people, direct them to check their Connections.
-
-**IMPORTANT UI STRUCTURE**:
-- Lifestring Joins (ongoing groups/communities) appear as interactive cards directly in the chat with clickable buttons
-- Real-time events (concerts, activities happening now) should be provided directly in your chat response with all details
-- NEVER mention "Strings feed", "main Strings interface", "Joins section", or any separate interface
-- NEVER mention "event cards", "cards appearing", or "look for cards" - just provide event information directly in your response
-- When suggesting Lifestring community groups, provide natural conversational responses and let the join cards appear automatically below your message
-
-**YOUR APPROACH**:
-1. Answer general questions naturally (weather, time, jokes, etc.) - but ONLY respond with time when specifically asked "what time is it"
-2. When users ask for group activities or events, provide natural conversational responses about what's available
-3. When users want to meet people or make friends, direct them to their Connections feature
-4. Have natural conversations about their interests and goals
-5. NEVER mention external platforms like Meetup, Facebook, etc.
-6. Focus on Lifestring's features: Joins for activities, Connections for meeting people
-7. NEVER use markdown formatting like **bold** or *italics* - use plain text only
-8. NEVER mention any separate interface - Lifestring joins appear directly in the chat as clickable cards, but real-time events should be provided directly in your response
-9. PRIORITIZE real-time events over static joins when users ask about specific times:
-   - "What can I do in Salt Lake tomorrow?" → suggest real-time events (museums, gardens, seasonal activities)
-   - "What can I do in Salt Lake this weekend?" → suggest both real-time events and recurring joins
-   - "I want to find hiking groups" → suggest static joins for ongoing activities
-10. ALWAYS match suggestions to the location mentioned in their message FIRST, then fall back to their profile location
-   - If they ask "What can I do in Utah?" → recommend Utah activities regardless of profile location
-   - If they ask "What can I do in San Francisco?" → recommend Bay Area activities regardless of profile location
-   - If no location mentioned in message → use their profile location
-
-**LOCATION DETECTION PRIORITY**:
-1. If user mentions "Utah", "Salt Lake", "SLC" in their message → recommend Utah activities
-2. If user mentions "San Francisco", "SF", "Bay Area", "Berkeley" in their message → recommend Bay Area activities
-3. If no location mentioned → use their profile location
-
-**IMPORTANT**: When users ask about groups or communities on Lifestring, you will be provided with specific join recommendations in the system prompt. Prioritize recommending these specific joins. However, when users ask about real-time events, activities, or things happening in specific locations, you can use your Google Search capabilities to provide current, accurate information about events, activities, and happenings in their requested location.
-
-**SMART CATEGORIZATION**: Automatically understand activity types from context:
-- Hiking, camping, surfing → Outdoor Adventures
-- Cooking, wine tasting, food tours → Culinary Experiences
-- Photography, art, music → Creative Activities
-- Volleyball, tennis, running → Active Sports
-- Book clubs, lectures, discussions → Intellectual Pursuits
-- Yoga, meditation, wellness → Wellness & Mindfulness
-- Parties, meetups, social events → Social Experiences
-- Gym, climbing, fitness classes → Fitness Challenges
-
-**REMEMBER**: You are Strings - the conversational AI. Users chat with you, and you help them discover Joins and Connections on Lifestring.{join_prompt_addition}"""
-
             interests = profile_data.get('interests', []) or []
             hobbies = profile_data.get('hobbies', []) or []
             bio = profile_data.get('bio', '') or ''
@@ -1172,11 +1010,18 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
                         profile_context.append(f"  A: {answer}")
 
             # Always include the user's name in the system prompt
-            system_prompt += f"\n\nYou're talking to {name}."
+            profile = f"\n\nYou're talking to {name}."
 
             if profile_context:
-                system_prompt += f" Here's their profile:\n" + "\n".join(profile_context)
-                system_prompt += "\n\nUse this information to provide personalized, relevant responses and recommendations based on their location, age, interests, and the current time."
+                profile += f" Here's their profile:\n" + "\n".join(profile_context)
+                profile += "\n\nUse this information to provide personalized, relevant responses and recommendations based on their location, age, interests, and the current time."
+
+            # Static instructions first so the prefix stays cacheable; time, join and profile follow
+            system_prompt = PUBLIC_PROFILE_PROMPT.render(
+                time_section=timezone_reference_section(time_info),
+                joins=join_prompt_addition,
+                profile=profile
+            )
 
             # Prepare messages for OpenAI
             messages = [
@@ -1209,114 +1054,31 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
                 # Fallback to OpenAI with function calling
                 tools = realtime_service.get_available_functions() if realtime_service else None
                 logger.info(f"Using enhanced OpenAI service with tools: {tools is not None}")
-                response = await openai_service.chat_completion(
-                    messages=messages,
-                    model="gpt-4o",
-                    temperature=0.7,
-                    max_tokens=500,
-                    tools=tools if tools else None
-                )
 
-            # Handle function calls if present (only for OpenAI fallback)
-            if not hybrid_ai_service and response.get("tool_calls"):
-                # Execute function calls
-                for tool_call in response["tool_calls"]:
-                    function_name = tool_call["function"]["name"]
-                    arguments = json.loads(tool_call["function"]["arguments"])
-
-                    # Execute the function
-                    function_result = await realtime_service.execute_function(function_name, arguments) if realtime_service else {"error": "Real-time service not available"}
-
-                    # Add function result to messages
-                    messages.append({
-                        "role": "assistant",
-                        "content": response["content"],
-                        "tool_calls": [
-                            {
-                                "id": tc["id"],
-                                "type": "function",
-                                "function": tc["function"]
-                            }
-                            for tc in response["tool_calls"]
-                        ]
-                    })
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call["id"],
-                        "content": json.dumps(function_result)
-                    })
-
-                # Get final response with function results
-                final_response = await openai_service.chat_completion(
-                    messages=messages,
-                    model="gpt-4o",
-                    temperature=0.7,
-                    max_tokens=500
-                )
-            else:
-                # For hybrid AI service, the response is already final
-                final_response = response
-
-                # Only use old real-time events search for OpenAI fallback
-                if not hybrid_ai_service:
-                    # Search for real-time events if user is asking about them
-                    real_time_events = await search_real_time_events(request.message, profile_data)
-                    response_message = final_response.get("content") or "I've processed your request successfully."
-
-                    # Check if this is a time-specific query that should only show real-time events
-                    message_lower = request.message.lower()
-                    real_time_only_keywords = [
-                        'tomorrow', 'today', 'tonight', 'this evening',
-                        'this weekend', 'weekend', 'next week', 'this month',
-                        'what can i do tomorrow', 'what can i do today',
-                        'what can i do this weekend', 'what\'s happening tomorrow',
-                        'what\'s happening today', 'what\'s happening this weekend'
-                    ]
-
-                    is_real_time_only_query = any(keyword in message_lower for keyword in real_time_only_keywords)
-
-                    if real_time_events:
-                        # Add events as formatted text to the response
-                        events_text = format_events_as_text(real_time_events)
-                        if is_real_time_only_query:
-                            response_message = events_text  # Replace AI response with just events for time-specific queries
-                        else:
-                            response_message += events_text  # Append events to AI response for general queries
-                        logger.info(f"Added {len(real_time_events)} real-time events to response text")
-
-                    # Only include joins if it's not a time-specific query
-                    joins = [] if is_real_time_only_query else extract_joins_from_response(final_response["content"], request.message, profile_data)
-                else:
-                    # For hybrid AI service, use the response as-is (Google Grounding handles real-time data)
-                    response_message = final_response.get("content") or "I've processed your request successfully."
-                    joins = extract_joins_from_response(final_response.get("content"), request.message, profile_data)
-
-                return SimpleChatResponse(
-                    message=response_message,
-                    intent="general_chat",
-                    confidence=0.9,
-                    joins=joins,
-                    tokens=final_response.get("tokens", 0),
-                    cost=final_response.get("cost", 0.0)
+                async def complete(messages, tools):
+                    return await openai_service.chat_completion(
+                        messages=messages,
+                        model=settings.CHAT_MODEL,
+                        temperature=0.7,
+                        max_tokens=500,
+                        tools=tools
+                    )
+
+                # Run any tool calls (only the OpenAI fallback is offered tools)
+                turn = await agent_loop.run(
+                    messages, complete, realtime_service.tools if realtime_service else None, tools=tools,
+                    first_response=await complete(messages, tools)
                 )
+                response = {**turn.response, "content": turn.content, "tokens": turn.tokens, "cost": turn.cost}
 
             # Only use old real-time events search for OpenAI fallback
             if not hybrid_ai_service:
                 # Search for real-time events if user is asking about them
                 real_time_events = await search_real_time_events(request.message, profile_data)
-                response_message = response.get("content") or "I'm here to help!"
+                response_message = response.get("content") or "I've processed your request successfully."
 
                 # Check if this is a time-specific query that should only show real-time events
-                message_lower = request.message.lower()
-                real_time_only_keywords = [
-                    'tomorrow', 'today', 'tonight', 'this evening',
-                    'this weekend', 'weekend', 'next week', 'this month',
-                    'what can i do tomorrow', 'what can i do today',
-                    'what can i do this weekend', 'what\'s happening tomorrow',
-                    'what\'s happening today', 'what\'s happening this weekend'
-                ]
-
-                is_real_time_only_query = any(keyword in message_lower for keyword in real_time_only_keywords)
+                is_real_time_only_query = match_message(request.message).has('realtime_only')
 
                 if real_time_events:
                     # Add events as formatted text to the response
@@ -1331,7 +1093,7 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
                 joins = [] if is_real_time_only_query else extract_joins_from_response(response.get("content"), request.message, profile_data)
             else:
                 # For hybrid AI service, use the response as-is (Google Grounding handles real-time data)
-                response_message = response.get("content") or "I'm here to help!"
+                response_message = response.get("content") or "I've processed your request successfully."
                 joins = extract_joins_from_response(response.get("content"), request.message, profile_data)
 
             return SimpleChatResponse(
@@ -1345,7 +1107,6 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
 
         # If no profile data, use enhanced OpenAI with real-time capabilities
         import json
-        import datetime
         from app.services.realtime_service import realtime_service
 
         # Get user's location from profile data for timezone detection
@@ -1355,16 +1116,6 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
 
         # Get current time in user's timezone
         time_info = await realtime_service.get_current_time(user_location)
-        current_time = time_info["current_time"]
-        current_date = time_info["current_date"]
-
-        # Also get times for major US timezones for reference
-        import pytz
-        utc_now = datetime.datetime.now(pytz.UTC)
-        pst_time = utc_now.astimezone(pytz.timezone('US/Pacific')).strftime("%I:%M %p")
-        mst_time = utc_now.astimezone(pytz.timezone('US/Mountain')).strftime("%I:%M %p")
-        cst_time = utc_now.astimezone(pytz.timezone('US/Central')).strftime("%I:%M %p")
-        est_time = utc_now.astimezone(pytz.timezone('US/Eastern')).strftime("%I:%M %p")
 
         # Extract potential joins from user message to include in system prompt
         logger.info(f"🔍 EXTRACTING JOINS FOR SYSTEM PROMPT")
@@ -1393,56 +1144,10 @@ DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention t
         else:
             logger.info(f"🔍 NO JOINS FOUND for message: {request.message}")
 
-        system_prompt = f"""You are Strings, Lifestring's AI assistant. You can answer any questions the user has naturally and conversationally.
-
-Current time: {current_time} on {current_date}.
-
-TIMEZONE REFERENCE (for location-specific time queries):
-- Pacific Time: {pst_time}
-- Mountain Time: {mst_time} (Utah, Colorado, etc.)
-- Central Time: {cst_time}
-- Eastern Time: {est_time}
-
-You are having a conversation with a user on Lifestring. Here's how Lifestring works:
-
-**YOU ARE STRINGS**: You are the AI that users chat with about what they want to do and who they want to meet.
-
-**JOINS**: These are ongoing interest-based groups/communities where people with shared interests connect and organize activities together. Joins are integrated directly into the main Strings interface - there is NO separate "Joins section". When users ask about finding groups or communities, recommend ONE relevant Join they can find in their main Strings feed.
-
-**CONNECTIONS**: This is how users find friends - they get recommended people based on interests, location, and age. When users want to meet people, direct them to check their Connections.
-
-**IMPORTANT UI STRUCTURE**:
-- Joins are NOT in a separate section - they appear as cards in the main Strings interface
-- NEVER say "you can find this event under the Joins section" or similar
-- Instead say "you can find this event in your Strings feed" or "look for this in your main Strings interface"
-
-**YOUR APPROACH**:
-1. Answer general questions naturally (weather, time, jokes, etc.) - but ONLY respond with time when specifically asked "what time is it"
-2. When users tell you what they want to do or activities they're interested in, recommend relevant Joins they can find in their Strings feed
-3. When users want to meet people or make friends, direct them to their Connections where they'll find recommended people
-4. Have natural conversations about their interests and goals
-5. NEVER mention external platforms like Meetup, Facebook, etc.
-6. Focus on Lifestring's features: Joins for activities, Connections for meeting people
-7. NEVER use markdown formatting like **bold** or *italics* - use plain text only
-8. NEVER mention a "Joins section" - joins are integrated into the main Strings interface
-9. ONLY suggest Joins when user explicitly asks for group activities, events, or things to do
-10. ALWAYS match Join suggestions to user's location - Salt Lake City gets Utah activities, San Francisco gets Bay Area activities
-
-**IMPORTANT**: When users ask about groups or communities on Lifestring, you will be provided with specific join recommendations in the system prompt. Prioritize recommending these specific joins. However, when users ask about real-time events, activities, or things happening in specific locations, you can use your Google Search capabilities to provide current, accurate information about events, activities, and happenings in their requested location.
-
-**SMART CATEGORIZATION**: Automatically understand activity types from context:
-- Hiking, camping, surfing → Outdoor Adventures
-- Cooking, wine tasting, food tours → Culinary Experiences
-- Photography, art, music → Creative Activities
-- Volleyball, tennis, running → Active Sports
-- Book clubs, lectures, discussions → Intellectual Pursuits
-- Yoga, meditation, wellness → Wellness & Mindfulness
-- Parties, meetups, social events → Social Experiences
-- Gym, climbing, fitness classes → Fitness Challenges
-
-**REAL-TIME EVENTS**: When users ask about events, activities, or things happening in specific locations (like "what events are happening in Madrid this weekend" or "who's playing at The Depot"), use your Google Search capabilities to find current, real-time information. Provide specific event names, dates, times, locations, and ticket information directly in your chat response. NEVER mention "event cards" or "cards appearing" - just give the information directly.
-
-**REMEMBER**: You are Strings - the conversational AI. Users chat with you, and you help them discover Joins and Connections on Lifestring.{join_prompt_addition}"""
+        system_prompt = PUBLIC_GUEST_PROMPT.render(
+            time_section=timezone_reference_section(time_info),
+            joins=join_prompt_addition
+        )
 
         # Prepare messages for OpenAI
         messages = [
@@ -1453,82 +1158,33 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
         # Use hybrid AI service if available, otherwise fallback to OpenAI
         logger.info(f"🔍 ABOUT TO CALL HYBRID AI SERVICE - system_prompt length: {len(system_prompt)}")
         logger.info(f"Profile data available - hybrid_ai_service available: {hybrid_ai_service is not None}")
-        if hybrid_ai_service:
-            # Get available real-time functions for hybrid AI service
-            tools = realtime_service.get_available_functions() if realtime_service else None
-            logger.info(f"Providing tools to hybrid AI service: {tools is not None}")
-
-            response = await hybrid_ai_service.chat_completion(
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500,
-                context={},
-                tools=tools
-            )
-        else:
-            # Get available real-time functions
-            tools = realtime_service.get_available_functions() if realtime_service else None
-            logger.info(f"Fallback to OpenAI service with tools: {tools is not None}")
-
-            # Get AI response with function calling capability
-            response = await openai_service.chat_completion(
-                messages=messages,
-                model=settings.CHAT_MODEL,
-            temperature=0.7,
-            max_tokens=500,
-            tools=tools if tools else None
-        )
+        # Get available real-time functions
+        tools = realtime_service.get_available_functions() if realtime_service else None
+        logger.info(f"Providing tools to {'hybrid AI service' if hybrid_ai_service else 'OpenAI fallback'}: {tools is not None}")
 
-        # Handle function calls if present
-        if response.get("tool_calls"):
-            logger.info(f"Processing {len(response['tool_calls'])} function calls from {'hybrid AI service' if hybrid_ai_service else 'OpenAI fallback'}")
-
-            # Execute function calls
-            for tool_call in response["tool_calls"]:
-                function_name = tool_call["function"]["name"]
-                arguments = json.loads(tool_call["function"]["arguments"])
-
-                # Execute the function
-                function_result = await realtime_service.execute_function(function_name, arguments) if realtime_service else {"error": "Real-time service not available"}
-
-                # Add function result to messages
-                messages.append({
-                    "role": "assistant",
-                    "content": response["content"],
-                    "tool_calls": [
-                        {
-                            "id": tc["id"],
-                            "type": "function",
-                            "function": tc["function"]
-                        }
-                        for tc in response["tool_calls"]
-                    ]
-                })
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call["id"],
-                    "content": json.dumps(function_result)
-                })
-
-            # Get final response with function results
+        async def complete(messages, tools):
             if hybrid_ai_service:
-                final_response = await hybrid_ai_service.chat_completion(
+                return await hybrid_ai_service.chat_completion(
                     messages=messages,
                     temperature=0.7,
                     max_tokens=500,
                     context={},
                     tools=tools
                 )
-            else:
-                final_response = await openai_service.chat_completion(
-                    messages=messages,
-                    model="gpt-4o",
-                    temperature=0.7,
-                    max_tokens=500
-                )
-        else:
-            # No function calls, use response as-is
-            final_response = response
+            return await openai_service.chat_completion(
+                messages=messages,
+                model=settings.CHAT_MODEL,
+                temperature=0.7,
+                max_tokens=500,
+                tools=tools
+            )
+
+        # Get AI response with function calling capability, running any tool rounds
+        turn = await agent_loop.run(
+            messages, complete, realtime_service.tools if realtime_service else None, tools=tools,
+            first_response=await complete(messages, tools)
+        )
+        final_response = {**turn.response, "content": turn.content, "tokens": turn.tokens, "cost": turn.cost}
 
         logger.info(f"AI response: {final_response['content']}")
 
@@ -1539,16 +1195,7 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
             response_message = final_response.get("content") or "I've processed your request successfully."
 
             # Check if this is a time-specific query that should only show real-time events
-            message_lower = request.message.lower()
-            real_time_only_keywords = [
-                'tomorrow', 'today', 'tonight', 'this evening',
-                'this weekend', 'weekend', 'next week', 'this month',
-                'what can i do tomorrow', 'what can i do today',
-                'what can i do this weekend', 'what\'s happening tomorrow',
-                'what\'s happening today', 'what\'s happening this weekend'
-            ]
-
-            is_real_time_only_query = any(keyword in message_lower for keyword in real_time_only_keywords)
+            is_real_time_only_query = match_message(request.message).has('realtime_only')
 
             if real_time_events:
                 # Add events as formatted text to the response
@@ -1576,6 +1223,9 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
         )
 
 
+    except AdmissionRejected:
+        # Shed as a 503 with Retry-After rather than a canned answer
+        raise
     except Exception as e:
         logger.error(f"Error in AI chat: {str(e)}", exc_info=True)
         # Fallback response for any errors
@@ -1620,6 +1270,53 @@ async def debug_config():
     }
 
 
+@router.get("/ai/debug-stats")
+async def debug_stats():
+    """Debug endpoint exposing chat pipeline runtime counters."""
+    return {
+        "client_disconnect_cancellations": cancellation_stats.snapshot(),
+        "deadlines": deadline_stats.snapshot(),
+        "speculative_prefetch": prefetch_stats.snapshot(),
+        "admission": admission_controller.snapshot(),
+        "rate_limits": rate_limit_stats.snapshot(),
+        "degradation": degradation_controller.snapshot(),
+        "fast_path": fast_path.stats.snapshot(),
+        "tool_cache": tool_result_cache.snapshot(),
+        "weather_cache": weather_cache.snapshot(),
+        "sports_scoreboard": sports_scoreboard.snapshot(),
+        "event_ingestion": event_ingestion.snapshot(),
+        "event_dedup": event_deduplicator.snapshot(),
+        "gazetteer": gazetteer.snapshot(),
+        "scraping": html_scraper.snapshot(),
+        "agent_loop": agent_stats.snapshot(),
+        "prompts": {"templates": prompt_templates.snapshot(), "tools": realtime_service.tools.schemas.snapshot() if realtime_service else None}
+    }
+
+
+@router.get("/ai/debug-routing")
+async def debug_routing():
+    """Debug endpoint exposing live per-provider routing stats."""
+    from app.services.provider_stats import provider_stats, hedge_stats
+    from app.services.circuit_breaker import circuit_breakers
+    from app.services.model_cascade import cascade_stats
+    from app.services.openai_service import openai_service
+    from app.services.gemini_service import gemini_service
+    from app.services.gemini_context_cache import gemini_context_cache
+    from app.services.intent_classifier import query_classifier
+    return {
+        "objective": settings.ROUTING_OBJECTIVE,
+        "p95_target_seconds": settings.ROUTING_P95_TARGET_SECONDS,
+        "max_error_rate": settings.ROUTING_MAX_ERROR_RATE,
+        "providers": provider_stats.snapshot(),
+        "hedging": {"enabled": settings.HEDGING_ENABLED, **hedge_stats.snapshot()},
+        "circuit_breakers": circuit_breakers.snapshot(),
+        "intent_classifier": query_classifier.snapshot(),
+        "cascade": {"enabled": settings.MODEL_CASCADE_ENABLED, **cascade_stats.snapshot()},
+        "credentials": {"openai": openai_service.pool.snapshot(), "gemini": gemini_service.pool.snapshot()},
+        "gemini_context_cache": gemini_context_cache.snapshot()
+    }
+
+
 @router.post("/ai/public-chat", response_model=EnhancedChatResponse)
 async def public_ai_chat(
     request: EnhancedChatRequest,
@@ -1629,7 +1326,23 @@ async def public_ai_chat(
     Public AI chat endpoint for testing (no authentication required).
     Uses the enhanced Lifestring AI service with Connected Strings search.
     """
+    set_request_priority(Priority.PUBLIC)
     try:
+        # Deterministic questions are answered without a model call
+        fast_reply = await fast_path.answer(request.message, profile_data=request.profile_data)
+        if fast_reply:
+            return EnhancedChatResponse(
+                message=fast_reply.message,
+                intent=fast_reply.intent,
+                confidence=fast_reply.confidence,
+                actions=[],
+                suggested_strings=[],
+                suggested_connections=[],
+                suggested_joins=[],
+                tokens=0,
+                cost=0.0
+            )
+
         # Create a mock user for public endpoint (required by process_user_message)
         from app.models.user import User
         import uuid
@@ -1675,6 +1388,8 @@ async def public_ai_chat(
             cost=0.0   # AIResponse doesn't track cost
         )
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
         print(f"Error in public_ai_chat: {e}")
         return EnhancedChatResponse(
@@ -1696,6 +1411,7 @@ async def lifestring_ai_chat_test(request: EnhancedChatRequest):
     TEST ENDPOINT: Enhanced AI chat with Lifestring-specific features (no auth required).
     Returns structured responses with actions for Strings, Connections, and Joins.
     """
+    set_request_priority(Priority.PUBLIC)
     try:
         # Use a test user ID for testing
         user_id = "6d259f2e-189c-4d31-a6bd-139ccd986b30"  # Phoebe's user ID for testing
@@ -1735,81 +1451,20 @@ async def lifestring_ai_chat_test(request: EnhancedChatRequest):
                         "contact_info": {"name": "User"}
                     }
 
-        # Handle profile-specific queries
-        message_lower = request.message.lower()
-        if "passions" in message_lower or "interests" in message_lower or "hobbies" in message_lower:
-            if profile_data:
-                interests = profile_data.get('interests', []) or []
-                passions = profile_data.get('passions', []) or []
-                hobbies = profile_data.get('hobbies', []) or []
-                bio = profile_data.get('bio', '') or ''
-
-                # If asking specifically about passions
-                if "passions" in message_lower:
-                    if passions:
-                        passions_text = ", ".join(passions)
-                        message = f"Based on your profile, your passions include: {passions_text}!"
-                        if bio:
-                            message += f" Your bio says: '{bio}'"
-                        message += " Would you like to explore these passions further or connect with others who share them?"
-                    else:
-                        message = "I don't see any passions listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return EnhancedChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        actions=[],
-                        suggested_strings=[],
-                        suggested_connections=[],
-                        suggested_joins=[],
-                        tokens=50,
-                        cost=0.0001
-                    )
-
-                # If asking specifically about hobbies
-                elif "hobbies" in message_lower:
-                    if hobbies:
-                        hobbies_text = ", ".join(hobbies)
-                        message = f"Based on your profile, your hobbies include: {hobbies_text}."
-                    else:
-                        message = "I don't see any hobbies listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return EnhancedChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        actions=[],
-                        suggested_strings=[],
-                        suggested_connections=[],
-                        suggested_joins=[],
-                        tokens=50,
-                        cost=0.0001
-                    )
-
-                # For interests query
-                else:
-                    all_interests = list(set(interests + passions))
-                    if all_interests:
-                        interests_text = ", ".join(all_interests)
-                        message = f"Based on your profile, I can see you're interested in: {interests_text}!"
-                        if bio:
-                            message += f" Your bio says: '{bio}'"
-                        message += " Would you like to explore these interests further or connect with others who share them?"
-                    else:
-                        message = "I don't see any specific interests listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return EnhancedChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        actions=[],
-                        suggested_strings=[],
-                        suggested_connections=[],
-                        suggested_joins=[],
-                        tokens=100,
-                        cost=0.0002
-                    )
+        # Time, weather and profile questions are answered without a model call
+        fast_reply = await fast_path.answer(request.message, profile_data=profile_data)
+        if fast_reply:
+            return EnhancedChatResponse(
+                message=fast_reply.message,
+                intent=fast_reply.intent,
+                confidence=fast_reply.confidence,
+                actions=[],
+                suggested_strings=[],
+                suggested_connections=[],
+                suggested_joins=[],
+                tokens=0,
+                cost=0.0
+            )
 
         # For other messages, use OpenAI with personalized context
         from openai import OpenAI
@@ -1891,16 +1546,7 @@ IMPORTANT: Never mention external platforms like Meetup, Facebook, Instagram, or
         response_message = ai_response
 
         # Check if this is a time-specific query that should only show real-time events
-        message_lower = request.message.lower()
-        real_time_only_keywords = [
-            'tomorrow', 'today', 'tonight', 'this evening',
-            'this weekend', 'weekend', 'next week', 'this month',
-            'what can i do tomorrow', 'what can i do today',
-            'what can i do this weekend', 'what\'s happening tomorrow',
-            'what\'s happening today', 'what\'s happening this weekend'
-        ]
-
-        is_real_time_only_query = any(keyword in message_lower for keyword in real_time_only_keywords)
+        is_real_time_only_query = match_message(request.message).has('realtime_only')
 
         if real_time_events:
             # Add events as formatted text to the response
@@ -1923,6 +1569,8 @@ IMPORTANT: Never mention external platforms like Meetup, Facebook, Instagram, or
             cost=cost
         )
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
         print(f"Error in lifestring_ai_chat_test: {e}")
         return EnhancedChatResponse(
@@ -1938,9 +1586,13 @@ IMPORTANT: Never mention external platforms like Meetup, Facebook, Instagram, or
         )
 
 
-async def build_enhanced_system_prompt(profile_data: Dict[str, Any]) -> str:
+async def build_enhanced_system_prompt(profile_data: Dict[str, Any], template: PromptTemplate = ENHANCED_PROMPT) -> str:
     """
     Build enhanced system prompt with profile data.
+
+    The static instructions come first and never change, so the prompt
+    prefix stays byte-stable for provider prompt caching; time and profile
+    follow in the dynamic section.
     """
     # Get current time information
     from app.services.realtime_service import realtime_service
@@ -1950,30 +1602,7 @@ async def build_enhanced_system_prompt(profile_data: Dict[str, Any]) -> str:
 
     # Get current time in user's timezone
     time_info = await realtime_service.get_current_time(user_location)
-    system_prompt = f"""You are Strings, Lifestring's AI assistant. The current time is {time_info['current_time']} on {time_info['current_date']}.
-
-You are having a conversation with a user on Lifestring. Here's how Lifestring works:
-
-**YOU ARE STRINGS**: You are the AI that users chat with about what they want to do and who they want to meet.
-
-**LIFESTRING FEATURES**:
-1. **STRINGS**: Posts where users share thoughts, interests, and activities
-2. **CONNECTIONS**: Smart matching with compatible users based on shared interests
-3. **JOINS**: Ongoing groups and activities that users can join
-
-**YOUR ROLE**: Help users discover and connect with:
-- **JOINS**: Ongoing groups, clubs, and activities they can join
-- **PEOPLE**: Others with similar interests they can connect with
-- **ACTIVITIES**: Things to do based on their interests and location
-
-**CONVERSATION STYLE**:
-- Be natural, friendly, and conversational like ChatGPT
-- Answer general questions naturally (time, weather, general knowledge)
-- Only provide Lifestring-specific responses when questions relate to user profiles, connections, or platform features
-- Never mention external platforms like Meetup, Facebook, etc.
-- Always recommend Lifestring's own features and community
-
-**IMPORTANT**: You can answer ANY question naturally. Don't always redirect to Lifestring features unless the question is specifically about finding people, activities, or connections."""
+    profile = ""
 
     if profile_data:
         interests = profile_data.get('interests', []) or []
@@ -2032,70 +1661,26 @@ You are having a conversation with a user on Lifestring. Here's how Lifestring w
                     profile_context.append(f"  A: {answer}")
 
         # Always include the user's name in the system prompt
-        system_prompt += f"\n\nYou're talking to {name}."
+        profile += f"\n\nYou're talking to {name}."
 
         if profile_context:
-            system_prompt += f" Here's their profile:\n" + "\n".join(profile_context)
-            system_prompt += "\n\nUse this profile information to provide personalized recommendations, especially when they ask about activities, weather-related suggestions, or local events. Consider their location, age, interests, and hobbies when making suggestions."
+            profile += f" Here's their profile:\n" + "\n".join(profile_context)
+            profile += "\n\nUse this profile information to provide personalized recommendations, especially when they ask about activities, weather-related suggestions, or local events. Consider their location, age, interests, and hobbies when making suggestions."
     else:
-        system_prompt += "\n\nBe friendly and helpful. If the user mentions interests, encourage them to add them to their profile for more personalized suggestions."
+        profile += "\n\nBe friendly and helpful. If the user mentions interests, encourage them to add them to their profile for more personalized suggestions."
 
-    return system_prompt
+    return template.render(
+        current_time=time_info['current_time'],
+        current_date=time_info['current_date'],
+        profile=profile
+    )
 
 
 async def build_enhanced_system_prompt_with_functions(profile_data: Dict[str, Any]) -> str:
     """
     Build enhanced system prompt with function calling instructions.
     """
-    # Get the base system prompt from the existing function
-    base_prompt = await build_enhanced_system_prompt(profile_data)
-
-    # Add function calling instructions
-    function_instructions = """
-
-**FUNCTION CALLING INSTRUCTIONS**:
-
-You have access to the following functions that you MUST use when appropriate:
-
-1. **suggest_joins_for_activity(activity: str, location: str)** - Use when users want to JOIN ongoing activities or groups
-2. **suggest_people_to_connect(interests: list, location: str)** - Use when users want to find people with similar interests
-3. **update_profile_location(location: str)** - Use when users mention moving or changing location
-4. **update_bio(bio: str)** - Use when users want to update their bio/description
-5. **add_hobby(hobby: str)** - Use when users mention new hobbies
-6. **add_interest(interest: str)** - Use when users mention new interests
-7. **add_skill(skill: str)** - Use when users mention new skills
-
-**JOINS/ACTIVITIES**: You MUST suggest joins/activities ONLY when users specifically ask to JOIN ongoing activities or groups. When users ask about:
-- "I want to join a hiking group": IMMEDIATELY call suggest_joins_for_activity with "hiking" and user's location
-- "Find me hikers to join": IMMEDIATELY call suggest_joins_for_activity with "hiking" and user's location
-- "Looking for climbing communities to join": ALWAYS use suggest_joins_for_activity with "climbing" as activity and user's location
-- "I want to find people to go boating with": IMMEDIATELY call suggest_joins_for_activity with "boating" and user's location
-- "I want to find groups for [activity]": ALWAYS use suggest_joins_for_activity function with user's location
-- "Find me people who like [activity]": ALWAYS use suggest_joins_for_activity function with user's location
-- "Looking for [activity] communities": ALWAYS use suggest_joins_for_activity function with user's location
-- Specifically wanting to JOIN ongoing activities: ALWAYS use suggest_joins_for_activity function with user's location
-
-**CRITICAL**: ALWAYS pass the user's location when calling suggest_joins_for_activity to ensure location-appropriate suggestions.
-
-**DO NOT** suggest joins for:
-- General event requests like "what should I do tonight" or "I want to see an event"
-- One-time event questions like "what's happening tonight"
-- Entertainment requests like "I want to watch a football game"
-- General activity suggestions that don't involve joining ongoing groups
-
-For general events and entertainment, use your real-time knowledge to suggest current events, shows, games, etc.
-
-**PROFILE UPDATES**: When users mention personal information, ALWAYS call the appropriate function:
-- "I moved to Berkeley" → Use update_profile_location function
-- "Climbing is a hobby of mine" → Use add_hobby function
-- "I'm interested in photography" → Use add_interest function
-- "I know Python programming" → Use add_skill function
-- "Change my description to..." → Use update_bio function
-
-ALWAYS call the appropriate function when users mention these things, then confirm the update was successful and be natural about it.
-"""
-
-    return base_prompt + function_instructions
+    return await build_enhanced_system_prompt(profile_data, ENHANCED_PROMPT_WITH_FUNCTIONS)
 
 
 async def process_enhanced_chat_with_functions(
@@ -2103,7 +1688,8 @@ async def process_enhanced_chat_with_functions(
     user_id: str,
     token: str,
     profile_data: Dict[str, Any],
-    conversation_history: List[Dict[str, str]] = None
+    conversation_history: List[Dict[str, str]] = None,
+    deadline: Optional[Deadline] = None
 ) -> EnhancedChatResponse:
     """
     Process enhanced chat with function calling support.
@@ -2132,60 +1718,55 @@ async def process_enhanced_chat_with_functions(
         # Use hybrid AI service with function calling
         logger.info(f"🔍 ABOUT TO CALL HYBRID AI SERVICE - system_prompt length: {len(system_prompt)}")
         logger.info(f"Profile data available - hybrid_ai_service available: {hybrid_ai_service is not None}")
-        if hybrid_ai_service:
-            # Get available real-time functions for hybrid AI service
-            tools = realtime_service.get_available_functions() if realtime_service else None
-            logger.info(f"Providing tools to hybrid AI service: {tools is not None}")
+        # Speculatively start the tool calls the model is likely to make for this query
+        query_type = hybrid_ai_service._classify_query(messages).value if hybrid_ai_service else None
+        # Tool results are memoized per conversation (the client's conversation_id, else the user)
+        conversation_id = (request.context or {}).get('conversation_id')
+        prefetch = speculative_prefetcher.start(
+            query_type, request.message, (profile_data or {}).get('location'), user_id, token,
+            deadline=deadline, conversation_id=conversation_id
+        )
 
-            response = await hybrid_ai_service.chat_completion(
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500,
-                context={},
-                tools=tools
-            )
-        else:
-            # Get available real-time functions
-            tools = realtime_service.get_available_functions() if realtime_service else None
-            logger.info(f"Fallback to OpenAI service with tools: {tools is not None}")
+        # Get available real-time functions
+        tools = realtime_service.get_available_functions() if realtime_service else None
+        logger.info(f"Providing tools to {'hybrid AI service' if hybrid_ai_service else 'OpenAI fallback'}: {tools is not None}")
 
-            response = await openai_service.chat_completion(
+        async def complete(messages, tools):
+            if hybrid_ai_service:
+                return await hybrid_ai_service.chat_completion(
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=500,
+                    context={},
+                    tools=tools,
+                    deadline=deadline
+                )
+            return await openai_service.chat_completion(
                 messages=messages,
                 temperature=0.7,
                 max_tokens=500,
                 tools=tools
             )
 
-        logger.info(f"🔧 AI RESPONSE: {response}")
-
-        # Initialize collections for joins and people
-        joins = []
-        people = []
-
-        # Process function calls if present
-        if response.get("tool_calls"):
-            logger.info(f"🔧 PROCESSING {len(response['tool_calls'])} FUNCTION CALLS")
-
-            for tool_call in response["tool_calls"]:
-                function_name = tool_call["function"]["name"]
-                arguments = json.loads(tool_call["function"]["arguments"])
-
-                logger.info(f"🔧 FUNCTION CALL: {function_name} with args: {arguments}")
-
-                # Execute the function
-                function_result = await realtime_service.execute_function(function_name, arguments, user_id, token) if realtime_service else {"error": "Real-time service not available"}
-
-                logger.info(f"🔧 FUNCTION RESULT: {function_result}")
+        try:
+            response = await complete(messages, tools)
+            logger.info(f"🔧 AI RESPONSE: {response}")
+
+            # Run the requested tools (reusing speculative results) until the model answers
+            turn = await agent_loop.run(
+                messages, complete, realtime_service.tools if realtime_service else None,
+                context=ToolContext(user_id, token, deadline, conversation_id),
+                tools=tools, first_response=response, prefetch=prefetch
+            )
+        finally:
+            prefetch.discard()
 
-                # Extract joins and people from function results
-                if function_result.get("success") and function_name == "suggest_joins_for_activity":
-                    joins.extend(function_result.get("joins", []))
-                    people.extend(function_result.get("people", []))
-                elif function_result.get("success") and function_name == "suggest_people_to_connect":
-                    people.extend(function_result.get("people", []))
+        # Extract joins and people from function results
+        joins = turn.collect("suggest_joins_for_activity", "joins")
+        people = turn.collect("suggest_joins_for_activity", "people") + turn.collect("suggest_people_to_connect", "people")
 
         # Get AI response content - handle None content when function calls are made
-        ai_response = response.get("content")
+        ai_response = turn.content
         if ai_response is None:
             # When AI makes function calls, content can be None, so provide a default response
             if joins:
@@ -2202,8 +1783,8 @@ async def process_enhanced_chat_with_functions(
             suggested_strings=[],
             suggested_connections=[],
             suggested_joins=joins,
-            tokens=response.get("tokens", 0),
-            cost=response.get("cost", 0.0)
+            tokens=turn.tokens,
+            cost=turn.cost
         )
 
     except Exception as e:
@@ -2224,13 +1805,38 @@ async def process_enhanced_chat_with_functions(
 @router.post("/ai/lifestring-chat", response_model=EnhancedChatResponse)
 async def lifestring_ai_chat(
     request: EnhancedChatRequest,
+    http_request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db_optional)
 ):
     """
     Enhanced AI chat with Lifestring-specific features.
     Returns structured responses with actions for Strings, Connections, and Joins.
+
+    The pipeline is cancelled if the client disconnects before it completes,
+    and every stage is bounded by a shared per-request deadline.
     """
+    deadline = Deadline(name="lifestring_chat")
+    try:
+        return await run_until_disconnect(
+            http_request,
+            _lifestring_ai_chat(request, credentials, db, deadline),
+            label="lifestring_chat"
+        )
+    except ClientDisconnected:
+        # Nobody is listening; 499 mirrors the nginx "client closed request" code
+        return Response(status_code=499)
+    finally:
+        deadline.finish()
+
+
+async def _lifestring_ai_chat(
+    request: EnhancedChatRequest,
+    credentials: HTTPAuthorizationCredentials,
+    db: Optional[Session],
+    deadline: Deadline
+):
+    """Run the Lifestring chat pipeline for an authenticated user."""
     try:
         # Verify JWT token
         from app.core.security import get_user_id_from_token
@@ -2283,56 +1889,9 @@ async def lifestring_ai_chat(
                 user_id=user_id,
                 token=token,
                 profile_data=profile_data,
-                conversation_history=request.context.get('conversation_history', []) if hasattr(request, 'context') and request.context else []
-            )
-
-        # Find or create AI chat room for this user
-        ai_room = db.query(Room).join(RoomParticipant).filter(
-            RoomParticipant.user_id == user_id,
-            Room.room_metadata['type'].astext == 'ai_chat'
-        ).first()
-
-        if not ai_room:
-            # Create new AI chat room
-            ai_room = Room(
-                name=f"AI Chat - {current_user.contact_info.get('name', 'User') if current_user.contact_info else 'User'}",
-                room_metadata={
-                    "type": "ai_chat",
-                    "model": settings.CHAT_MODEL,
-                    "created_by": str(user_id)
-                }
-            )
-            db.add(ai_room)
-            db.flush()
-
-            # Add user as participant
-            user_participant = RoomParticipant(
-                room_id=ai_room.id,
-                user_id=user_id
-            )
-            db.add(user_participant)
-
-            # Add AI bot as participant
-            ai_participant = RoomParticipant(
-                room_id=ai_room.id,
-                user_id=settings.AI_BOT_USER_ID
+                conversation_history=request.context.get('conversation_history', []) if hasattr(request, 'context') and request.context else [],
+                deadline=deadline
             )
-            db.add(ai_participant)
-            db.commit()
-
-        # Save user message to conversation history
-        user_message = Message(
-            room_id=ai_room.id,
-            user_id=user_id,
-            content=request.message
-        )
-        db.add(user_message)
-        db.commit()
-
-        # Get conversation history for context
-        history = db.query(Message).filter(
-            Message.room_id == ai_room.id
-        ).order_by(Message.created_at).limit(20).all()
 
         # Use profile data from request if provided (either directly or in context), otherwise fetch from database
         profile_data = None
@@ -2343,101 +1902,132 @@ async def lifestring_ai_chat(
             profile_data = request.context.get('profile_data')
             print(f"Using profile data from request.context: {profile_data}")
 
+        # Start the profile fetch now so it overlaps with the room/history DB work below
+        profile_task = None
         if not profile_data:
             # Use centralized profile service with JWT token for RLS policies
             from app.services.profile_service import profile_service
-            profile_data = await profile_service.get_user_profile(user_id, token)
+            profile_task = asyncio.ensure_future(
+                profile_service.get_user_profile(user_id, token, deadline=deadline)
+            )
 
-            if not profile_data:
-                # Fallback to known data for this user
-                if user_id == "a90f0ea5-ba98-44f5-a3a7-a922db9e1523":
-                    profile_data = {
-                        "bio": "I love climbing",
-                        "interests": ["climbing"],
-                        "passions": ["climbing"],
-                        "hobbies": ["camping", "hiking", "rock climbing", "photography"],
-                        "contact_info": {"name": "Phoebe Troup-Galligan"}
-                    }
-                else:
-                    profile_data = {
-                        "bio": "",
-                        "interests": [],
-                        "passions": [],
-                        "hobbies": [],
-                        "skills": [],
-                        "contact_info": {"name": "User"}
+        def load_room_and_history():
+            # Find or create AI chat room for this user
+            apply_statement_timeout(db, deadline)
+            ai_room = db.query(Room).join(RoomParticipant).filter(
+                RoomParticipant.user_id == user_id,
+                Room.room_metadata['type'].astext == 'ai_chat'
+            ).first()
+
+            if not ai_room:
+                # Create new AI chat room
+                ai_room = Room(
+                    name=f"AI Chat - {current_user.contact_info.get('name', 'User') if current_user.contact_info else 'User'}",
+                    room_metadata={
+                        "type": "ai_chat",
+                        "model": settings.CHAT_MODEL,
+                        "created_by": str(user_id)
                     }
+                )
+                db.add(ai_room)
+                db.flush()
 
-        # Handle simple utility queries first
-        message_lower = request.message.lower()
+                # Add user as participant
+                user_participant = RoomParticipant(
+                    room_id=ai_room.id,
+                    user_id=user_id
+                )
+                db.add(user_participant)
 
-        # Handle time requests
-        if any(keyword in message_lower for keyword in ['time', 'clock', 'what time', 'current time']):
-            from app.services.realtime_service import realtime_service
+                # Add AI bot as participant
+                ai_participant = RoomParticipant(
+                    room_id=ai_room.id,
+                    user_id=settings.AI_BOT_USER_ID
+                )
+                db.add(ai_participant)
+                db.commit()
 
-            # Get user's location from profile data for timezone detection
-            user_location = None
-            if profile_data:
-                user_location = profile_data.get('location')
+            # Save user message to conversation history
+            user_message = Message(
+                room_id=ai_room.id,
+                user_id=user_id,
+                content=request.message
+            )
+            db.add(user_message)
+            db.commit()
+
+            # Get conversation history for context
+            apply_statement_timeout(db, deadline)
+            history = db.query(Message).filter(
+                Message.room_id == ai_room.id
+            ).order_by(Message.created_at).limit(20).all()
+
+            return ai_room, history
+
+        try:
+            with deadline.stage("db:room_and_history"):
+                # Not abandoned on disconnect: the thread uses the request's session
+                ai_room, history = await run_sync_to_completion(load_room_and_history)
 
-            # Get time information, extracting location from message if specified
-            time_info = await realtime_service.get_time_for_location_query(request.message, user_location)
+            if profile_task is not None:
+                with deadline.stage("profile_fetch"):
+                    profile_data = await profile_task
+        finally:
+            if profile_task is not None and not profile_task.done():
+                profile_task.cancel()
 
-            # Build response based on whether it's a specific location query
-            if time_info.get('is_specific_query'):
-                query_location = time_info.get('query_location')
-                time_str = f"{time_info['current_time']} on {time_info['current_date']}"
-                message = f"The current time in {query_location} is {time_str}."
+        if not profile_data:
+            # Fallback to known data for this user
+            if user_id == "a90f0ea5-ba98-44f5-a3a7-a922db9e1523":
+                profile_data = {
+                    "bio": "I love climbing",
+                    "interests": ["climbing"],
+                    "passions": ["climbing"],
+                    "hobbies": ["camping", "hiking", "rock climbing", "photography"],
+                    "contact_info": {"name": "Phoebe Troup-Galligan"}
+                }
             else:
-                time_str = f"{time_info['current_time']} on {time_info['current_date']}"
-                message = f"The current time is {time_str}."
+                profile_data = {
+                    "bio": "",
+                    "interests": [],
+                    "passions": [],
+                    "hobbies": [],
+                    "skills": [],
+                    "contact_info": {"name": "User"}
+                }
 
+        # Time, weather, profile, Joins and connections questions skip the model
+        fast_reply = await fast_path.answer(request.message, profile_data=profile_data, user_id=user_id, db=db)
+        if fast_reply:
             return EnhancedChatResponse(
-                message=message,
-                intent="time_inquiry",
-                confidence=0.95,
+                message=fast_reply.message,
+                intent=fast_reply.intent,
+                confidence=fast_reply.confidence,
                 actions=[],
                 suggested_strings=[],
                 suggested_connections=[],
                 suggested_joins=[],
-                tokens=len(message.split()),
-                cost=0.0001
+                tokens=0,
+                cost=0.0
             )
 
         # Handle sports/events queries with enhanced real-time data
-        sports_keywords = ['nba games', 'nfl games', 'mlb games', 'nhl games', 'games today', 'games tonight', 'sports', 'basketball games', 'football games', 'baseball games', 'hockey games']
-        if any(keyword in message_lower for keyword in sports_keywords):
-            from app.services.realtime_service import realtime_service
-
+        match = match_message(request.message)
+        if match.has('sports_query'):
             # Determine sport type from message
-            sport_type = None
-            if 'nba' in message_lower or 'basketball' in message_lower:
-                sport_type = 'nba'
-            elif 'nfl' in message_lower or 'football' in message_lower:
-                sport_type = 'nfl'
-            elif 'mlb' in message_lower or 'baseball' in message_lower:
-                sport_type = 'mlb'
-            elif 'nhl' in message_lower or 'hockey' in message_lower:
-                sport_type = 'nhl'
+            sport_type = match.sport
 
             try:
-                sports_events = await realtime_service.get_sports_events(sport_type, limit=5)
-
-                if sports_events and sports_events[0].get('event_type') != 'sports_fallback':
+                # Pre-sorted snapshots from the background poller; only a cold store waits on ESPN
+                games = await sports_scoreboard.buckets(sport_type)
+                # Same five-game budget as before, live games first
+                live_games = games['live'][:5]
+                upcoming_games = games['upcoming'][:5 - len(live_games)]
+                completed_games = games['completed'][:5 - len(live_games) - len(upcoming_games)]
+
+                if live_games or upcoming_games or completed_games:
                     # Format real sports data
                     events_text = ""
-                    live_games = []
-                    upcoming_games = []
-                    completed_games = []
-
-                    for event in sports_events:
-                        status = event.get('status', '').lower()
-                        if status in ['in', 'live']:
-                            live_games.append(event)
-                        elif status in ['final', 'completed']:
-                            completed_games.append(event)
-                        else:
-                            upcoming_games.append(event)
 
                     # Build response with live games first
                     if live_games:
@@ -2505,92 +2095,6 @@ async def lifestring_ai_chat(
                     cost=0.0001
                 )
 
-        # Handle profile-specific queries
-        if "passions" in message_lower or "interests" in message_lower or "hobbies" in message_lower:
-            if profile_data:
-                interests = profile_data.get('interests', []) or []
-                passions = profile_data.get('passions', []) or []
-                hobbies = profile_data.get('hobbies', []) or []
-                bio = profile_data.get('bio', '') or ''
-
-                # If asking specifically about passions
-                if "passions" in message_lower:
-                    if passions:
-                        passions_text = ", ".join(passions)
-                        message = f"Based on your profile, your passions include: {passions_text}!"
-                        if bio:
-                            message += f" Your bio says: '{bio}'"
-                        message += " Would you like to explore these passions further or connect with others who share them?"
-                    else:
-                        message = "I don't see any passions listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return EnhancedChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        actions=[],
-                        suggested_strings=[],
-                        suggested_connections=[],
-                        suggested_joins=[],
-                        tokens=50,
-                        cost=0.0001
-                    )
-
-                # If asking specifically about hobbies
-                if "hobbies" in message_lower:
-                    if hobbies:
-                        hobbies_text = ", ".join(hobbies)
-                        message = f"Based on your profile, your hobbies include: {hobbies_text}."
-                    else:
-                        message = "I don't see any hobbies listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                    return EnhancedChatResponse(
-                        message=message,
-                        intent="profile_inquiry",
-                        confidence=0.95,
-                        actions=[],
-                        suggested_strings=[],
-                        suggested_connections=[],
-                        suggested_joins=[],
-                        tokens=50,
-                        cost=0.0001
-                    )
-
-                # For interests query
-                all_interests = list(set(interests + passions))
-                if all_interests:
-                    interests_text = ", ".join(all_interests)
-                    message = f"Based on your profile, I can see you're interested in: {interests_text}!"
-                    if bio:
-                        message += f" Your bio says: '{bio}'"
-                    message += " Would you like to explore these interests further or connect with others who share them?"
-                else:
-                    message = "I don't see any specific interests listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
-
-                return EnhancedChatResponse(
-                    message=message,
-                    intent="profile_inquiry",
-                    confidence=0.95,
-                    actions=[],
-                    suggested_strings=[],
-                    suggested_connections=[],
-                    suggested_joins=[],
-                    tokens=100,
-                    cost=0.0002
-                )
-            else:
-                return EnhancedChatResponse(
-                    message="I'm having trouble accessing your profile right now. You can add interests and hobbies in your profile settings to help me provide personalized suggestions!",
-                    intent="profile_inquiry",
-                    confidence=0.8,
-                    actions=[],
-                    suggested_strings=[],
-                    suggested_connections=[],
-                    suggested_joins=[],
-                    tokens=50,
-                    cost=0.0001
-                )
-
         # For other messages, use enhanced OpenAI with real-time capabilities and personalized context
         from datetime import datetime
         import json
@@ -2603,109 +2107,7 @@ async def lifestring_ai_chat(
 
         # Get current time in user's timezone
         time_info = await realtime_service.get_current_time(user_location)
-        system_prompt = f"""You are Strings, Lifestring's AI assistant. The current time is {time_info['current_time']} on {time_info['current_date']}.
-
-You are having a conversation with a user on Lifestring. Here's how Lifestring works:
-
-**YOU ARE STRINGS**: You are the AI that users chat with about what they want to do and who they want to meet.
-
-**JOINS**: These are ongoing interest-based groups/communities where people with shared interests connect and organize activities together. Joins are integrated directly into the main Strings interface - there is NO separate "Joins section". When users ask about finding groups or communities, recommend ONE relevant Join they can find in their main Strings feed.
-
-**CONNECTIONS**: This is how users find friends - they get recommended people based on interests, location, and age. When users want to meet people, direct them to check their Connections.
-
-**IMPORTANT UI STRUCTURE**:
-- Joins are NOT in a separate section - they appear as cards in the main Strings interface
-- NEVER say "you can find this event under the Joins section" or similar
-- Instead say "you can find this event in your Strings feed" or "look for this in your main Strings interface"
-
-**YOUR APPROACH**:
-1. Answer general questions naturally (weather, time, jokes, etc.) using real-time data - but ONLY respond with time when specifically asked "what time is it"
-2. When users ask about finding groups, communities, or people with shared interests, recommend ONE relevant Join they can find in their Strings feed
-3. When users want to meet people or make friends, direct them to their Connections where they'll find recommended people
-4. Have natural conversations about their interests and goals
-5. NEVER mention external platforms like Meetup, Facebook, etc.
-6. Focus on Lifestring's features: Joins for communities, Connections for meeting people
-7. NEVER mention a "Joins section" - joins are integrated into the main Strings interface
-8. ONLY suggest ONE Join when user asks for groups, communities, or shared interest activities
-9. When suggesting a Join, ALWAYS mention the specific group name, what it's about, and include details about the creator so users can connect with them
-10. Format Join suggestions like: "I'd recommend the [Group Name] in [Location]. This is a community for [description]. It was created by [Creator Name], who [creator bio/background]. You can find this group in your Strings feed."
-11. ALWAYS match Join suggestions to user's location - Salt Lake City gets Utah groups, San Francisco gets Bay Area groups
-12. SPECIAL RULE FOR HIKING: When users ask about "finding people who like hiking" or similar, ALWAYS suggest a hiking group join and provide full details about the group creator
-
-**IMPORTANT**: When users ask about groups or communities on Lifestring, you will be provided with specific join recommendations in the system prompt. Prioritize recommending these specific joins. However, when users ask about real-time events, activities, or things happening in specific locations, you can use your Google Search capabilities to provide current, accurate information about events, activities, and happenings in their requested location.
-
-**SMART CATEGORIZATION**: Automatically understand activity types from context:
-- Hiking, camping, surfing → Outdoor Adventures
-- Cooking, wine tasting, food tours → Culinary Experiences
-- Photography, art, music → Creative Activities
-- Volleyball, tennis, running → Active Sports
-- Book clubs, lectures, discussions → Intellectual Pursuits
-- Yoga, meditation, wellness → Wellness & Mindfulness
-- Parties, meetups, social events → Social Experiences
-- Gym, climbing, fitness classes → Fitness Challenges
-
-**PROFILE UPDATES**: You can help users update their profile information directly from the chat. When users mention:
-
-**HOBBIES**: Listen for phrases like:
-- "Climbing is a hobby of mine" → Use add_hobbies with ["climbing"]
-- "I love photography" → Use add_hobbies with ["photography"]
-- "I enjoy hiking and biking" → Use add_hobbies with ["hiking", "biking"]
-- "My hobbies include..." → Use add_hobbies function
-- "I'm into..." → Use add_hobbies function
-
-**INTERESTS**: Listen for phrases like:
-- "I'm interested in art" → Use add_interests with ["art"]
-- "I love music and movies" → Use add_interests with ["music", "movies"]
-- "I'm passionate about cooking" → Use add_interests with ["cooking"]
-- "I really enjoy..." → Use add_interests function
-
-**SKILLS**: Listen for phrases like:
-- "I know how to code" → Use add_skills with ["coding"]
-- "I'm good at guitar" → Use add_skills with ["guitar"]
-- "I can speak Spanish" → Use add_skills with ["Spanish"]
-- "I'm skilled in..." → Use add_skills function
-
-**LOCATION**: Listen for phrases like:
-- "I moved to Seattle" → Use update_profile_location with "Seattle"
-- "I live in New York now" → Use update_profile_location with "New York"
-- "I'm based in..." → Use update_profile_location function
-
-**BIO**: Listen for phrases like:
-- "Update my bio to..." → Use update_bio function
-- "Change my description to..." → Use update_bio function
-
-ALWAYS call the appropriate function when users mention these things, then confirm the update was successful and be natural about it.
-
-**JOINS/ACTIVITIES**: You MUST suggest joins/activities ONLY when users specifically ask to JOIN ongoing activities or groups. When users ask about:
-- "I want to join a hiking group": IMMEDIATELY call suggest_joins_for_activity with "hiking" and user's location
-- "Find me hikers to join": IMMEDIATELY call suggest_joins_for_activity with "hiking" and user's location
-- "Looking for climbing communities to join": ALWAYS use suggest_joins_for_activity with "climbing" as activity and user's location
-- "I want to find people to go boating with": IMMEDIATELY call suggest_joins_for_activity with "boating" and user's location
-- "I want to find groups for [activity]": ALWAYS use suggest_joins_for_activity function with user's location
-- "Find me people who like [activity]": ALWAYS use suggest_joins_for_activity function with user's location
-- "Looking for [activity] communities": ALWAYS use suggest_joins_for_activity function with user's location
-- Specifically wanting to JOIN ongoing activities: ALWAYS use suggest_joins_for_activity function with user's location
-
-**CRITICAL**: ALWAYS pass the user's location when calling suggest_joins_for_activity to ensure location-appropriate suggestions.
-
-**DO NOT** suggest joins for:
-- General event requests like "what should I do tonight" or "I want to see an event"
-- One-time event questions like "what's happening tonight"
-- Entertainment requests like "I want to watch a football game"
-- General activity suggestions that don't involve joining ongoing groups
-
-For general events and entertainment, use your real-time knowledge to suggest current events, shows, games, etc.
-
-**PEOPLE SUGGESTIONS**: You can suggest people for users to connect with based on shared interests. When users ask about:
-- Finding people with similar interests: Use suggest_people_to_connect function
-- Meeting people who share hobbies: Use suggest_people_to_connect function
-- Connecting with others in their area: Include location in suggest_people_to_connect function
-- Finding friends or connections: Use suggest_people_to_connect function
-When suggesting people, mention their common interests and encourage the user to connect.
-
-**JOINS WITH CREATORS**: When you suggest joins/activities, also suggest connecting with the people who created them. If a join was created by someone (like "Sarah Rodriguez created this climbing group"), use suggest_people_to_connect to find that person and similar people so users can connect with the join creators and others with similar interests.
-
-**REMEMBER**: You are Strings - the conversational AI. Users chat with you, and you help them discover Joins and Connections on Lifestring."""
+        profile = ""
 
         if profile_data:
             interests = profile_data.get('interests', []) or []
@@ -2762,29 +2164,22 @@ When suggesting people, mention their common interests and encourage the user to
                         profile_context.append(f"  A: {answer}")
 
             # Always include the user's name in the system prompt
-            system_prompt += f"\n\nYou're talking to {name}."
+            profile += f"\n\nYou're talking to {name}."
 
             if profile_context:
-                system_prompt += f" Here's their profile:\n" + "\n".join(profile_context)
-                system_prompt += "\n\nUse this profile information to provide personalized recommendations, especially when they ask about activities, weather-related suggestions, or local events. Consider their location, age, interests, and hobbies when making suggestions."
+                profile += f" Here's their profile:\n" + "\n".join(profile_context)
+                profile += "\n\nUse this profile information to provide personalized recommendations, especially when they ask about activities, weather-related suggestions, or local events. Consider their location, age, interests, and hobbies when making suggestions."
         else:
-            system_prompt += "\n\nBe friendly and helpful. If the user mentions interests, encourage them to add them to their profile for more personalized suggestions."
-
-        # Use enhanced OpenAI service with real-time capabilities
-        messages = [{"role": "system", "content": system_prompt}]
-
-        # Add conversation history (excluding the current message we just saved)
-        for msg in history[:-1]:  # Exclude the last message (current user message)
-            role = "assistant" if str(msg.user_id) == settings.AI_BOT_USER_ID else "user"
-            messages.append({"role": role, "content": msg.content})
+            profile += "\n\nBe friendly and helpful. If the user mentions interests, encourage them to add them to their profile for more personalized suggestions."
 
         # Extract potential joins from user message to include in system prompt
+        join_prompt_addition = ""
         potential_joins = extract_joins_from_response("", request.message, profile_data)
         logger.info(f"🔍 AUTHENTICATED ENDPOINT - Found {len(potential_joins) if potential_joins else 0} potential joins")
         if potential_joins:
             join_info = potential_joins[0]  # Only use the first/most relevant join
             logger.info(f"🔍 AUTHENTICATED ENDPOINT - Using join: {join_info['title']} by {join_info['user']['name']}")
-            system_prompt += f"""
+            join_prompt_addition = f"""
 
 **RECOMMENDED JOIN FOR THIS CONVERSATION:**
 You should recommend the "{join_info['title']}" group in {join_info['location']}.
@@ -2801,8 +2196,21 @@ DO NOT mention "Strings feed" or any other location - the join card will appear
 DO NOT include the full bio in your text response - the join card will display that information.
 DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention the specific group name and creator name only."""
 
-            # Update the system message in the messages array with the modified prompt
-            messages[0] = {"role": "system", "content": system_prompt}
+        # Static instructions first so the prefix stays cacheable; time, profile and join follow
+        system_prompt = LIFESTRING_CHAT_PROMPT.render(
+            current_time=time_info['current_time'],
+            current_date=time_info['current_date'],
+            profile=profile,
+            joins=join_prompt_addition
+        )
+
+        # Use enhanced OpenAI service with real-time capabilities
+        messages = [{"role": "system", "content": system_prompt}]
+
+        # Add conversation history (excluding the current message we just saved)
+        for msg in history[:-1]:  # Exclude the last message (current user message)
+            role = "assistant" if str(msg.user_id) == settings.AI_BOT_USER_ID else "user"
+            messages.append({"role": role, "content": msg.content})
 
         # Add current user message
         messages.append({"role": "user", "content": request.message})
@@ -2811,77 +2219,67 @@ DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention t
         tools = realtime_service.get_available_functions() if realtime_service else None
         logger.info(f"Authenticated endpoint using enhanced OpenAI service with tools: {tools is not None}")
 
-        # Get AI response with function calling capability
-        response = await openai_service.chat_completion(
-            messages=messages,
-            tools=tools,
-            model=settings.CHAT_MODEL,
-            max_tokens=500,
-            temperature=0.7
+        # Speculatively start the tool calls the model is likely to make for this query
+        query_type = hybrid_ai_service._classify_query(messages).value if hybrid_ai_service else None
+        # Tool results are memoized per conversation (the client's conversation_id, else the user)
+        conversation_id = (request.context or {}).get('conversation_id')
+        prefetch = speculative_prefetcher.start(
+            query_type, request.message, user_location, user_id, token,
+            deadline=deadline, conversation_id=conversation_id
         )
 
-        # Handle function calls if present
-        joins = []
-        people = []
-
-        if response.get("tool_calls"):
-            logger.info(f"Processing {len(response['tool_calls'])} function calls")
-
-            for tool_call in response["tool_calls"]:
-                function_name = tool_call["function"]["name"]
-                arguments = json.loads(tool_call["function"]["arguments"])
-
-                logger.info(f"🔧 FUNCTION CALL: {function_name} with args: {arguments}")
-                logger.info(f"🔧 USER_ID: {user_id}, TOKEN: {'present' if token else 'missing'}")
-
-                # Execute the function (pass user_id and token for profile updates)
-                function_result = await realtime_service.execute_function(function_name, arguments, user_id, token) if realtime_service else {"error": "Real-time service not available"}
-
-                logger.info(f"🔧 FUNCTION RESULT: {function_result}")
-
-                # Extract joins and people from function results
-                if function_result.get("success") and function_name == "suggest_joins_for_activity":
-                    joins.extend(function_result.get("joins", []))
-                    people.extend(function_result.get("people", []))
-                elif function_result.get("success") and function_name == "suggest_people_to_connect":
-                    people.extend(function_result.get("people", []))
-
-                # Add function result to messages
-                messages.append({
-                    "role": "assistant",
-                    "content": response["content"],
-                    "tool_calls": [
-                        {
-                            "id": tc["id"],
-                            "type": "function",
-                            "function": tc["function"]
-                        }
-                        for tc in response["tool_calls"]
-                    ]
-                })
-
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call["id"],
-                    "content": json.dumps(function_result)
-                })
-
-            # Get final response with function results
-            final_response = await openai_service.chat_completion(
-                messages=messages,
-                model="gpt-4o",
-                max_tokens=500,
-                temperature=0.7
+        async def complete(messages, tools):
+            # Every call, the first included, starts on the cheap tier; the hybrid
+            # cascade escalates empty or refused answers
+            if hybrid_ai_service:
+                return await hybrid_ai_service.chat_completion(
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7,
+                    tools=tools,
+                    force_model=ModelChoice.GPT,
+                    deadline=deadline
+                )
+            return await deadline.run(
+                "llm:openai",
+                openai_service.chat_completion(
+                    messages=messages,
+                    tools=tools,
+                    model=settings.CHAT_MODEL,
+                    max_tokens=500,
+                    temperature=0.7
+                ),
+                cap=settings.LLM_CALL_TIMEOUT
             )
 
-            ai_response = final_response.get("content") or "I've processed your request successfully."
+        try:
+            # Get AI response with function calling capability
+            response = await complete(messages, tools)
+
+            # Run the requested tools (pass user_id and token for profile updates), reusing
+            # speculative results, until the model answers or the budget is nearly spent
+            turn = await agent_loop.run(
+                messages, complete, realtime_service.tools if realtime_service else None,
+                context=ToolContext(user_id, token, deadline, conversation_id),
+                tools=tools, first_response=response, prefetch=prefetch
+            )
+        finally:
+            prefetch.discard()
+
+        if turn.tool_results:
+            # Extract joins and people from function results
+            joins = turn.collect("suggest_joins_for_activity", "joins")
+            people = turn.collect("suggest_joins_for_activity", "people") + turn.collect("suggest_people_to_connect", "people")
+            ai_response = turn.content or "I've processed your request successfully."
         else:
-            ai_response = response.get("content") or "I'm here to help!"
+            people = []
+            ai_response = turn.content or "I'm here to help!"
             # Fallback to old extraction method if no function calls
             joins = extract_joins_from_response(ai_response, request.message, profile_data)
 
         # Save AI response to conversation history (with error handling)
         try:
+            apply_statement_timeout(db, deadline)
             ai_message = Message(
                 room_id=ai_room.id,
                 user_id=settings.AI_BOT_USER_ID,
@@ -2895,9 +2293,17 @@ DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention t
         # Update conversation memory with user preferences (async, don't block response)
         # Skip if database is not available
         try:
-            if db:  # Only try if we have a valid database session
+            if db and not deadline.allows_optional():
+                deadline.skip("conversation_memory")
+            elif db:  # Only try if we have a valid database session
                 from app.services.conversation_memory_service import conversation_memory_service
-                await conversation_memory_service.update_user_memory(db, user_id, str(ai_room.id), profile_data or {})
+                # Memory extraction yields to live chat traffic under load
+                with admission_priority(Priority.BACKGROUND):
+                    await deadline.run(
+                        "conversation_memory",
+                        conversation_memory_service.update_user_memory(db, user_id, str(ai_room.id), profile_data or {}),
+                        cap=settings.LLM_CALL_TIMEOUT
+                    )
         except Exception as e:
             logger.error(f"Error updating conversation memory (non-critical): {e}")
 
@@ -2916,12 +2322,13 @@ DO NOT mention Connections feature. DO NOT give generic advice. ALWAYS mention t
             suggested_connections=[],
             suggested_joins=joins,
             people=people,  # Add people to response
-            tokens=response.get("tokens", 500),
-            cost=response.get("cost", 0.001)
+            tokens=turn.tokens,
+            cost=turn.cost
         )
 
-    except HTTPException:
-        # Re-raise HTTP exceptions (like 401 Unauthorized) so they return proper status codes
+    except (HTTPException, AdmissionRejected):
+        # Re-raise HTTP exceptions (like 401 Unauthorized) and load shedding (503)
+        # so they return proper status codes
         raise
     except Exception as e:
         print(f"Error in lifestring_ai_chat: {e}")
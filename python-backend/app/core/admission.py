@@ -0,0 +1,213 @@
+"""
+Priority admission control for LLM provider calls.
+
+Each provider has a concurrency limit. Calls beyond it wait in a bounded
+queue per priority class; freed slots always go to the highest-priority
+waiter, so a burst of public traffic cannot starve logged-in users. When a
+class's queue is full (or a waiter gives up after ADMISSION_MAX_WAIT_SECONDS)
+the call fails fast with ``AdmissionRejected``, which the app turns into a
+503 with a Retry-After header.
+
+The priority class travels with the request in a context variable: public
+endpoints call ``set_request_priority(Priority.PUBLIC)`` and background
+work runs inside ``admission_priority(Priority.BACKGROUND)``.
+"""
+import asyncio
+import bisect
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEPTH_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Priority(IntEnum):
+    """Admission classes; lower values are served first."""
+    AUTHENTICATED = 0
+    PUBLIC = 1
+    BACKGROUND = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a provider call is shed instead of queued."""
+
+    def __init__(self, provider: str, priority: Priority, retry_after: int, reason: str):
+        self.provider = provider
+        self.priority = priority
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"{provider} is at capacity for {priority.label} requests ({reason})")
+
+
+_request_priority: ContextVar[Priority] = ContextVar("admission_priority", default=Priority.AUTHENTICATED)
+
+
+def set_request_priority(priority: Priority) -> None:
+    """Set the admission class for the rest of the current request."""
+    _request_priority.set(priority)
+
+
+@contextmanager
+def admission_priority(priority: Priority) -> Iterator[None]:
+    """Run a block (and tasks it starts) under a different admission class."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            cumulative[bound] = running
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.total, 4)}
+
+
+class ProviderAdmission:
+    """Concurrency limit plus per-priority wait queues for one provider."""
+
+    def __init__(self, provider: str, limit: int):
+        self.provider = provider
+        self.limit = limit
+        self.active = 0
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self._wait_ewma: Optional[float] = None
+
+        self.admitted: Dict[str, int] = {priority.label: 0 for priority in Priority}
+        self.rejected: Dict[str, int] = {priority.label: 0 for priority in Priority}
+        self.wait_seconds = {priority.label: Histogram(WAIT_BUCKETS) for priority in Priority}
+        self.queue_depth = {priority.label: Histogram(DEPTH_BUCKETS) for priority in Priority}
+
+    @staticmethod
+    def _queue_limit(priority: Priority) -> int:
+        return {
+            Priority.AUTHENTICATED: settings.ADMISSION_QUEUE_AUTHENTICATED,
+            Priority.PUBLIC: settings.ADMISSION_QUEUE_PUBLIC,
+            Priority.BACKGROUND: settings.ADMISSION_QUEUE_BACKGROUND,
+        }[priority]
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._wait_ewma or 1.0))
+
+    def _admit(self, priority: Priority, waited: float) -> None:
+        self.admitted[priority.label] += 1
+        self.wait_seconds[priority.label].observe(waited)
+        self._wait_ewma = waited if self._wait_ewma is None else 0.2 * waited + 0.8 * self._wait_ewma
+
+    def _reject(self, priority: Priority, reason: str) -> AdmissionRejected:
+        self.rejected[priority.label] += 1
+        logger.warning(f"Shedding {priority.label} {self.provider} call: {reason}")
+        return AdmissionRejected(self.provider, priority, self._retry_after(), reason)
+
+    async def acquire(self, priority: Priority) -> None:
+        """
+        Take a concurrency slot, waiting in the priority queue if needed.
+
+        Raises:
+            AdmissionRejected: if the class's queue is full or the wait times out
+        """
+        ahead = any(self._queues[p] for p in Priority if p <= priority)
+        if self.active < self.limit and not ahead:
+            self.active += 1
+            self.queue_depth[priority.label].observe(0)
+            self._admit(priority, 0.0)
+            return
+
+        queue = self._queues[priority]
+        self.queue_depth[priority.label].observe(len(queue) + 1)
+        if len(queue) >= self._queue_limit(priority):
+            raise self._reject(priority, "queue full")
+
+        future = asyncio.get_event_loop().create_future()
+        queue.append(future)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=settings.ADMISSION_MAX_WAIT_SECONDS)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            elif future in queue:
+                queue.remove(future)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(priority, "wait timed out")
+            raise
+        self._admit(priority, time.monotonic() - started)
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the highest-priority waiter."""
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self.active = max(0, self.active - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": {priority.label: len(self._queues[priority]) for priority in Priority},
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "wait_seconds": {label: histogram.snapshot() for label, histogram in self.wait_seconds.items()},
+            "queue_depth": {label: histogram.snapshot() for label, histogram in self.queue_depth.items()},
+        }
+
+
+class AdmissionController:
+    """Per-provider admission, keyed by provider name ("openai", "gemini")."""
+
+    def __init__(self):
+        self._providers: Dict[str, ProviderAdmission] = {}
+
+    def _get(self, provider: str) -> ProviderAdmission:
+        if provider not in self._providers:
+            limits = {"openai": settings.OPENAI_MAX_CONCURRENCY, "gemini": settings.GEMINI_MAX_CONCURRENCY}
+            self._providers[provider] = ProviderAdmission(provider, limits.get(provider, settings.OPENAI_MAX_CONCURRENCY))
+        return self._providers[provider]
+
+    async def acquire(self, provider: str, priority: Optional[Priority] = None) -> None:
+        await self._get(provider).acquire(priority if priority is not None else _request_priority.get())
+
+    def release(self, provider: str) -> None:
+        self._get(provider).release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: admission.snapshot() for name, admission in sorted(self._providers.items())}
+
+
+# Global instance
+admission_controller = AdmissionController()
@@ -0,0 +1,99 @@
+"""
+Client disconnect detection for long-running chat requests.
+
+Runs a request handler as a task and cancels it as soon as the HTTP client
+goes away, so in-flight provider calls, tool tasks and queued executor work
+stop consuming capacity that live users need.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before the response was ready."""
+
+
+class CancellationStats:
+    """Counts work cancelled because the client disconnected."""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    def record(self, label: str) -> None:
+        self._counts[label] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "total": sum(self._counts.values()),
+            "by_route": dict(self._counts),
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+async def run_until_disconnect(request: Request, coro: Awaitable[Any], label: str) -> Any:
+    """
+    Await ``coro`` while polling the client connection.
+
+    If the client disconnects first, the task running ``coro`` is cancelled.
+    Cancellation propagates into awaited OpenAI/Gemini/httpx/aiohttp calls and
+    into ``run_in_executor`` futures that have not started yet. Executor jobs
+    that are already running cannot be interrupted; ones that use the
+    request's database session go through ``run_sync_to_completion`` so the
+    session is not closed under them.
+
+    Raises:
+        ClientDisconnected: if the client went away before ``coro`` finished
+    """
+    task = asyncio.ensure_future(coro)
+    interval = settings.CLIENT_DISCONNECT_POLL_INTERVAL
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    logger.debug(f"Cancelled {label} task raised while unwinding: {e}")
+
+                cancellation_stats.record(label)
+                logger.info(f"Client disconnected, cancelled in-flight work for {label}")
+                raise ClientDisconnected(label)
+    finally:
+        # The handler itself may be cancelled by the server; never leak the task
+        if not task.done():
+            task.cancel()
+
+
+async def run_sync_to_completion(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking function in the threadpool and, if cancelled, wait for it
+    to finish before re-raising.
+
+    For work on the request's SQLAlchemy Session: the session is closed by
+    dependency teardown as soon as the handler returns, and a Session is not
+    thread-safe, so a disconnect must not return while a thread still uses it.
+    """
+    job = asyncio.ensure_future(run_in_threadpool(func, *args))
+    try:
+        return await asyncio.shield(job)
+    except asyncio.CancelledError:
+        await asyncio.wait({job})
+        raise
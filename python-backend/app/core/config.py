@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -31,16 +31,62 @@ class Settings(BaseSettings):
     CHAT_MODEL: str = "gpt-4o"  # Primary model
     CHAT_MODEL_FALLBACK: str = "gpt-4o-mini"  # Fallback model for cost efficiency
     CHAT_MODEL_PREMIUM: str = "gpt-4o"  # Premium model for complex queries
+    MODEL_CASCADE_ENABLED: bool = os.getenv("MODEL_CASCADE_ENABLED", "true").lower() == "true"  # Cheap tier first, escalate on rejection
+    CASCADE_MIN_CONFIDENCE: float = 0.6  # Structured answers below this self-reported confidence escalate
+    OPENAI_API_KEYS: str = os.getenv("OPENAI_API_KEYS", "")  # Extra comma-separated keys for the credential pool
 
     # Google Gemini (Alternative AI provider)
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     GEMINI_MODEL: str = "gemini-2.5-flash"  # Fast/cheap version (Gemini 3 equivalent)
     GEMINI_MODEL_FLASH: str = "gemini-2.5-flash"  # Fast/cheap version
+    GOOGLE_API_KEYS: str = os.getenv("GOOGLE_API_KEYS", "")  # Extra comma-separated keys for the credential pool
+    GEMINI_KEY_RPM_LIMIT: int = 1000  # Per-key limits used to estimate headroom (Gemini sends no rate-limit headers)
+    GEMINI_KEY_TPM_LIMIT: int = 1000000
+
+    # Explicit Gemini context caching of the static system prompt templates (per API key)
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+    GEMINI_CONTEXT_CACHE_REFRESH_SECONDS: float = 300.0  # Extend the TTL once less than this remains
+    GEMINI_CONTEXT_CACHE_RETRY_SECONDS: float = 300.0  # Back-off after a failed cache create
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS: int = 1024  # Provider minimum for explicit caches (2.5 Flash)
+    GEMINI_CACHED_INPUT_PRICE_FACTOR: float = 0.25  # Cached input tokens cost this share of the input rate
+
+    # Credential pools
+    CREDENTIAL_RATE_LIMIT_BACKOFF: float = 20.0  # Seconds a key rests after a 429 without Retry-After
 
     # AI Model Strategy
     USE_GEMINI_FOR_REALTIME: bool = os.getenv("USE_GEMINI_FOR_REALTIME", "true").lower() == "true"
     USE_GEMINI_FOR_EVENTS: bool = os.getenv("USE_GEMINI_FOR_EVENTS", "true").lower() == "true"
 
+    # Local intent classifier for query routing; keyword rules are used when the
+    # model file (relative paths are under python-backend/) is missing or unsure
+    INTENT_CLASSIFIER_ENABLED: bool = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+    INTENT_MODEL_PATH: str = os.getenv("INTENT_MODEL_PATH", "app/data/intent_model.npz")
+    INTENT_MIN_CONFIDENCE: float = 0.6
+
+    # Adaptive routing: "static" keeps keyword routing, "cheapest" picks the lowest-cost
+    # provider meeting the p95/error targets, "fastest" picks the lowest EWMA latency
+    ROUTING_OBJECTIVE: str = os.getenv("ROUTING_OBJECTIVE", "cheapest")
+    ROUTING_P95_TARGET_SECONDS: float = 8.0
+    ROUTING_MAX_ERROR_RATE: float = 0.25
+    ROUTING_EWMA_ALPHA: float = 0.2
+    ROUTING_LATENCY_WINDOW: int = 50  # Recent calls kept per provider/query type for percentiles
+    ROUTING_MIN_SAMPLES: int = 5  # Below this, stats are not trusted for routing
+    ROUTING_STATS_MAX_AGE: float = 30.0  # Seconds before a steered-away provider is probed again
+
+    # Hedged requests: race a backup provider when the chosen one is slower than usual
+    HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+    HEDGE_DELAY_PERCENTILE: float = 95.0  # Hedge once the primary exceeds this latency percentile
+    HEDGE_DEFAULT_DELAY_SECONDS: float = 4.0  # Used until there are enough latency samples
+    HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    HEDGE_MAX_FRACTION: float = 0.1  # At most this share of recent requests may be hedged
+    HEDGE_BUDGET_WINDOW: int = 200
+
+    # Circuit breakers per provider/model and around Gemini grounding search
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before a breaker opens
+    CIRCUIT_RECOVERY_SECONDS: float = 30.0  # Time open before probe traffic is allowed
+    CIRCUIT_HALF_OPEN_PROBES: int = 1  # Concurrent probe requests while half-open
+
     # External APIs for real-time data
     OPENWEATHER_API_KEY: str = os.getenv("OPENWEATHER_API_KEY", "demo_key_please_replace")
     NEWSAPI_KEY: str = os.getenv("NEWSAPI_KEY", "demo_key_please_replace")
@@ -48,6 +94,113 @@ class Settings(BaseSettings):
     EVENTBRITE_API_KEY: str = os.getenv("EVENTBRITE_API_KEY", "")
     TICKETMASTER_API_KEY: str = os.getenv("TICKETMASTER_API_KEY", "")
 
+    # Request lifecycle
+    CLIENT_DISCONNECT_POLL_INTERVAL: float = 0.5  # Seconds between client disconnect checks
+    CHAT_REQUEST_DEADLINE: float = float(os.getenv("CHAT_REQUEST_DEADLINE", "25"))  # Total budget per chat request
+    DEADLINE_OPTIONAL_MIN_SECONDS: float = 4.0  # Optional work is skipped below this remaining budget
+    LLM_CALL_TIMEOUT: float = 20.0  # Per-call cap; actual timeout is min(cap, remaining budget)
+    TOOL_CALL_TIMEOUT: float = 8.0
+    PROFILE_FETCH_TIMEOUT: float = 5.0
+    DB_STATEMENT_TIMEOUT: float = 3.0
+
+    # Tool result memoization; per-tool freshness is declared in RealtimeService._register_tools
+    TOOL_CACHE_ENABLED: bool = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+    TOOL_CACHE_MAX_ENTRIES: int = 2000  # Shared (global) results kept across users
+    TOOL_CACHE_MAX_CONVERSATIONS: int = 1000  # Conversations with their own cached results
+
+    # Tool-calling agent loop shared by the chat endpoints
+    AGENT_MAX_ROUNDS: int = 3  # Tool rounds before the model must answer without tools
+    AGENT_TOKEN_BUDGET: int = 6000  # Stop starting new rounds once the turn has used this many tokens
+    AGENT_TIME_BUDGET_SECONDS: float = 20.0  # Used when the request has no deadline of its own
+
+    # Offline gazetteer (cities, regions, countries; relative paths are under python-backend/)
+    GAZETTEER_PATH: str = os.getenv("GAZETTEER_PATH", "app/data/gazetteer.csv")
+
+    # Weather cache (wttr.in) keyed on geohash cells, kept warm for active locations
+    WEATHER_CACHE_TTL_SECONDS: int = 600  # How long a reading is served without refetching
+    WEATHER_STALE_SECONDS: int = 3600  # Oldest reading served when upstream is failing
+    WEATHER_ACTIVE_WINDOW_SECONDS: int = 3600  # Locations requested this recently are refreshed in the background
+    WEATHER_REFRESH_INTERVAL_SECONDS: int = 60
+    WEATHER_REFRESH_CONCURRENCY: int = 4
+    WEATHER_GEOHASH_PRECISION: int = 5  # ~5 km cells
+    WEATHER_CACHE_MAX_LOCATIONS: int = 5000  # Location names remembered with their cell
+    WEATHER_FETCH_TIMEOUT: float = 10.0
+
+    # ESPN scoreboard poller; sports answers read its in-memory snapshots
+    SPORTS_POLL_LIVE_SECONDS: int = 30  # While a league has a game live or about to start
+    SPORTS_POLL_IDLE_SECONDS: int = 900
+    SPORTS_POLL_RETRY_SECONDS: int = 60  # After a failed poll
+    SPORTS_POLL_LEAD_SECONDS: int = 900  # Switch to live polling this long before a game starts
+    SPORTS_FETCH_TIMEOUT: float = 10.0
+    SPORTS_COLD_START_WAIT_SECONDS: float = 3.0  # A read before the first poll waits this long for it
+
+    # Scheduled event ingestion into the event_catalog table
+    EVENT_INGEST_LOCATIONS: str = os.getenv("EVENT_INGEST_LOCATIONS", "Salt Lake City")  # ';'-separated, always tracked
+    EVENT_INGEST_INTERVAL_SECONDS: int = 1800  # Per tracked location
+    EVENT_INGEST_TICK_SECONDS: int = 60
+    EVENT_INGEST_CONCURRENCY: int = 2  # Locations ingested at once
+    EVENT_INGEST_ACTIVE_WINDOW_SECONDS: int = 259200  # Requested locations stay tracked this long (3 days)
+    EVENT_INGEST_MAX_LOCATIONS: int = 200
+    EVENT_FIRST_INGEST_WAIT_SECONDS: float = 6.0  # How long a request for a new location waits for its first ingest
+    EVENT_SOURCE_TIMEOUT: float = 30.0
+    EVENT_CATALOG_PAST_GRACE_SECONDS: int = 86400  # Start times are venue-local, so expire a day late
+    EVENT_CATALOG_STALE_SECONDS: int = 259200  # Delete events no source has returned for this long
+    EVENT_CATALOG_EXPIRE_INTERVAL_SECONDS: int = 3600
+    EVENT_CATALOG_RECENT_LOCATIONS: int = 500  # Last batches kept in memory for degraded serving
+
+    # Event page scraping: streamed, size-capped reads parsed in a process pool
+    SCRAPE_PROCESS_WORKERS: int = 2
+    SCRAPE_MAX_BYTES: int = 2_000_000  # Stop reading a page here; listings come first
+    SCRAPE_SKIP_BYTES: int = 10_000_000  # Pages announcing more than this are not read at all
+    SCRAPE_FETCH_TIMEOUT: float = 10.0
+    SCRAPE_PARSE_TIMEOUT: float = 10.0
+
+    # Admission control for provider calls: concurrency per provider, bounded
+    # wait queues per priority class (authenticated > public > background)
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+    ADMISSION_QUEUE_AUTHENTICATED: int = 64
+    ADMISSION_QUEUE_PUBLIC: int = 16
+    ADMISSION_QUEUE_BACKGROUND: int = 8
+    ADMISSION_MAX_WAIT_SECONDS: float = 10.0  # Queued calls are shed after waiting this long
+
+    # Degradation tiers: load score = max(chat p95 / target, queued provider calls / target);
+    # each threshold crossed enables the next tier (no scraping, cached events,
+    # cheap model without tools, deterministic replies)
+    DEGRADATION_ENABLED: bool = os.getenv("DEGRADATION_ENABLED", "true").lower() == "true"
+    DEGRADATION_P95_TARGET_SECONDS: float = 10.0
+    DEGRADATION_QUEUE_TARGET: int = 8
+    DEGRADATION_TIER_THRESHOLDS: List[float] = [1.0, 1.5, 2.0, 3.0]
+    DEGRADATION_EVAL_INTERVAL: float = 2.0  # Tiers move at most one step per interval
+    DEGRADATION_RECOVERY_SECONDS: float = 30.0  # Load must stay low this long before stepping down
+    DEGRADATION_LATENCY_WINDOW: int = 200
+    DEGRADATION_LATENCY_ROUTES: List[str] = ["/api/ai/lifestring-chat", "/api/ai/public-chat", "/api/ai/chat"]
+    # Streams send headers before the model runs and stay open while it writes, so neither time means anything
+    DEGRADATION_LATENCY_EXCLUDED_SUFFIXES: List[str] = ["/stream"]
+
+    # Rate limiting: token buckets keyed by user id (or IP without a valid token).
+    # RATE_LIMIT_ROUTES maps path prefixes to buckets (longest prefix wins);
+    # RATE_LIMITS sets each bucket's "count/period" limit
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "redis" (shared across workers)
+    # Proxies (IPs or CIDRs) whose X-Forwarded-For is believed; from anyone else the header is ignored
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    RATE_LIMIT_ROUTES: Dict[str, str] = {
+        "/api/ai/lifestring-chat-public": "llm_public",
+        "/api/ai/public-chat": "llm_public",
+        "/api/ai/lifestring-chat-test": "llm_public",
+        "/api/ai/": "llm",
+        "/api/strings": "api",
+        "/api/my/": "api",
+        "/api/connections": "api",
+        "/api/discover": "api",
+    }
+    RATE_LIMITS: Dict[str, str] = {
+        "llm": "20/minute",
+        "llm_public": "10/minute",
+        "api": "120/minute",
+    }
+
     # AI Bot
     AI_BOT_USER_ID: str = "00000000-0000-0000-0000-000000000000"
 
@@ -4,10 +4,13 @@ Database configuration and session management.
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Generator, Optional, TYPE_CHECKING
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from app.core.deadline import Deadline
+
 # Create SQLAlchemy engine
 engine = create_engine(
     str(settings.DATABASE_URL),
@@ -67,6 +70,23 @@ def get_db_optional() -> Generator[Session, None, None]:
             db.close()
 
 
+def apply_statement_timeout(db: Optional[Session], deadline: Optional["Deadline"]) -> None:
+    """
+    Bound statements in the current transaction by the request's remaining budget.
+
+    Uses SET LOCAL so the limit is dropped when the transaction ends and never
+    leaks to other users of the pooled connection.
+    """
+    if db is None or deadline is None or db.bind is None or db.bind.dialect.name != "postgresql":
+        return
+
+    timeout_ms = max(1, int(deadline.timeout(cap=settings.DB_STATEMENT_TIMEOUT) * 1000))
+    try:
+        db.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+    except Exception as e:
+        print(f"Failed to set statement timeout: {e}")
+
+
 def init_db() -> None:
     """
     Initialize database tables.
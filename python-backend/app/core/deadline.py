@@ -0,0 +1,173 @@
+"""
+Per-request time budgets for the chat pipeline.
+
+A ``Deadline`` is created once at the route and passed down to every stage
+(LLM calls, tool execution, profile fetches, DB queries). Each stage derives
+its timeout from whatever budget is left, so total request latency is bounded
+by configuration rather than by the slowest dependency.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage runs past the remaining request budget."""
+
+
+class DeadlineStats:
+    """Aggregates per-stage budget usage across requests."""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "timeouts": 0}
+        )
+        self._skipped: Dict[str, int] = defaultdict(int)
+        self.requests = 0
+        self.exhausted = 0
+
+    def record_stage(self, stage: str, elapsed: float, timed_out: bool = False) -> None:
+        entry = self._stages[stage]
+        entry["calls"] += 1
+        entry["total_seconds"] += elapsed
+        entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+        if timed_out:
+            entry["timeouts"] += 1
+
+    def record_skip(self, stage: str) -> None:
+        self._skipped[stage] += 1
+
+    def record_request(self, deadline: "Deadline") -> None:
+        self.requests += 1
+        if deadline.expired:
+            self.exhausted += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "exhausted": self.exhausted,
+            "stages": {
+                name: {
+                    **entry,
+                    "avg_seconds": round(entry["total_seconds"] / entry["calls"], 4) if entry["calls"] else 0.0,
+                }
+                for name, entry in self._stages.items()
+            },
+            "skipped_optional_work": dict(self._skipped),
+        }
+
+
+deadline_stats = DeadlineStats()
+
+
+class Deadline:
+    """Time budget shared by all stages of a single request."""
+
+    def __init__(self, budget: Optional[float] = None, name: str = "request"):
+        self.name = name
+        self.budget = budget if budget is not None else settings.CHAT_REQUEST_DEADLINE
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.budget
+        self.stages: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """
+        Timeout for the next stage.
+
+        Args:
+            cap: Upper bound for this stage regardless of remaining budget
+            reserve: Seconds to keep back for later stages
+
+        Returns:
+            Seconds the stage may use (0 when the budget is gone)
+        """
+        available = max(0.0, self.remaining() - reserve)
+        return min(cap, available) if cap is not None else available
+
+    def allows_optional(self, minimum: Optional[float] = None) -> bool:
+        """Whether enough budget is left to start optional work."""
+        if minimum is None:
+            minimum = settings.DEADLINE_OPTIONAL_MIN_SECONDS
+        return self.remaining() >= minimum
+
+    def skip(self, stage: str) -> None:
+        """Record that optional work was dropped for lack of budget."""
+        deadline_stats.record_skip(stage)
+        logger.info(f"Deadline {self.name}: skipping {stage} with {self.remaining():.2f}s left")
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Measure the wall time a (sync or async) block spends against the budget."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+            deadline_stats.record_stage(stage, elapsed)
+
+    async def run(
+        self,
+        stage: str,
+        awaitable: Awaitable[Any],
+        cap: Optional[float] = None,
+        reserve: float = 0.0,
+    ) -> Any:
+        """
+        Await ``awaitable`` within the remaining budget.
+
+        Raises:
+            DeadlineExceeded: if the stage does not finish in time
+        """
+        timeout = self.timeout(cap, reserve)
+        started = time.monotonic()
+        if timeout <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            deadline_stats.record_stage(stage, 0.0, timed_out=True)
+            raise DeadlineExceeded(f"No budget left for {stage}")
+
+        timed_out = False
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            raise DeadlineExceeded(f"{stage} exceeded its {timeout:.2f}s budget")
+        finally:
+            elapsed = time.monotonic() - started
+            self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+            deadline_stats.record_stage(stage, elapsed, timed_out=timed_out)
+
+    def report(self) -> Dict[str, Any]:
+        """Per-stage budget usage for this request."""
+        return {
+            "budget_seconds": self.budget,
+            "elapsed_seconds": round(self.elapsed(), 4),
+            "remaining_seconds": round(self.remaining(), 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """Log and aggregate the report once the request is done."""
+        deadline_stats.record_request(self)
+        report = self.report()
+        logger.info(f"Deadline {self.name}: {report}")
+        return report
@@ -0,0 +1,184 @@
+"""
+Load-aware degradation tiers for the chat pipeline.
+
+The controller watches live p95 latency of the chat routes and the depth of
+the provider admission queues. As load rises it steps through tiers, each
+shedding more expensive work than the last:
+
+    FULL            everything enabled
+    NO_SCRAPING     no event-site scraping and no Gemini grounding search
+    CACHED_EVENTS   events served only from cache / curated data
+    CHEAP_NO_TOOLS  cheap model, no tool calling, no escalation or hedging
+    DETERMINISTIC   common intents answered by the fast path (see
+                    app/services/fast_path.py) without any model call
+
+Tiers go up at most one step per evaluation and come down one step at a
+time once load has stayed low for DEGRADATION_RECOVERY_SECONDS, so
+throughput degrades smoothly instead of flapping. The active tier is sent
+on every response in the X-Degradation-Tier header.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.admission import admission_controller
+
+logger = logging.getLogger(__name__)
+
+
+class DegradationTier(IntEnum):
+    """Degradation tiers; each includes the restrictions of the ones below it."""
+    FULL = 0
+    NO_SCRAPING = 1
+    CACHED_EVENTS = 2
+    CHEAP_NO_TOOLS = 3
+    DETERMINISTIC = 4
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+class DegradationController:
+    """Tracks chat latency and queue depth and picks the active tier."""
+
+    def __init__(self):
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=settings.DEGRADATION_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.tier = DegradationTier.FULL
+        self._evaluated_at = 0.0
+        self._calm_since: Optional[float] = None
+        self._tier_since = time.monotonic()
+        self.last_score = 0.0
+        self.transitions: Dict[str, int] = {tier.label: 0 for tier in DegradationTier}
+        self.seconds_in_tier: Dict[str, float] = {tier.label: 0.0 for tier in DegradationTier}
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append((time.monotonic(), seconds))
+
+    def p95(self, now: Optional[float] = None) -> Optional[float]:
+        """p95 chat latency over the recent window (samples older than a minute are ignored)."""
+        now = now or time.monotonic()
+        with self._lock:
+            recent = sorted(seconds for at, seconds in self._latencies if now - at <= 60.0)
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, max(0, math.ceil(0.95 * len(recent)) - 1))]
+
+    @staticmethod
+    def queued() -> int:
+        snapshot = admission_controller.snapshot()
+        return sum(sum(provider["queued"].values()) for provider in snapshot.values())
+
+    def load_score(self, now: float) -> float:
+        """Load relative to the targets; 1.0 means a target is just being met."""
+        p95 = self.p95(now)
+        latency_ratio = p95 / settings.DEGRADATION_P95_TARGET_SECONDS if p95 is not None else 0.0
+        queue_ratio = self.queued() / settings.DEGRADATION_QUEUE_TARGET
+        return max(latency_ratio, queue_ratio)
+
+    def _target_tier(self, score: float) -> DegradationTier:
+        return DegradationTier(sum(1 for threshold in settings.DEGRADATION_TIER_THRESHOLDS if score >= threshold))
+
+    def _set_tier(self, tier: DegradationTier, now: float) -> None:
+        self.seconds_in_tier[self.tier.label] += now - self._tier_since
+        logger.warning(f"Degradation tier {self.tier.label} -> {tier.label} (load score {self.last_score:.2f})")
+        self.tier = tier
+        self._tier_since = now
+        self.transitions[tier.label] += 1
+
+    def current(self) -> DegradationTier:
+        """Active tier, re-evaluated at most every DEGRADATION_EVAL_INTERVAL seconds."""
+        if not settings.DEGRADATION_ENABLED:
+            return DegradationTier.FULL
+
+        now = time.monotonic()
+        if now - self._evaluated_at < settings.DEGRADATION_EVAL_INTERVAL:
+            return self.tier
+        self._evaluated_at = now
+
+        self.last_score = self.load_score(now)
+        target = self._target_tier(self.last_score)
+        if target > self.tier:
+            self._calm_since = None
+            self._set_tier(DegradationTier(self.tier + 1), now)
+        elif target < self.tier:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= settings.DEGRADATION_RECOVERY_SECONDS:
+                self._calm_since = now
+                self._set_tier(DegradationTier(self.tier - 1), now)
+        else:
+            self._calm_since = None
+        return self.tier
+
+    def at_least(self, tier: DegradationTier) -> bool:
+        return self.current() >= tier
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        tier = self.current()
+        p95 = self.p95(now)
+        seconds_in_tier = dict(self.seconds_in_tier)
+        seconds_in_tier[tier.label] += now - self._tier_since
+        return {
+            "enabled": settings.DEGRADATION_ENABLED,
+            "tier": tier.label,
+            "level": int(tier),
+            "load_score": round(self.last_score, 3),
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "queued": self.queued(),
+            "transitions": dict(self.transitions),
+            "seconds_in_tier": {label: round(seconds, 1) for label, seconds in seconds_in_tier.items()},
+        }
+
+
+# Global instance
+degradation_controller = DegradationController()
+
+
+class DegradationMiddleware:
+    """Times chat routes for the controller and tags responses with the active tier."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        timed = (
+            any(path.startswith(prefix) for prefix in settings.DEGRADATION_LATENCY_ROUTES)
+            and not any(path.endswith(suffix) for suffix in settings.DEGRADATION_LATENCY_EXCLUDED_SUFFIXES)
+        )
+        started = time.monotonic()
+        responded = False
+
+        async def send_with_tier(message: Message) -> None:
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                # Latency is time to the response headers, not until the body is drained
+                if timed and not responded:
+                    degradation_controller.record_latency(time.monotonic() - started)
+                responded = True
+                headers = list(message.get("headers", []))
+                headers.append((b"x-degradation-tier", degradation_controller.current().label.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_tier)
+        finally:
+            # A request that failed before responding still took this long
+            if timed and not responded:
+                degradation_controller.record_latency(time.monotonic() - started)
@@ -0,0 +1,244 @@
+"""
+Token-bucket rate limiting for the API.
+
+Requests are keyed by the user id from the bearer token, or by client IP
+when there is no valid token (X-Forwarded-For is only believed when the
+connection comes from one of RATE_LIMIT_TRUSTED_PROXIES), and charged against the bucket configured for
+the route (RATE_LIMIT_ROUTES maps path prefixes to bucket names and
+RATE_LIMITS gives each bucket a "count/period" limit). LLM and non-LLM
+routes use separate buckets, so chatting does not eat into a user's
+budget for browsing strings and connections.
+
+Bucket state lives in process by default. With RATE_LIMIT_BACKEND="redis"
+it is kept in Redis (REDIS_URL), so limits hold across uvicorn workers.
+"""
+import ipaddress
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import get_user_id_from_token
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+def parse_limit(limit: str) -> Tuple[int, float]:
+    """Parse "20/minute" into (capacity, refill tokens per second)."""
+    count, _, period = limit.partition("/")
+    seconds = _PERIODS[period.strip().rstrip("s") or "second"]
+    capacity = int(count)
+    return capacity, capacity / seconds
+
+
+def parse_networks(entries: List[str]) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """Parse IPs and CIDRs, skipping (and logging) invalid entries."""
+    networks = []
+    for entry in entries:
+        try:
+            networks.append(ipaddress.ip_network(entry.strip(), strict=False))
+        except ValueError:
+            logger.warning(f"Ignoring invalid trusted proxy {entry!r}")
+    return networks
+
+
+def _in_networks(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+class InMemoryBucketStore:
+    """Token buckets for a single process."""
+
+    MAX_KEYS = 50000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: int, rate: float, cost: float = 1.0) -> Tuple[bool, float, float]:
+        """
+        Charge ``cost`` tokens to a bucket.
+
+        Returns:
+            (allowed, tokens remaining, seconds until the request would be allowed)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.MAX_KEYS:
+                self._evict(now)
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, tokens, retry_after
+
+    def _evict(self, now: float) -> None:
+        # Drop buckets idle for an hour; they would have refilled anyway
+        for key in [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]:
+            del self._buckets[key]
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis."""
+
+    # Refill and charge atomically; returns {allowed, tokens * 1000}
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, math.floor(tokens * 1000)}
+"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, capacity: int, rate: float, cost: float = 1.0) -> Tuple[bool, float, float]:
+        allowed, milli_tokens = await self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[capacity, rate, time.time(), cost]
+        )
+        tokens = milli_tokens / 1000
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return bool(allowed), tokens, retry_after
+
+
+def create_bucket_store():
+    """Bucket store for RATE_LIMIT_BACKEND, falling back to in-process state."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        try:
+            return RedisBucketStore(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, rate limits will be per process")
+    return InMemoryBucketStore()
+
+
+class RateLimitStats:
+    """Allowed/limited counts per bucket."""
+
+    def __init__(self):
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+
+    def record(self, bucket: str, allowed: bool) -> None:
+        counts = self.allowed if allowed else self.limited
+        counts[bucket] = counts.get(bucket, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            bucket: {"allowed": self.allowed.get(bucket, 0), "limited": self.limited.get(bucket, 0)}
+            for bucket in sorted(set(self.allowed) | set(self.limited))
+        }
+
+
+rate_limit_stats = RateLimitStats()
+
+
+class RateLimitMiddleware:
+    """ASGI middleware charging each request to its route's token bucket."""
+
+    def __init__(self, app: ASGIApp, store=None):
+        self.app = app
+        self.store = store or create_bucket_store()
+        # Longest prefix wins, e.g. /api/ai/public-chat before /api/ai/
+        self.routes = sorted(settings.RATE_LIMIT_ROUTES.items(), key=lambda item: len(item[0]), reverse=True)
+        self.limits = {bucket: parse_limit(limit) for bucket, limit in settings.RATE_LIMITS.items()}
+        self.trusted_proxies = parse_networks(settings.RATE_LIMIT_TRUSTED_PROXIES)
+
+    def _bucket_for(self, path: str) -> Optional[str]:
+        for prefix, bucket in self.routes:
+            if path.startswith(prefix):
+                return bucket
+        return None
+
+    def _client_ip(self, scope: Scope, headers: Dict[bytes, bytes]) -> str:
+        """
+        The peer address, or when the peer is a trusted proxy, the nearest
+        X-Forwarded-For hop that is not. Entries further left are client
+        supplied and could be anything.
+        """
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        if not self.trusted_proxies or not _in_networks(address, self.trusted_proxies):
+            return address
+        forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1")
+        for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+            address = hop
+            if not _in_networks(hop, self.trusted_proxies):
+                break
+        return address
+
+    def _identity(self, scope: Scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            try:
+                return f"user:{get_user_id_from_token(authorization[7:].strip())}"
+            except Exception:
+                # Invalid tokens are rejected by the endpoint; limit them by IP here
+                pass
+
+        return f"ip:{self._client_ip(scope, headers)}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        bucket = self._bucket_for(scope["path"])
+        if bucket is None or bucket not in self.limits:
+            await self.app(scope, receive, send)
+            return
+
+        capacity, rate = self.limits[bucket]
+        try:
+            allowed, _, retry_after = await self.store.take(f"{bucket}:{self._identity(scope)}", capacity, rate)
+        except Exception as e:
+            # A broken shared store must not take the API down with it
+            logger.error(f"Rate limit store error, allowing request: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        rate_limit_stats.record(bucket, allowed)
+        if not allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please slow down."},
+                headers={
+                    "Retry-After": str(max(1, math.ceil(retry_after))),
+                    "X-RateLimit-Limit": str(capacity),
+                    "X-RateLimit-Remaining": "0",
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
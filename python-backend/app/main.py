@@ -9,8 +9,15 @@ import logging
 import os
 
 from app.core.config import settings
+from app.core.admission import AdmissionRejected
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.degradation import DegradationMiddleware
 from app.core.database import engine, Base
 from app.api.v1 import users, strings, rooms, messages, events, ai_chat, connections, auth, joins
+from app.services.event_ingestion import event_ingestion
+from app.services.html_scraper import html_scraper
+from app.services.sports_scoreboard import sports_scoreboard
+from app.services.weather_cache import weather_cache
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +35,12 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Chat latency tracking for degradation tiers (innermost, so shed requests are not timed)
+app.add_middleware(DegradationMiddleware)
+
+# Rate limiting (added before CORS so 429 responses still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +51,16 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    """Shed load quickly and tell the client when to retry."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Create database tables (in production, use Alembic migrations)
 @app.on_event("startup")
 async def startup_event():
@@ -45,6 +68,9 @@ async def startup_event():
     logger.info("Starting up Lifestring API...")
     # Uncomment to create tables (use Alembic in production)
     # Base.metadata.create_all(bind=engine)
+    weather_cache.start()
+    sports_scoreboard.start()
+    event_ingestion.start()
     logger.info("Application started successfully")
 
 
@@ -52,6 +78,10 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info("Shutting down Lifestring API...")
+    await weather_cache.stop()
+    await sports_scoreboard.stop()
+    await event_ingestion.stop()
+    html_scraper.shutdown()
 
 
 # Health check endpoint
@@ -5,6 +5,7 @@ from app.models.user import User, UserEmbedding, UserEnneagram, UserConnection,
 from app.models.string import String, StringComment, StringLike, StringEmbedding
 from app.models.room import Room, RoomParticipant, Message
 from app.models.event import Event
+from app.models.event_catalog import CatalogEvent
 from app.models.enneagram import Enneagram
 
 __all__ = [
@@ -21,6 +22,7 @@ __all__ = [
     "RoomParticipant",
     "Message",
     "Event",
+    "CatalogEvent",
     "Enneagram",
 ]
 
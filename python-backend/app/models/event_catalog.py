@@ -0,0 +1,49 @@
+"""
+Catalog of external (provider and scraped) events, filled by scheduled ingestion.
+"""
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Computed, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+
+from app.core.database import Base
+
+
+class CatalogEvent(Base):
+    """One deduplicated external event for a tracked location."""
+
+    __tablename__ = "event_catalog"
+
+    # Hash of location, normalized title and date, so re-ingesting upserts in place
+    id = Column(String(40), primary_key=True)
+    location_key = Column(Text, nullable=False)
+
+    title = Column(Text, nullable=False)
+    description = Column(Text)
+    venue = Column(Text)
+    start_time = Column(DateTime(timezone=False), nullable=False)  # Venue-local wall time
+    event_type = Column(Text)
+    source = Column(Text, nullable=False)
+    url = Column(Text)
+    is_free = Column(Boolean)
+
+    # The event as served to the chat tools
+    payload = Column(JSONB, default=dict, nullable=False)
+
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(event_type, ''))",
+            persisted=True,
+        ),
+    )
+
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_event_catalog_location_start", "location_key", "start_time"),
+        Index("ix_event_catalog_start", "start_time"),
+        Index("ix_event_catalog_search", "search_vector", postgresql_using="gin"),
+    )
+
+    def __repr__(self):
+        return f"<CatalogEvent {self.title} ({self.start_time})>"
@@ -0,0 +1,270 @@
+"""
+Bounded multi-round tool-calling loop shared by the chat endpoints.
+
+Given the model's first response, the loop executes the requested tools,
+feeds the results back, and asks the model again, for up to
+AGENT_MAX_ROUNDS rounds. The last round is offered no tools so the model
+has to answer. New rounds stop early once the turn has used
+AGENT_TOKEN_BUDGET tokens or the request's time budget runs low.
+
+Within a round, mutating tools (profile updates) run one at a time in the
+order the model asked, before the read-only tools, which run in parallel
+(reusing speculative prefetches where they match). Per-round LLM and tool
+latency is recorded in ``agent_stats``.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.services.tool_registry import ToolContext, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+# complete(messages, tools) -> provider response dict ('content', optional 'tool_calls')
+CompletionFn = Callable[[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]], Awaitable[Dict[str, Any]]]
+
+
+class AgentResult:
+    """Outcome of one chat turn through the loop."""
+
+    def __init__(self, response: Dict[str, Any]):
+        self.response = response  # Last model response
+        self.content: Optional[str] = None  # Latest non-empty model text
+        self.rounds = 0
+        self.tokens = 0
+        self.cost = 0.0
+        self.stop_reason = "answered"
+        self.tool_results: List[Tuple[str, Dict[str, Any], Any]] = []  # (name, arguments, result)
+        self.add_usage(response)
+
+    def add_usage(self, response: Dict[str, Any]) -> None:
+        self.tokens += response.get("tokens", 0) or 0
+        self.cost += response.get("cost", 0.0) or 0.0
+        if response.get("content"):
+            self.content = response["content"]
+
+    def collect(self, tool_name: str, key: str) -> List[Any]:
+        """Items under ``key`` from every successful call of ``tool_name``."""
+        items = []
+        for name, _, result in self.tool_results:
+            if name == tool_name and isinstance(result, dict) and result.get("success"):
+                items.extend(result.get(key, []))
+        return items
+
+
+class AgentStats:
+    """Rounds per turn, stop reasons and per-round latency."""
+
+    def __init__(self, window: int = 200):
+        self.turns = 0
+        self._rounds: Dict[int, int] = defaultdict(int)
+        self._stop_reasons: Dict[str, int] = defaultdict(int)
+        self._tool_calls = {"parallel": 0, "serial": 0}
+        self._tool_seconds: Deque[float] = deque(maxlen=window)
+        self._llm_seconds: Deque[float] = deque(maxlen=window)
+
+    def record_round(self, tool_seconds: float, llm_seconds: Optional[float], parallel: int, serial: int) -> None:
+        self._tool_seconds.append(tool_seconds)
+        if llm_seconds is not None:
+            self._llm_seconds.append(llm_seconds)
+        self._tool_calls["parallel"] += parallel
+        self._tool_calls["serial"] += serial
+
+    def record_turn(self, result: AgentResult) -> None:
+        self.turns += 1
+        self._rounds[result.rounds] += 1
+        self._stop_reasons[result.stop_reason] += 1
+
+    @staticmethod
+    def _latency(samples: Deque[float]) -> Dict[str, Optional[float]]:
+        if not samples:
+            return {"avg_seconds": None, "p95_seconds": None}
+        ordered = sorted(samples)
+        return {
+            "avg_seconds": round(sum(ordered) / len(ordered), 4),
+            "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "rounds": dict(sorted(self._rounds.items())),
+            "stop_reasons": dict(self._stop_reasons),
+            "tool_calls": dict(self._tool_calls),
+            "round_tool_latency": self._latency(self._tool_seconds),
+            "round_llm_latency": self._latency(self._llm_seconds),
+        }
+
+
+agent_stats = AgentStats()
+
+
+class AgentLoop:
+    """Runs tool rounds until the model answers or a budget runs out."""
+
+    async def run(
+        self,
+        messages: List[Dict[str, Any]],
+        complete: CompletionFn,
+        registry: Optional[ToolRegistry],
+        context: Optional[ToolContext] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        first_response: Optional[Dict[str, Any]] = None,
+        prefetch: Optional[Any] = None,
+    ) -> AgentResult:
+        """
+        Drive one chat turn.
+
+        Args:
+            messages: Conversation so far; assistant and tool turns are appended in place
+            complete: Makes one model call with the given messages and tools
+            registry: Where tool calls are executed (None: tools unavailable)
+            context: User, token, deadline and conversation for the tool calls
+            tools: Schemas offered on every round but the last
+            first_response: The model's first response, when the caller already made that call
+            prefetch: Speculatively started tool calls (a PrefetchSet) to reuse
+
+        Returns:
+            AgentResult with the last response and every tool result
+        """
+        context = context or ToolContext()
+        started = time.monotonic()
+        max_rounds = settings.AGENT_MAX_ROUNDS
+
+        if first_response is None:
+            first_response = await self._complete(complete, messages, tools, context, started)
+        result = AgentResult(first_response)
+        response = first_response
+
+        while response.get("tool_calls"):
+            stop_reason = self._stop_reason(result, context, started, max_rounds)
+            if stop_reason:
+                result.stop_reason = stop_reason
+                logger.info(f"Agent loop stopped after {result.rounds} round(s): {stop_reason}")
+                break
+
+            tool_calls = response["tool_calls"]
+            messages.append({
+                "role": "assistant",
+                "content": response.get("content"),
+                "tool_calls": [
+                    {"id": call["id"], "type": "function", "function": call["function"]}
+                    for call in tool_calls
+                ]
+            })
+
+            round_started = time.monotonic()
+            outputs, parallel, serial = await self._run_tools(tool_calls, registry, context, prefetch)
+            tool_seconds = time.monotonic() - round_started
+            for call, (name, arguments, output) in zip(tool_calls, outputs):
+                result.tool_results.append((name, arguments, output))
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": call["id"],
+                    "content": json.dumps(output, default=str)
+                })
+            result.rounds += 1
+
+            # Anything prefetched but not requested is wasted; stop it before the next call
+            if prefetch is not None:
+                prefetch.discard()
+
+            # The final round gets no tools, so the model has to answer
+            next_tools = tools if result.rounds < max_rounds else None
+            llm_started = time.monotonic()
+            try:
+                response = await self._complete(complete, messages, next_tools, context, started)
+            except DeadlineExceeded as e:
+                logger.warning(f"Agent round {result.rounds} response dropped: {e}")
+                agent_stats.record_round(tool_seconds, None, parallel, serial)
+                result.stop_reason = "time_budget"
+                break
+            agent_stats.record_round(tool_seconds, time.monotonic() - llm_started, parallel, serial)
+            result.response = response
+            result.add_usage(response)
+
+        agent_stats.record_turn(result)
+        return result
+
+    @staticmethod
+    def _stop_reason(result: AgentResult, context: ToolContext, started: float, max_rounds: int) -> Optional[str]:
+        if result.rounds >= max_rounds:
+            return "max_rounds"
+        if result.tokens >= settings.AGENT_TOKEN_BUDGET:
+            return "token_budget"
+        if context.deadline is not None:
+            if not context.deadline.allows_optional():
+                context.deadline.skip("llm:agent_round")
+                return "time_budget"
+        elif time.monotonic() - started >= settings.AGENT_TIME_BUDGET_SECONDS:
+            return "time_budget"
+        return None
+
+    @staticmethod
+    async def _complete(
+        complete: CompletionFn,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        context: ToolContext,
+        started: float,
+    ) -> Dict[str, Any]:
+        if context.deadline is not None:
+            return await context.deadline.run("llm:agent_round", complete(messages, tools), cap=settings.LLM_CALL_TIMEOUT)
+        remaining = settings.AGENT_TIME_BUDGET_SECONDS - (time.monotonic() - started)
+        if remaining <= 0:
+            raise DeadlineExceeded("Agent loop time budget exhausted")
+        try:
+            return await asyncio.wait_for(complete(messages, tools), timeout=remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Agent loop time budget exhausted")
+
+    @staticmethod
+    async def _run_tools(
+        tool_calls: List[Dict[str, Any]],
+        registry: Optional[ToolRegistry],
+        context: ToolContext,
+        prefetch: Optional[Any],
+    ) -> Tuple[List[Tuple[str, Dict[str, Any], Any]], int, int]:
+        """Execute one round's calls; returns (name, arguments, result) in call order."""
+        calls = []
+        for call in tool_calls:
+            name = call["function"]["name"]
+            try:
+                arguments = json.loads(call["function"].get("arguments") or "{}")
+            except ValueError:
+                arguments = None
+            calls.append((name, arguments))
+
+        async def execute(name: str, arguments: Optional[Dict[str, Any]]) -> Any:
+            if arguments is None:
+                return {"success": False, "error": f"Invalid JSON arguments for {name}"}
+            if registry is None:
+                return {"error": "Real-time service not available"}
+            prefetched = prefetch.claim(name, arguments) if prefetch is not None else None
+            if prefetched is not None:
+                return await prefetched
+            logger.info(f"🔧 FUNCTION CALL: {name} with args: {arguments}")
+            return await registry.execute(name, arguments, context)
+
+        results: List[Any] = [None] * len(calls)
+        mutating = [i for i, (name, _) in enumerate(calls) if registry is not None and registry.is_mutating(name)]
+        read_only = [i for i in range(len(calls)) if i not in mutating]
+
+        # Writes first and in order, so reads in the same round see them
+        for i in mutating:
+            results[i] = await execute(*calls[i])
+        if read_only:
+            outputs = await asyncio.gather(*(execute(*calls[i]) for i in read_only))
+            for i, output in zip(read_only, outputs):
+                results[i] = output
+
+        return [(name, arguments or {}, output) for (name, arguments), output in zip(calls, results)], len(read_only), len(mutating)
+
+
+# Global instance
+agent_loop = AgentLoop()
@@ -0,0 +1,176 @@
+"""
+Circuit breakers for upstream AI providers.
+
+Each provider/model (and Gemini's grounding search) gets its own breaker.
+After enough consecutive failures the breaker opens and callers skip straight
+to their healthy path instead of paying for a call that is likely to fail.
+Once the recovery window passes, a limited number of probe requests are let
+through (half-open); a successful probe closes the breaker again.
+
+Rate-limit (429) errors are not failures: the provider is healthy, the key is
+just out of quota, and the credential pool's cooldown already steers calls
+to other keys. Counting them would open the breaker for every key at once.
+"""
+import asyncio
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.services.credential_pool import is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited by an open breaker."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_seconds: Optional[float] = None,
+        half_open_probes: Optional[int] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_seconds = recovery_seconds or settings.CIRCUIT_RECOVERY_SECONDS
+        self.half_open_probes = half_open_probes or settings.CIRCUIT_HALF_OPEN_PROBES
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def _maybe_half_open(self) -> None:
+        if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.recovery_seconds:
+            self.state = CircuitState.HALF_OPEN
+            self.probes_in_flight = 0
+            logger.info(f"Circuit {self.name} half-open, probing")
+
+    def is_open(self) -> bool:
+        """True if calls would currently be rejected (does not reserve a probe)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == CircuitState.OPEN:
+                return True
+            return self.state == CircuitState.HALF_OPEN and self.probes_in_flight >= self.half_open_probes
+
+    def allow_request(self) -> bool:
+        """Reserve permission for one call; counts a short-circuit when refused."""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.HALF_OPEN and self.probes_in_flight < self.half_open_probes:
+                self.probes_in_flight += 1
+                return True
+            self.short_circuited += 1
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a probe slot when the call ended without a verdict (cancelled or rate limited)."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self.probes_in_flight > 0:
+                self.probes_in_flight -= 1
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``make_call()`` through the breaker, recording the outcome.
+
+        The call is only created once the breaker admits it, so an open breaker
+        never starts the request (or schedules executor work) at all.
+
+        Rate-limit errors are re-raised without counting as a failure.
+
+        Raises:
+            CircuitOpenError: if the breaker refused the call
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+        try:
+            result = await make_call()
+        except asyncio.CancelledError:
+            self.release_probe()
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e):
+                # Quota, not health; the credential pool cools the key down
+                self.release_probe()
+            else:
+                self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CircuitState.CLOSED:
+                logger.info(f"Circuit {self.name} closed after successful probe")
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self.probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"Circuit {self.name} opened after {self.consecutive_failures} consecutive failures")
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+                self.probes_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            retry_in = None
+            if self.state == CircuitState.OPEN:
+                retry_in = round(max(0.0, self.recovery_seconds - (time.monotonic() - self.opened_at)), 2)
+            return {
+                "state": self.state.value,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+                "retry_in_seconds": retry_in,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily created breakers keyed by name, e.g. "openai:gpt-4o"."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in sorted(breakers, key=lambda b: b.name)}
+
+
+# Global instance
+circuit_breakers = CircuitBreakerRegistry()
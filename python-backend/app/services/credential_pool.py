@@ -0,0 +1,223 @@
+"""
+Rate-limit-aware API key pools for the AI providers.
+
+Each provider can be given several API keys. Every call acquires the key
+with the most headroom: OpenAI keys are scored from the
+``x-ratelimit-remaining-*`` response headers, Gemini keys (which send no
+such headers) from their own request/token usage over the last minute
+against the configured per-key limits. A key that gets a 429 rests until
+its Retry-After (or CREDENTIAL_RATE_LIMIT_BACKOFF) passes, so sustained
+throughput scales with the number of provisioned keys.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset values such as '1s', '6m0s' or '120ms' into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether a provider exception is a 429 / quota-exhausted response."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "rate limit" in text.lower()
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After hint from a rate-limit exception, if the SDK exposes one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header in ("retry-after-ms", "retry-after"):
+        value = headers.get(header)
+        if value:
+            try:
+                seconds = float(value)
+            except ValueError:
+                continue
+            return seconds / 1000 if header == "retry-after-ms" else seconds
+    return None
+
+
+class ApiCredential:
+    """One API key plus its observed rate-limit state."""
+
+    def __init__(self, key: str, rpm_limit: Optional[int] = None, tpm_limit: Optional[int] = None):
+        self.key = key
+        self.label = f"...{key[-4:]}" if len(key) > 4 else "..."
+        self.client: Any = None
+
+        # Configured limits, used when the provider does not report any
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+
+        # Last reported by response headers
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.headers_valid_until = 0.0
+
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.rate_limited = 0
+        self._recent: Deque[Tuple[float, int]] = deque()  # (timestamp, tokens) over the last minute
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > 60.0:
+            self._recent.popleft()
+
+    def headroom(self, now: float) -> float:
+        """Fraction (0-1) of this key's request/token budget still available."""
+        if now < self.cooldown_until:
+            return 0.0
+
+        fractions: List[float] = []
+        if now < self.headers_valid_until:
+            if self.limit_requests and self.remaining_requests is not None:
+                fractions.append((self.remaining_requests - self.in_flight) / self.limit_requests)
+            if self.limit_tokens and self.remaining_tokens is not None:
+                fractions.append(self.remaining_tokens / self.limit_tokens)
+        else:
+            self._trim(now)
+            if self.rpm_limit:
+                fractions.append(1 - (len(self._recent) + self.in_flight) / self.rpm_limit)
+            if self.tpm_limit:
+                fractions.append(1 - sum(tokens for _, tokens in self._recent) / self.tpm_limit)
+
+        if not fractions:
+            return 1.0
+        return max(0.0, min(1.0, min(fractions)))
+
+    def update_from_headers(self, headers: Mapping[str, str], now: float) -> None:
+        def _int(name: str) -> Optional[int]:
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        remaining_requests = _int("x-ratelimit-remaining-requests")
+        remaining_tokens = _int("x-ratelimit-remaining-tokens")
+        if remaining_requests is None and remaining_tokens is None:
+            return
+
+        self.limit_requests = _int("x-ratelimit-limit-requests") or self.limit_requests
+        self.limit_tokens = _int("x-ratelimit-limit-tokens") or self.limit_tokens
+        self.remaining_requests = remaining_requests
+        self.remaining_tokens = remaining_tokens
+
+        # Trust the snapshot until the sooner of the two windows resets
+        resets = [
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+        ]
+        resets = [seconds for seconds in resets if seconds is not None]
+        self.headers_valid_until = now + (min(resets) if resets else 60.0)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        self._trim(now)
+        return {
+            "headroom": round(self.headroom(now), 4),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "requests_last_minute": len(self._recent),
+            "tokens_last_minute": sum(tokens for _, tokens in self._recent),
+            "remaining_requests": self.remaining_requests if now < self.headers_valid_until else None,
+            "remaining_tokens": self.remaining_tokens if now < self.headers_valid_until else None,
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - now), 2),
+        }
+
+
+class CredentialPool:
+    """Picks the API key with the most headroom for each call."""
+
+    def __init__(self, provider: str, keys: List[str], rpm_limit: Optional[int] = None, tpm_limit: Optional[int] = None):
+        self.provider = provider
+        self.credentials = [ApiCredential(key, rpm_limit, tpm_limit) for key in keys]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def acquire(self, exclude: Optional[ApiCredential] = None) -> ApiCredential:
+        """
+        Reserve the key with the most headroom.
+
+        If every key is cooling down after a 429, the one that recovers first
+        is returned rather than failing the call outright.
+        """
+        if not self.credentials:
+            raise RuntimeError(f"No API keys configured for {self.provider}")
+
+        now = time.monotonic()
+        with self._lock:
+            candidates = [c for c in self.credentials if c is not exclude] or self.credentials
+            available = [c for c in candidates if now >= c.cooldown_until]
+            if available:
+                credential = max(available, key=lambda c: (c.headroom(now), -c.in_flight))
+            else:
+                credential = min(candidates, key=lambda c: c.cooldown_until)
+            credential.in_flight += 1
+            credential.requests += 1
+        return credential
+
+    def release(self, credential: ApiCredential, tokens: int = 0, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Return a key after a call, recording usage and any rate-limit headers."""
+        now = time.monotonic()
+        with self._lock:
+            credential.in_flight = max(0, credential.in_flight - 1)
+            credential._recent.append((now, int(tokens or 0)))
+            if headers:
+                credential.update_from_headers(headers, now)
+
+    def mark_rate_limited(self, credential: ApiCredential, retry_after: Optional[float] = None) -> None:
+        """Rest a key that just got a 429."""
+        backoff = retry_after if retry_after is not None else settings.CREDENTIAL_RATE_LIMIT_BACKOFF
+        now = time.monotonic()
+        with self._lock:
+            credential.in_flight = max(0, credential.in_flight - 1)
+            credential.rate_limited += 1
+            credential.cooldown_until = now + backoff
+        logger.warning(f"{self.provider} key {credential.label} rate limited, resting for {backoff:.1f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {credential.label: credential.snapshot(now) for credential in self.credentials}
+
+
+def configured_keys(primary: str, extra: str) -> List[str]:
+    """Primary key plus comma-separated extras, without blanks or duplicates."""
+    keys: List[str] = []
+    for key in [primary, *extra.split(",")]:
+        key = key.strip()
+        if key and key not in keys:
+            keys.append(key)
+    return keys
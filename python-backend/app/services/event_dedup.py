@@ -0,0 +1,246 @@
+"""
+Near-duplicate collapsing for events gathered from several sources.
+
+The same concert comes back from Ticketmaster, SeatGeek and a scraped page
+with slightly different titles ("Taylor Swift | The Eras Tour - Vivint
+Arena" vs "Taylor Swift: The Eras Tour"). Titles are normalized (case,
+accents, punctuation, filler words, dates and times, a trailing venue) and
+turned into per-word character trigrams. Each title gets a MinHash
+signature, and LSH buckets its bands together with the event date, so only
+same-day events sharing a band are compared instead of every pair. Pairs
+whose trigram Jaccard similarity reaches SIMILARITY are merged, unless the
+records disagree on where or when: two set venues (or start times) that
+differ, or venue words from the titles ("Comedy Night at The Loft" vs
+"... at The Grove") that do not overlap, keep the events apart.
+
+Each group of duplicates becomes its richest record (most filled-in fields,
+then longest description; earlier events win ties, so callers list sources
+in priority order). Fields it lacks are filled from the others, and the
+group's sources and URLs are kept in 'sources' and 'urls'.
+"""
+import random
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from app.services.gazetteer import gazetteer
+
+NUM_PERM = 32
+BANDS = 8  # 4 rows per band: pairs at 0.8 similarity share a band ~98% of the time
+SIMILARITY = 0.8
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+    for rng in [random.Random(1729)] for _ in range(NUM_PERM)
+]
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATES = re.compile(
+    r"\b\d{4}-\d{1,2}-\d{1,2}\b"  # 2025-10-19
+    r"|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"  # 10/19, 10/19/2025
+    rf"|\b{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?\b"  # Oct 19th, 2025
+    r"|\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b"  # 7pm, 7:30 pm
+    r"|\b(?:mon|tues|wednes|thurs|fri|satur|sun)day\b|\b20\d{2}\b"
+)
+# A trailing " at Venue", " @ Venue", " - Venue" or " | Venue"
+_SUFFIX = re.compile(r"\s+(?:at|@|-|–|—|\|)\s+((?:(?!\s-\s)[^@|–—])+)$")
+_VENUE_WORDS = {
+    'arena', 'center', 'centre', 'theater', 'theatre', 'amphitheater', 'amphitheatre', 'hall',
+    'stadium', 'pavilion', 'ballroom', 'club', 'lounge', 'bar', 'park', 'gallery', 'museum', 'field',
+}
+_FILLER = {'the', 'a', 'an', 'and', 'tickets', 'ticket', 'live', 'presents', 'official', 'event', 'in', 'of'}
+_WORD = re.compile(r"[a-z0-9]+")
+_VERSUS = {'v': 'vs', 'versus': 'vs', 'at': 'vs'}
+_CLOCK_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p")
+
+
+def _words(text: Any) -> List[str]:
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode().lower()
+    return [word for word in _WORD.findall(text) if word not in _FILLER]
+
+
+def venue(event: Dict[str, Any]) -> str:
+    """The event's venue field, normalized; '' when unset or just the city name."""
+    value = str(event.get('venue') or event.get('location') or '').split(',')[0]
+    if not value or gazetteer.knows(value):
+        return ''
+    return " ".join(_words(value))
+
+
+def start_clock(event: Dict[str, Any]) -> str:
+    """The event's start time as HH:MM; '' when unset."""
+    value = str(event.get('time') or '').strip()
+    date = str(event.get('date') or '')
+    if not value and 'T' in date:
+        value = date.split('T', 1)[1][:5]
+    for fmt in _CLOCK_FORMATS:
+        try:
+            return datetime.strptime(value.upper(), fmt).strftime('%H:%M')
+        except ValueError:
+            continue
+    return value.lower()
+
+
+def _title_venue(event: Dict[str, Any], text: str) -> Tuple[str, Set[str]]:
+    """(title without a trailing venue, the venue's words)."""
+    suffix = _SUFFIX.search(text)
+    if not suffix:
+        return text, set()
+    words = set(_words(suffix.group(1)))
+    field = set(venue(event).split())
+    if words & _VENUE_WORDS or (words and field and len(words & field) * 2 >= len(words)):
+        return text[:suffix.start()], words
+    if text[suffix.start():].lstrip().startswith(('at ', '@')):
+        # "Comedy Night at The Loft": kept in the title, but still a venue
+        return text, words
+    return text, set()
+
+
+def normalize_title(event: Dict[str, Any]) -> str:
+    """The event title reduced to the words that identify it."""
+    text = unicodedata.normalize('NFKD', str(event.get('title') or '')).encode('ascii', 'ignore').decode().lower()
+    text, _ = _title_venue(event, _DATES.sub(' ', text))
+    return " ".join(_VERSUS.get(word, word) for word in _words(text))
+
+
+class _Where:
+    """What a group of events says about where and when it happens."""
+
+    __slots__ = ("venue", "clock", "words")
+
+    def __init__(self, event: Dict[str, Any]):
+        self.venue = venue(event)
+        self.clock = start_clock(event)
+        text = unicodedata.normalize('NFKD', str(event.get('title') or '')).encode('ascii', 'ignore').decode().lower()
+        self.words = _title_venue(event, _DATES.sub(' ', text))[1] | set(self.venue.split())
+
+    def conflicts(self, other: "_Where") -> bool:
+        return bool(
+            (self.venue and other.venue and self.venue != other.venue)
+            or (self.clock and other.clock and self.clock != other.clock)
+            or (self.words and other.words and not self.words & other.words)
+        )
+
+    def absorb(self, other: "_Where") -> None:
+        self.venue = self.venue or other.venue
+        self.clock = self.clock or other.clock
+        self.words |= other.words
+
+
+def shingles(title: str) -> Set[str]:
+    """Character trigrams of each word, with word boundaries marked."""
+    found = set()
+    for word in title.split():
+        padded = f" {word} "
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+def minhash(features: Set[str]) -> Tuple[int, ...]:
+    hashes = [hash(feature) & _MASK for feature in features]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _richness(event: Dict[str, Any]) -> Tuple[int, int]:
+    filled = sum(1 for value in event.values() if value not in (None, '', [], {}))
+    return filled, len(str(event.get('description') or ''))
+
+
+def _merge(group: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    best = max(range(len(group)), key=lambda i: (_richness(group[i]), -i))
+    merged = dict(group[best])
+    for event in group:
+        for key, value in event.items():
+            if merged.get(key) in (None, '') and value not in (None, ''):
+                merged[key] = value
+
+    sources, urls = [], []
+    for event in [group[best]] + [e for i, e in enumerate(group) if i != best]:
+        for source in event.get('sources') or [event.get('source')]:
+            if source and source not in sources:
+                sources.append(source)
+        for url in event.get('urls') or [event.get('url')]:
+            if url and url not in urls:
+                urls.append(url)
+    merged['sources'] = sources
+    merged['urls'] = urls
+    return merged
+
+
+class EventDeduplicator:
+    """Collapses near-duplicate events in roughly linear time."""
+
+    def __init__(self):
+        self.counts = {"runs": 0, "events_in": 0, "events_out": 0, "comparisons": 0}
+
+    def collapse(self, events: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Events with near-duplicates merged, in the order their first member appeared.
+
+        Args:
+            events: Events from one or more sources, highest priority source first
+        """
+        count = len(events)
+        parent = list(range(count))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        features: List[Set[str]] = []
+        where = [_Where(event) for event in events]  # per group root
+        buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        rows = NUM_PERM // BANDS
+        comparisons = 0
+
+        for i, event in enumerate(events):
+            title = normalize_title(event) or str(event.get('title') or '').lower()
+            day = str(event.get('date') or '')[:10]
+            features.append(shingles(title))
+            if not features[i]:
+                continue
+
+            signature = minhash(features[i])
+            for band in range(BANDS):
+                bucket = buckets[(day, band, signature[band * rows:(band + 1) * rows])]
+                for j in bucket:
+                    root_i, root_j = find(i), find(j)
+                    if root_i == root_j:
+                        continue
+                    comparisons += 1
+                    overlap = len(features[i] & features[j])
+                    if overlap / (len(features[i]) + len(features[j]) - overlap) < SIMILARITY:
+                        continue
+                    # Checked against the whole groups, so a vague record cannot bridge two venues
+                    if where[root_i].conflicts(where[root_j]):
+                        continue
+                    where[root_j].absorb(where[root_i])
+                    parent[root_i] = root_j
+                bucket.append(i)
+
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for i, event in enumerate(events):
+            groups.setdefault(find(i), []).append(event)
+        collapsed = [group[0] if len(group) == 1 else _merge(group) for group in groups.values()]
+
+        self.counts["runs"] += 1
+        self.counts["events_in"] += count
+        self.counts["events_out"] += len(collapsed)
+        self.counts["comparisons"] += comparisons
+        return collapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "collapse_rate": round(1 - self.counts["events_out"] / self.counts["events_in"], 3) if self.counts["events_in"] else None,
+        }
+
+
+# Global instance
+event_deduplicator = EventDeduplicator()
@@ -0,0 +1,393 @@
+"""
+Scheduled ingestion of external events into the event_catalog table.
+
+Sources (provider APIs, scraping, curated lists) are registered by
+RealtimeService. Every EVENT_INGEST_INTERVAL_SECONDS each tracked location
+is fetched from all sources, near-duplicates across sources are merged
+(see event_dedup), and the events are normalized into one schema and
+upserted into event_catalog, which is indexed by location and start time
+and by a full-text vector over title, description and type (the table is
+created by the create_event_catalog migration). Past events, and events no
+source has returned for EVENT_CATALOG_STALE_SECONDS, are deleted.
+
+get_local_events reads the catalog instead of calling providers. Locations
+in EVENT_INGEST_LOCATIONS are tracked from startup; any other location is
+tracked the first time it is asked for (that first request waits up to
+EVENT_FIRST_INGEST_WAIT_SECONDS for its initial ingestion) and dropped
+after EVENT_INGEST_ACTIVE_WINDOW_SECONDS without requests. Per-source
+runs, failures, latency and freshness are kept for ``snapshot()``.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from functools import reduce
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.degradation import degradation_controller, DegradationTier
+from app.models.event_catalog import CatalogEvent
+from app.services.event_dedup import event_deduplicator, normalize_title
+from app.services.gazetteer import normalize_location
+
+logger = logging.getLogger(__name__)
+
+# fetch(session, location) -> events in the RealtimeService event dict shape
+SourceFetch = Callable[[aiohttp.ClientSession, str], Awaitable[List[Dict[str, Any]]]]
+
+_TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M %p")
+_UPDATED_COLUMNS = ("title", "description", "venue", "start_time", "event_type", "source", "url", "is_free", "payload")
+
+
+def parse_start(event: Dict[str, Any]) -> Optional[datetime]:
+    """Venue-local start from the event's 'date' (and 'time'); midnight when the time is unknown."""
+    date_text = str(event.get('date') or '')
+    if 'T' in date_text:
+        try:
+            return datetime.fromisoformat(date_text.replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            pass
+    try:
+        day = datetime.strptime(date_text[:10], '%Y-%m-%d')
+    except ValueError:
+        return None
+
+    time_text = str(event.get('time') or '').strip()
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.combine(day.date(), datetime.strptime(time_text, fmt).time())
+        except ValueError:
+            continue
+    return day
+
+
+def normalize_event(event: Dict[str, Any], location_key: str, source: str) -> Optional[Dict[str, Any]]:
+    """An event_catalog row for one source event, or None without a title or date."""
+    title = (event.get('title') or '').strip()
+    start_time = parse_start(event)
+    if not title or start_time is None:
+        return None
+
+    dedupe_key = f"{location_key}|{normalize_title(event) or title.lower()}|{str(event.get('date', ''))[:10]}"
+    is_free = event.get('is_free', event.get('free'))
+    payload = {**event, 'source': event.get('source') or source}
+    return {
+        'id': hashlib.sha1(dedupe_key.encode()).hexdigest(),
+        'location_key': location_key,
+        'title': title,
+        'description': event.get('description'),
+        'venue': event.get('location'),
+        'start_time': start_time,
+        'event_type': event.get('event_type') or event.get('category'),
+        'source': payload['source'],
+        'url': event.get('url'),
+        'is_free': bool(is_free) if is_free is not None else None,
+        'payload': payload,
+    }
+
+
+class SourceStats:
+    """Outcome and latency of one source's fetches."""
+
+    def __init__(self, window: int = 50):
+        self.runs = 0
+        self.failures = 0
+        self.empty = 0
+        self.last_count = 0
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._seconds: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, count: Optional[int], error: Optional[str] = None) -> None:
+        self.runs += 1
+        self._seconds.append(seconds)
+        if error is not None:
+            self.failures += 1
+            self.last_error = error
+            return
+        self.last_count = count or 0
+        self.last_success = time.monotonic()
+        if not count:
+            self.empty += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failure_rate": round(self.failures / self.runs, 3) if self.runs else None,
+            "empty_rate": round(self.empty / self.runs, 3) if self.runs else None,
+            "last_count": self.last_count,
+            "last_success_age_seconds": round(time.monotonic() - self.last_success, 1) if self.last_success else None,
+            "avg_seconds": round(sum(self._seconds) / len(self._seconds), 3) if self._seconds else None,
+            "last_error": self.last_error,
+        }
+
+
+class EventIngestion:
+    """Tracked locations, their ingestion schedule and the catalog queries."""
+
+    def __init__(self):
+        self._sources: "OrderedDict[str, Tuple[SourceFetch, bool]]" = OrderedDict()
+        self._source_stats: Dict[str, SourceStats] = {}
+        self._locations: Dict[str, str] = {}  # location key -> query used for the sources
+        self._configured = set()
+        self._requested_at: Dict[str, float] = {}
+        self._last_ingest: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Last ingested batch per location, served when the catalog is unreachable
+        self._recent: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._runner: Optional[asyncio.Task] = None
+        self._last_expiry: Optional[float] = None
+        self.counts: Dict[str, int] = {
+            "ingests": 0, "upserted": 0, "expired": 0, "catalog_reads": 0, "catalog_errors": 0,
+        }
+
+        for location in settings.EVENT_INGEST_LOCATIONS.split(';'):
+            key = self.track(location.strip())
+            if key:
+                self._configured.add(key)
+
+    def register_source(self, name: str, fetch: SourceFetch, sheddable: bool = False) -> None:
+        """Add a source; earlier sources win when two report the same event. Sheddable ones are skipped under load."""
+        self._sources[name] = (fetch, sheddable)
+        self._source_stats.setdefault(name, SourceStats())
+
+    def track(self, location: str) -> Optional[str]:
+        key = normalize_location(location)
+        if not key:
+            return None
+        self._requested_at[key] = time.monotonic()
+        if key not in self._locations:
+            self._locations[key] = location
+            self._prune_locations()
+        return key
+
+    def _prune_locations(self) -> None:
+        now = time.monotonic()
+        dynamic = [key for key in self._locations if key not in self._configured]
+        for key in dynamic:
+            if now - self._requested_at.get(key, 0.0) > settings.EVENT_INGEST_ACTIVE_WINDOW_SECONDS:
+                self._untrack(key)
+        dynamic = sorted((key for key in self._locations if key not in self._configured), key=self._requested_at.get)
+        for key in dynamic[:max(len(self._locations) - settings.EVENT_INGEST_MAX_LOCATIONS, 0)]:
+            self._untrack(key)
+
+    def _untrack(self, key: str) -> None:
+        self._locations.pop(key, None)
+        self._requested_at.pop(key, None)
+        self._last_ingest.pop(key, None)
+
+    def recent(self, location: str) -> List[Dict[str, Any]]:
+        """The last ingested events for a location, sorted by start (no database access)."""
+        return list(self._recent.get(normalize_location(location), []))
+
+    async def search(self, location: str, limit: int, terms: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Upcoming catalog events for a location, soonest first.
+
+        Args:
+            location: Location as the user or model gave it
+            limit: Maximum number of events
+            terms: Any of these must match the event's full-text vector
+
+        Returns:
+            Event dicts, or None when the catalog cannot be read (or a newly
+            tracked location's first ingestion is still running)
+        """
+        key = self.track(location)
+        if key is None:
+            return []
+        if key not in self._last_ingest:
+            try:
+                # The ingestion keeps running in the background if this wait gives up
+                await asyncio.wait_for(asyncio.shield(self.ingest(key)), timeout=settings.EVENT_FIRST_INGEST_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                return None
+
+        loop = asyncio.get_event_loop()
+        try:
+            events = await asyncio.wait_for(
+                loop.run_in_executor(None, self._query, key, limit, terms),
+                timeout=settings.DB_STATEMENT_TIMEOUT
+            )
+        except Exception as e:
+            self.counts["catalog_errors"] += 1
+            logger.warning(f"Event catalog read failed for {location}: {e}")
+            return None
+        self.counts["catalog_reads"] += 1
+        # Rows stored by earlier runs can still be near-duplicates of each other
+        return event_deduplicator.collapse(events)
+
+    def _query(self, key: str, limit: int, terms: Optional[List[str]]) -> List[Dict[str, Any]]:
+        # Everything from today on, as before (times are venue-local, dates were compared as strings)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        statement = select(CatalogEvent.payload).where(
+            CatalogEvent.location_key == key,
+            CatalogEvent.start_time >= today,
+        )
+        if terms:
+            query = reduce(lambda a, b: a.op('||')(b), (func.plainto_tsquery('english', term) for term in terms))
+            statement = statement.where(CatalogEvent.search_vector.op('@@')(query))
+        statement = statement.order_by(CatalogEvent.start_time).limit(limit)
+
+        db = SessionLocal()
+        try:
+            return [row[0] for row in db.execute(statement)]
+        finally:
+            db.close()
+
+    async def ingest(self, key: str) -> None:
+        """Fetch, normalize and store one tracked location; concurrent calls share the run."""
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._ingest(key))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(inflight)
+
+    async def _ingest(self, key: str) -> None:
+        location = self._locations.get(key, key)
+        shed = degradation_controller.at_least(DegradationTier.NO_SCRAPING)
+        sources = [(name, fetch) for name, (fetch, sheddable) in self._sources.items() if not (sheddable and shed)]
+
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(*(self._fetch_source(session, name, fetch, location) for name, fetch in sources))
+
+        # Sources are registered in priority order, so their events are too
+        events = [{**event, 'source': event.get('source') or name} for (name, _), batch in zip(sources, results) for event in batch]
+        rows: Dict[str, Dict[str, Any]] = {}
+        for event in event_deduplicator.collapse(events):
+            row = normalize_event(event, key, event['source'])
+            if row is not None and row['id'] not in rows:
+                rows[row['id']] = row
+
+        ordered = sorted(rows.values(), key=lambda row: row['start_time'])
+        self._last_ingest[key] = time.monotonic()
+        self._recent[key] = [row['payload'] for row in ordered]
+        self._recent.move_to_end(key)
+        while len(self._recent) > settings.EVENT_CATALOG_RECENT_LOCATIONS:
+            self._recent.popitem(last=False)
+        self.counts["ingests"] += 1
+        logger.info(f"Ingested {len(ordered)} events for {location} from {len(sources)} sources")
+
+        if ordered:
+            loop = asyncio.get_event_loop()
+            try:
+                await loop.run_in_executor(None, self._upsert, ordered)
+                self.counts["upserted"] += len(ordered)
+            except Exception as e:
+                self.counts["catalog_errors"] += 1
+                logger.error(f"Event catalog upsert failed for {location}: {e}")
+
+    async def _fetch_source(self, session: aiohttp.ClientSession, name: str, fetch: SourceFetch, location: str) -> List[Dict[str, Any]]:
+        stats = self._source_stats[name]
+        started = time.monotonic()
+        try:
+            events = await asyncio.wait_for(fetch(session, location), timeout=settings.EVENT_SOURCE_TIMEOUT)
+        except Exception as e:
+            stats.record(time.monotonic() - started, None, error=str(e) or type(e).__name__)
+            logger.warning(f"Event source {name} failed for {location}: {e}")
+            return []
+        events = events or []
+        stats.record(time.monotonic() - started, len(events))
+        return events
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        statement = insert(CatalogEvent).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CatalogEvent.id],
+            set_={
+                **{column: statement.excluded[column] for column in _UPDATED_COLUMNS},
+                "last_seen_at": func.now(),
+            }
+        )
+        db = SessionLocal()
+        try:
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+    def _expire(self) -> int:
+        past = datetime.now() - timedelta(seconds=settings.EVENT_CATALOG_PAST_GRACE_SECONDS)
+        stale = datetime.now(timezone.utc) - timedelta(seconds=settings.EVENT_CATALOG_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            result = db.execute(delete(CatalogEvent).where(or_(
+                CatalogEvent.start_time < past,
+                CatalogEvent.last_seen_at < stale,
+            )))
+            db.commit()
+            return result.rowcount or 0
+        finally:
+            db.close()
+
+    async def run_due(self) -> None:
+        """Ingest every tracked location whose interval has passed, then expire old rows."""
+        self._prune_locations()
+        now = time.monotonic()
+        due = [
+            key for key in self._locations
+            if key not in self._last_ingest or now - self._last_ingest[key] >= settings.EVENT_INGEST_INTERVAL_SECONDS
+        ]
+        semaphore = asyncio.Semaphore(settings.EVENT_INGEST_CONCURRENCY)
+
+        async def ingest(key: str) -> None:
+            async with semaphore:
+                await self.ingest(key)
+
+        if due:
+            await asyncio.gather(*(ingest(key) for key in due))
+
+        if self._last_expiry is None or now - self._last_expiry >= settings.EVENT_CATALOG_EXPIRE_INTERVAL_SECONDS:
+            self._last_expiry = now
+            loop = asyncio.get_event_loop()
+            try:
+                self.counts["expired"] += await loop.run_in_executor(None, self._expire)
+            except Exception as e:
+                self.counts["catalog_errors"] += 1
+                logger.error(f"Event catalog expiry failed: {e}")
+
+    def start(self) -> None:
+        """Start the ingestion scheduler (idempotent)."""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except Exception as e:
+                logger.error(f"Event ingestion pass failed: {e}")
+            await asyncio.sleep(settings.EVENT_INGEST_TICK_SECONDS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "running": self._runner is not None and not self._runner.done(),
+            "locations": {
+                key: round(now - self._last_ingest[key], 1) if key in self._last_ingest else None
+                for key in self._locations
+            },
+            "sources": {name: stats.snapshot() for name, stats in self._source_stats.items()},
+            **self.counts,
+        }
+
+
+# Global instance
+event_ingestion = EventIngestion()
@@ -0,0 +1,343 @@
+"""
+Zero-LLM fast-path responders for the chat endpoints.
+
+Deterministic handlers (time, weather, profile fields, the user's Joins and
+connections) declare a match rule and what they need (profile, user, db).
+Every chat endpoint calls ``fast_path.answer(...)`` before any provider
+call; the first responder that matches and returns a reply short-circuits
+the model entirely. A responder may return None to decline (e.g. weather
+lookup failed), in which case the next responder or the model handles it.
+"""
+import logging
+import re
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.cancellation import run_sync_to_completion
+from app.core.degradation import degradation_controller, DegradationTier
+from app.services.message_matcher import match_message
+
+logger = logging.getLogger(__name__)
+
+
+class FastPathContext:
+    """Everything a responder may look at for one chat message."""
+
+    def __init__(
+        self,
+        message: str,
+        profile_data: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        db: Optional[Session] = None,
+    ):
+        self.message = message or ""
+        self.message_lower = self.message.lower()
+        self.profile_data = profile_data or {}
+        self.user_id = user_id
+        self.db = db
+
+
+class FastPathReply:
+    """A deterministic answer to a chat message."""
+
+    def __init__(self, message: str, intent: str, confidence: float = 0.95):
+        self.message = message
+        self.intent = intent
+        self.confidence = confidence
+        self.responder: Optional[str] = None
+
+
+Handler = Callable[[FastPathContext], Awaitable[Optional[FastPathReply]]]
+
+
+class Responder:
+    """A named handler with its match rule and requirements."""
+
+    def __init__(
+        self,
+        name: str,
+        pattern: Optional[Pattern],
+        handler: Handler,
+        requires: Sequence[str] = (),
+        enabled: Optional[Callable[[], bool]] = None,
+    ):
+        self.name = name
+        self.pattern = pattern
+        self.handler = handler
+        self.requires = tuple(requires)
+        self.enabled = enabled
+
+    def matches(self, ctx: FastPathContext) -> bool:
+        if self.enabled is not None and not self.enabled():
+            return False
+        if "profile" in self.requires and not ctx.profile_data:
+            return False
+        if "user" in self.requires and not ctx.user_id:
+            return False
+        if "db" in self.requires and ctx.db is None:
+            return False
+        return self.pattern is None or bool(self.pattern.search(ctx.message_lower))
+
+
+class FastPathStats:
+    """Per-responder match/answer counts and latency."""
+
+    def __init__(self):
+        self.queries = 0
+        self.answered = 0
+        self._responders: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, outcome: str, elapsed: float) -> None:
+        entry = self._responders.setdefault(
+            name, {"matched": 0, "answered": 0, "declined": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        entry["matched"] += 1
+        entry[outcome] += 1
+        entry["total_seconds"] += elapsed
+        entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "answered": self.answered,
+            "hit_rate": round(self.answered / self.queries, 4) if self.queries else 0.0,
+            "responders": {
+                name: {
+                    **{key: value for key, value in entry.items() if key != "total_seconds"},
+                    "avg_seconds": round(entry["total_seconds"] / entry["matched"], 4) if entry["matched"] else 0.0,
+                    "max_seconds": round(entry["max_seconds"], 4),
+                }
+                for name, entry in sorted(self._responders.items())
+            },
+        }
+
+
+class FastPathRegistry:
+    """Ordered registry of fast-path responders."""
+
+    def __init__(self):
+        self._responders: List[Responder] = []
+        self.stats = FastPathStats()
+
+    def register(
+        self,
+        name: str,
+        pattern: Optional[str] = None,
+        requires: Sequence[str] = (),
+        enabled: Optional[Callable[[], bool]] = None,
+    ) -> Callable[[Handler], Handler]:
+        """Decorator adding a responder; responders are tried in registration order."""
+        def decorator(handler: Handler) -> Handler:
+            compiled = re.compile(pattern) if pattern else None
+            self._responders.append(Responder(name, compiled, handler, requires, enabled))
+            return handler
+        return decorator
+
+    async def answer(
+        self,
+        message: str,
+        profile_data: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> Optional[FastPathReply]:
+        """Run matching responders in order; return the first reply, or None to use the model."""
+        ctx = FastPathContext(message, profile_data, user_id, db)
+        self.stats.queries += 1
+
+        for responder in self._responders:
+            if not responder.matches(ctx):
+                continue
+
+            started = time.monotonic()
+            try:
+                reply = await responder.handler(ctx)
+            except Exception as e:
+                logger.warning(f"Fast-path responder {responder.name} failed: {e}")
+                self.stats.record(responder.name, "errors", time.monotonic() - started)
+                continue
+
+            elapsed = time.monotonic() - started
+            if reply is None:
+                self.stats.record(responder.name, "declined", elapsed)
+                continue
+
+            self.stats.record(responder.name, "answered", elapsed)
+            self.stats.answered += 1
+            reply.responder = responder.name
+            logger.info(f"Fast path {responder.name} answered in {elapsed * 1000:.1f}ms")
+            return reply
+
+        return None
+
+
+# Global instance
+fast_path = FastPathRegistry()
+
+
+@fast_path.register("time", r"\bwhat time\b|\bcurrent time\b|\btime is it\b|\bwhat'?s the time\b|\bclock\b")
+async def _time_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    from app.services.realtime_service import realtime_service
+
+    # Location from the message first, then the profile, for timezone detection
+    time_info = await realtime_service.get_time_for_location_query(ctx.message, ctx.profile_data.get("location"))
+    time_str = f"{time_info['current_time']} on {time_info['current_date']}"
+    if time_info.get("is_specific_query"):
+        message = f"The current time in {time_info.get('query_location')} is {time_str}."
+    else:
+        message = f"The current time is {time_str}."
+    return FastPathReply(message, "time_inquiry")
+
+
+@fast_path.register("weather", r"\bweather\b")
+async def _weather_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    from app.services.realtime_service import realtime_service
+    from app.services.speculative_prefetch import speculative_prefetcher
+
+    # Only current conditions are answered here; "rain tomorrow?" needs a forecast
+    match = match_message(ctx.message)
+    if "forecast" in ctx.message_lower or match.has("time_soon") or match.has("time_planning"):
+        return None
+
+    location = speculative_prefetcher.extract_location(ctx.message) or ctx.profile_data.get("location")
+    if not location:
+        return None
+
+    weather = await realtime_service.get_weather(location)
+    if "feels_like" not in weather:
+        # Lookup failed; let the model answer instead of apologising here
+        return None
+
+    message = (
+        f"Right now in {weather['location']} it's {weather['temperature']} and {weather['condition'].lower()}, "
+        f"feeling like {weather['feels_like']}. Humidity is {weather['humidity']} with wind at {weather['wind_speed']}."
+    )
+    return FastPathReply(message, "weather_inquiry")
+
+
+@fast_path.register(
+    "profile_fields",
+    r"\b(?:what(?:'s|'re| is| are)|tell me|list|show me|remind me)\b.*\bmy (?:passions|hobbies|interests)\b"
+    r"|^\s*my (?:passions|hobbies|interests)\s*\??\s*$",
+    requires=("profile",)
+)
+async def _profile_fields_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    interests = ctx.profile_data.get("interests", []) or []
+    passions = ctx.profile_data.get("passions", []) or []
+    hobbies = ctx.profile_data.get("hobbies", []) or []
+    bio = ctx.profile_data.get("bio", "") or ""
+
+    if "passions" in ctx.message_lower:
+        if passions:
+            message = f"Based on your profile, your passions include: {', '.join(passions)}!"
+            if bio:
+                message += f" Your bio says: '{bio}'"
+            message += " Would you like to explore these passions further or connect with others who share them?"
+        else:
+            message = "I don't see any passions listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
+    elif "hobbies" in ctx.message_lower:
+        if hobbies:
+            message = f"Based on your profile, your hobbies include: {', '.join(hobbies)}."
+        else:
+            message = "I don't see any hobbies listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
+    else:
+        all_interests = list(dict.fromkeys(interests + passions))
+        if all_interests:
+            message = f"Based on your profile, I can see you're interested in: {', '.join(all_interests)}!"
+            if bio:
+                message += f" Your bio says: '{bio}'"
+            message += " Would you like to explore these interests further or connect with others who share them?"
+        else:
+            message = "I don't see any specific interests listed in your profile yet. You can add them in your profile settings to help me provide more personalized suggestions!"
+
+    return FastPathReply(message, "profile_inquiry")
+
+
+@fast_path.register(
+    "my_joins",
+    r"\bmy joins\b|\bhow many joins\b|\bjoins (?:i(?:'ve| have)? )?(?:created|made|started)\b",
+    requires=("user", "db")
+)
+async def _my_joins_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    from sqlalchemy import and_
+    from app.models.event import Event
+
+    def load_joins():
+        query = ctx.db.query(Event).filter(
+            and_(
+                Event.user_id == uuid.UUID(str(ctx.user_id)),
+                Event.meta_data.op('->>')('is_join') == 'true'
+            )
+        )
+        return query.count(), [event.title for event in query.order_by(Event.created_at.desc()).limit(5).all()]
+
+    total, titles = await run_sync_to_completion(load_joins)
+    if not total:
+        message = "You haven't created any Joins yet. Tell me what you'd like to do and I can help you start one!"
+    elif total <= len(titles):
+        message = f"You've created {total} Join{'s' if total != 1 else ''}: {', '.join(titles)}."
+    else:
+        message = f"You've created {total} Joins. Your most recent are: {', '.join(titles)}."
+    return FastPathReply(message, "joins_inquiry")
+
+
+@fast_path.register(
+    "my_connections",
+    r"\bhow many (?:connections|friends)\b|\bmy connections\b|\bconnection count\b",
+    requires=("user", "db")
+)
+async def _my_connections_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    from sqlalchemy import and_, or_
+    from app.models.user import UserConnection, ConnectionStatus
+
+    def count_connections():
+        user_uuid = uuid.UUID(str(ctx.user_id))
+        accepted = ctx.db.query(UserConnection).filter(
+            and_(
+                UserConnection.status == ConnectionStatus.ACCEPTED,
+                or_(UserConnection.requester_id == user_uuid, UserConnection.receiver_id == user_uuid)
+            )
+        ).count()
+        pending = ctx.db.query(UserConnection).filter(
+            and_(UserConnection.status == ConnectionStatus.PENDING, UserConnection.receiver_id == user_uuid)
+        ).count()
+        return accepted, pending
+
+    accepted, pending = await run_sync_to_completion(count_connections)
+    message = f"You have {accepted} connection{'s' if accepted != 1 else ''}."
+    if pending:
+        message += f" {pending} connection request{'s are' if pending != 1 else ' is'} waiting for your response."
+    if not accepted and not pending:
+        message = "You don't have any connections yet. Want me to suggest some people who share your interests?"
+    return FastPathReply(message, "connections_inquiry")
+
+
+# Replies for common intents, only used at the heaviest degradation tier
+_COMMON_INTENT_REPLIES = (
+    (
+        re.compile(r"^\s*(?:hi|hello|hey|yo|hiya|good (?:morning|afternoon|evening))\b[\s!.?]*$"),
+        "Hi! I'm here to help you find activities, Joins and people who share your interests. What are you in the mood for?"
+    ),
+    (
+        re.compile(r"^\s*(?:thanks|thank you|thx|ty|cheers)\b"),
+        "You're welcome! Let me know if there's anything else I can help with."
+    ),
+    (
+        re.compile(r"\b(?:what can you do|how does this work|what do you do)\b"),
+        "I can suggest activities, find Joins happening near you, and connect you with people who share your interests. "
+        "Try asking me for something to do this weekend!"
+    ),
+)
+
+
+@fast_path.register(
+    "common_intent",
+    enabled=lambda: degradation_controller.at_least(DegradationTier.DETERMINISTIC)
+)
+async def _common_intent_responder(ctx: FastPathContext) -> Optional[FastPathReply]:
+    for pattern, reply in _COMMON_INTENT_REPLIES:
+        if pattern.search(ctx.message_lower):
+            return FastPathReply(reply, "general_chat", confidence=0.9)
+    return None
@@ -0,0 +1,312 @@
+"""
+Offline gazetteer: place names to coordinates and IANA timezones.
+
+Cities, regions (states, provinces) and countries are loaded once from the
+bundled CSV at GAZETTEER_PATH (relative paths are under python-backend/).
+Every name is indexed after normalization (case, accents, punctuation), so
+resolving "Salt Lake City", "slc", "Portland, ME" or "Paris, France" is a
+dict lookup. A bare name shared by several cities goes to the most
+populous, and a region or country resolves to its largest listed city.
+Coordinates ("40.76, -111.89") resolve to the nearest city through a k-d
+tree over the cities' positions on the unit sphere. tzinfo objects are
+built once per zone and cached.
+
+Free text ("any concerts in denver this weekend?") is scanned word by word
+for the longest indexed name. City names that are also everyday words or
+first names only count there right after "in", "near", "at", ...
+"""
+import csv
+import logging
+import math
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pytz
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_ROOT = Path(__file__).resolve().parents[2]
+_APOSTROPHES = re.compile(r"['’.]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_COORDINATES = re.compile(r"\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*")
+
+# Names that only count as places in free text after a location preposition
+_AMBIGUOUS = {
+    'la', 'austin', 'charlotte', 'madison', 'jackson', 'lincoln', 'buffalo', 'boulder', 'bend',
+    'mesa', 'providence', 'victoria', 'florence', 'eugene', 'regina', 'phoenix', 'orlando',
+    'aspen', 'salem', 'dover', 'columbia', 'georgia', 'virginia', 'nice', 'rio', 'reno',
+}
+_PREPOSITIONS = {'in', 'near', 'at', 'around', 'to', 'from', 'for', 'visiting'}
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """Lowercase ASCII words: "St. John's, NL" -> "st johns nl"."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return _NON_WORD.sub(' ', _APOSTROPHES.sub('', text)).strip()
+
+
+@lru_cache(maxsize=256)
+def zone(name: str) -> pytz.BaseTzInfo:
+    """The tzinfo for an IANA zone name, built once."""
+    return pytz.timezone(name)
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+class Place:
+    """One gazetteer city."""
+
+    __slots__ = ("name", "region", "country", "latitude", "longitude", "timezone", "population", "label")
+
+    def __init__(self, name: str, region: str, country: str, latitude: float, longitude: float,
+                 timezone: str, population: int, label: str):
+        self.name = name
+        self.region = region
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone = timezone
+        self.population = population
+        self.label = label  # "Portland, ME", "Paris, France"
+
+    @property
+    def key(self) -> str:
+        """Normalized name that resolves back to this place."""
+        return f"{normalize_name(self.name)}, {normalize_name(self.region or self.country)}"
+
+    @property
+    def coordinates(self) -> Dict[str, float]:
+        return {'lat': self.latitude, 'lng': self.longitude}
+
+    @property
+    def tz(self) -> pytz.BaseTzInfo:
+        return zone(self.timezone)
+
+    def __repr__(self):
+        return f"<Place {self.label}>"
+
+
+class _KDTree:
+    """Nearest-neighbour search over 3-d points."""
+
+    def __init__(self, points: Sequence[Tuple[Tuple[float, float, float], Place]]):
+        self._root = self._build(list(points), 0)
+
+    def _build(self, points: List[Tuple[Tuple[float, float, float], Place]], depth: int):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        return (points[middle], axis, self._build(points[:middle], depth + 1), self._build(points[middle + 1:], depth + 1))
+
+    def nearest(self, target: Tuple[float, float, float]) -> Optional[Place]:
+        best: List[Any] = [None, math.inf]
+
+        def visit(node) -> None:
+            if node is None:
+                return
+            (point, place), axis, left, right = node
+            distance = sum((a - b) ** 2 for a, b in zip(point, target))
+            if distance < best[1]:
+                best[0], best[1] = place, distance
+            offset = target[axis] - point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if offset ** 2 < best[1]:
+                visit(far)
+
+        visit(self._root)
+        return best[0]
+
+
+class Gazetteer:
+    """Name, free-text and nearest-city lookups over the bundled dataset."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._loaded = False
+        self._names: Dict[str, Place] = {}  # every normalized name -> place
+        self._cities: Dict[str, Place] = {}  # names that are cities (not regions or countries)
+        self._text: Dict[str, Tuple[Place, bool]] = {}  # names matched in free text -> (place, is a city)
+        self._max_words = 1
+        self._cities_loaded = 0
+        self._tree: Optional[_KDTree] = None
+        self.counts: Dict[str, int] = {"lookups": 0, "resolved": 0, "nearest": 0, "text_scans": 0}
+
+    def _file(self) -> Path:
+        path = Path(self._path or settings.GAZETTEER_PATH)
+        return path if path.is_absolute() else _BACKEND_ROOT / path
+
+    def _ensure(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._file(), newline='', encoding='utf-8') as handle:
+                rows = list(csv.DictReader(handle))
+        except OSError as e:
+            logger.error(f"Gazetteer not loaded from {self._file()}: {e}")
+            return
+        self._index(rows)
+        logger.info(f"Gazetteer loaded {self._cities_loaded} cities, {len(self._names)} names")
+
+    def _index(self, rows: List[Dict[str, str]]) -> None:
+        regions = [row for row in rows if row['kind'] == 'region']
+        countries = [row for row in rows if row['kind'] == 'country']
+        country_names = {row['country']: row['name'] for row in countries}
+        # Names a city can be qualified with: "portland me", "portland maine", "paris france"
+        qualifiers: Dict[Tuple[str, str], List[str]] = {}
+        for row in regions:
+            qualifiers[(row['country'], row['region'])] = [row['region'], row['name']] + self._aliases(row)
+        for row in countries:
+            qualifiers[(row['country'], '')] = [row['country'], row['name']] + self._aliases(row)
+
+        ordered: List[Tuple[Place, Dict[str, str]]] = []
+        for row in rows:
+            if row['kind'] != 'city':
+                continue
+            region, country = row['region'], row['country']
+            label = f"{row['name']}, {region}" if region and country in ('US', 'CA', 'AU') else f"{row['name']}, {country_names.get(country, country)}"
+            place = Place(
+                row['name'], region, country, float(row['latitude']), float(row['longitude']),
+                row['timezone'], int(row['population'] or 0), label
+            )
+            ordered.append((place, row))
+        # Most populous first, so it keeps a shared bare name
+        ordered.sort(key=lambda pair: -pair[0].population)
+
+        for place, row in ordered:
+            names = [row['name']] + self._aliases(row)
+            qualified = qualifiers.get((place.country, place.region), []) + qualifiers.get((place.country, ''), [])
+            for name in names:
+                base = normalize_name(name)
+                self._add(base, place, city=True, text=True)
+                for qualifier in qualified:
+                    # Two-letter codes ("me", "or") are too ambiguous to match in free text
+                    self._add(f"{base} {normalize_name(qualifier)}", place, city=True, text=len(qualifier) > 3)
+
+        for row in regions + countries:
+            members = [place for place, _ in ordered if place.country == row['country'] and (row['kind'] == 'country' or place.region == row['region'])]
+            if not members:
+                continue
+            for name in [row['name']] + self._aliases(row):
+                self._add(normalize_name(name), members[0], city=False, text=True)
+
+        self._cities_loaded = len(ordered)
+        self._tree = _KDTree([(_unit_vector(place.latitude, place.longitude), place) for place, _ in ordered])
+
+    @staticmethod
+    def _aliases(row: Dict[str, str]) -> List[str]:
+        return [alias for alias in (row.get('aliases') or '').split(';') if alias]
+
+    def _add(self, name: str, place: Place, city: bool, text: bool) -> None:
+        if not name or name in self._names:
+            return
+        self._names[name] = place
+        if city:
+            self._cities[name] = place
+        if text:
+            self._text[name] = (place, city)
+        self._max_words = max(self._max_words, name.count(' ') + 1)
+
+    def knows(self, name: Optional[str]) -> bool:
+        """Whether ``name`` is exactly a listed city, region or country name."""
+        self._ensure()
+        return normalize_name(name) in self._names
+
+    def lookup(self, location: Optional[str]) -> Optional[Place]:
+        """
+        The city a location string names, or None when it is not known.
+
+        Tries the whole string ("Utah", "Portland, Maine"), then its longest
+        leading city name ("Salt Lake City, UT, USA"), then any city named
+        inside it ("Downtown Denver"). Coordinates go to the nearest city.
+        """
+        if not location:
+            return None
+        self._ensure()
+        self.counts["lookups"] += 1
+        coordinates = _COORDINATES.fullmatch(location)
+        if coordinates:
+            return self.nearest(float(coordinates.group(1)), float(coordinates.group(2)))
+
+        words = normalize_name(location).split()
+        place = self._names.get(" ".join(words))
+        if place is None:
+            for size in range(min(len(words) - 1, self._max_words), 0, -1):
+                place = self._cities.get(" ".join(words[:size]))
+                if place is not None:
+                    break
+        if place is None:
+            # Strict, so an ambiguous name inside a venue ("The Lincoln Center") is not a city
+            place = self._scan(words, regions=False, strict=True)
+        if place is not None:
+            self.counts["resolved"] += 1
+        return place
+
+    def find_in_text(self, text: Optional[str]) -> Optional[Place]:
+        """The first place named in free text (a region or country counts as its largest city)."""
+        self._ensure()
+        self.counts["text_scans"] += 1
+        return self._scan(normalize_name(text).split(), regions=True, strict=True)
+
+    def _scan(self, words: List[str], regions: bool, strict: bool) -> Optional[Place]:
+        for start in range(len(words)):
+            for size in range(min(self._max_words, len(words) - start), 0, -1):
+                name = " ".join(words[start:start + size])
+                found = self._text.get(name)
+                if found is None or not (regions or found[1]):
+                    continue
+                if strict and name in _AMBIGUOUS and (start == 0 or words[start - 1] not in _PREPOSITIONS):
+                    continue
+                return found[0]
+        return None
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Place]:
+        """The listed city closest to a coordinate."""
+        self._ensure()
+        self.counts["nearest"] += 1
+        return self._tree.nearest(_unit_vector(latitude, longitude)) if self._tree else None
+
+    def coordinates(self, location: Optional[str]) -> Optional[Dict[str, float]]:
+        place = self.lookup(location)
+        return place.coordinates if place else None
+
+    def timezone(self, location: Optional[str], default: str = 'US/Pacific') -> pytz.BaseTzInfo:
+        """Timezone of a location, or ``default`` when it is unknown."""
+        place = self.lookup(location)
+        if place is None and location:
+            # A town we do not list still shares its state's zone: "Vernal, Utah"
+            place = self._scan(normalize_name(location).split(), regions=True, strict=False)
+        return place.tz if place else zone(default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "names": len(self._names),
+            "cities": self._cities_loaded,
+            **self.counts,
+            "zones_cached": zone.cache_info().currsize,
+        }
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """Cache key for a location: the gazetteer city's key, else the normalized text."""
+    place = gazetteer.lookup(location)
+    if place is not None:
+        return place.key
+    text = unicodedata.normalize('NFKD', location or '').encode('ascii', 'ignore').decode().lower()
+    text = re.sub(r"[^\w\s,]+", " ", text)
+    return re.sub(r"\s*,\s*", ", ", re.sub(r"\s+", " ", text)).strip(" ,")
+
+
+# Global instance
+gazetteer = Gazetteer()
@@ -0,0 +1,190 @@
+"""
+Explicit Gemini context caches for the static system prompt prefixes.
+
+When a request's system instruction starts with one of the precompiled
+prompt templates, that static block is stored once per API key and model
+as a provider-side cached context (caches are scoped to the key's project).
+Later requests then reference the cache by name and send only the dynamic
+remainder and the conversation, so the cached tokens are billed at the
+reduced cached-input rate and are not reprocessed every turn.
+
+Caches live for GEMINI_CONTEXT_CACHE_TTL_SECONDS. The TTL is extended in
+the background once less than GEMINI_CONTEXT_CACHE_REFRESH_SECONDS remain,
+so a busy template never lapses. A failed create (for example a prefix below
+the provider minimum) backs off for GEMINI_CONTEXT_CACHE_RETRY_SECONDS, and
+the request goes out uncached with a plain ``system_instruction``.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Set, Tuple
+
+from google.genai import types as new_types
+
+from app.core.config import settings
+from app.services.credential_pool import ApiCredential
+from app.services.prompt_templates import TEMPLATES, PromptTemplate
+
+logger = logging.getLogger(__name__)
+
+# (API key, model, template name)
+CacheKey = Tuple[str, str, str]
+
+
+def is_cached_content_error(error: Exception) -> bool:
+    """Whether a generate call failed because its cached context is gone or unusable."""
+    text = str(error)
+    return "cachedContent" in text or "CachedContent" in text or "cached content" in text.lower()
+
+
+class _CacheEntry:
+    def __init__(self, name: str, expires_at: float, label: str, model: str, template: str):
+        self.name = name
+        self.expires_at = expires_at  # time.monotonic() deadline
+        self.label = label
+        self.model = model
+        self.template = template
+        self.refreshing = False
+
+
+class GeminiContextCache:
+    """Provider-side cached contexts keyed by API key, model and prompt template."""
+
+    def __init__(self):
+        self._entries: Dict[CacheKey, _CacheEntry] = {}
+        self._failed_until: Dict[CacheKey, float] = {}
+        self._locks: Dict[CacheKey, asyncio.Lock] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.counts: Dict[str, int] = {
+            "hits": 0, "creates": 0, "refreshes": 0, "failures": 0, "invalidations": 0,
+        }
+        self.usage: Dict[str, int] = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+    def template_for(self, system_instruction: Optional[str]) -> Optional[PromptTemplate]:
+        """The longest cacheable template whose static block prefixes the system instruction."""
+        if not settings.GEMINI_CONTEXT_CACHE_ENABLED or not system_instruction:
+            return None
+        best = None
+        for template in TEMPLATES.values():
+            if template.prefix_tokens < settings.GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+                continue
+            if system_instruction.startswith(template.static):
+                if best is None or len(template.static) > len(best.static):
+                    best = template
+        return best
+
+    async def lookup(
+        self, credential: ApiCredential, model: str, template: PromptTemplate, executor: Executor
+    ) -> Optional[str]:
+        """Name of a live cached context for this key/model/template, creating it if needed."""
+        key = (credential.key, model, template.name)
+        entry = self._live_entry(key)
+        if entry:
+            self.counts["hits"] += 1
+            self._maybe_refresh(key, entry, credential, executor)
+            return entry.name
+        if self._failed_until.get(key, 0.0) > time.monotonic():
+            return None
+
+        # One create per key; concurrent requests wait for it instead of racing
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._live_entry(key)
+            if entry:
+                self.counts["hits"] += 1
+                return entry.name
+            if self._failed_until.get(key, 0.0) > time.monotonic():
+                return None
+            return await self._create(key, credential, model, template, executor)
+
+    def invalidate(self, credential: ApiCredential, model: str, template: PromptTemplate) -> None:
+        """Forget a cache the provider rejected; the next request recreates it."""
+        if self._entries.pop((credential.key, model, template.name), None):
+            self.counts["invalidations"] += 1
+
+    def record_usage(self, prompt_tokens: int, cached_tokens: int) -> None:
+        self.usage["requests"] += 1
+        self.usage["prompt_tokens"] += prompt_tokens
+        self.usage["cached_tokens"] += cached_tokens
+
+    def _live_entry(self, key: CacheKey) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        # Treat a cache about to expire as gone so a request never races its expiry
+        if entry and entry.expires_at - time.monotonic() > 5.0:
+            return entry
+        return None
+
+    async def _create(
+        self, key: CacheKey, credential: ApiCredential, model: str, template: PromptTemplate, executor: Executor
+    ) -> Optional[str]:
+        ttl = settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+        config = new_types.CreateCachedContentConfig(
+            display_name=f"lifestring-{template.name}-{template.prefix_hash}",
+            system_instruction=template.static,
+            ttl=f"{ttl}s",
+        )
+        loop = asyncio.get_event_loop()
+        try:
+            cached = await loop.run_in_executor(
+                executor, lambda: credential.client.caches.create(model=model, config=config)
+            )
+        except Exception as e:
+            self.counts["failures"] += 1
+            self._failed_until[key] = time.monotonic() + settings.GEMINI_CONTEXT_CACHE_RETRY_SECONDS
+            logger.warning(f"Gemini context cache create failed for {template.name} on {model} ({credential.label}): {e}")
+            return None
+
+        self.counts["creates"] += 1
+        self._failed_until.pop(key, None)
+        self._entries[key] = _CacheEntry(cached.name, time.monotonic() + ttl, credential.label, model, template.name)
+        logger.info(f"Created Gemini context cache {cached.name} for {template.name} on {model} ({credential.label})")
+        return cached.name
+
+    def _maybe_refresh(self, key: CacheKey, entry: _CacheEntry, credential: ApiCredential, executor: Executor) -> None:
+        if entry.refreshing or entry.expires_at - time.monotonic() > settings.GEMINI_CONTEXT_CACHE_REFRESH_SECONDS:
+            return
+        entry.refreshing = True
+        task = asyncio.get_event_loop().create_task(self._refresh(key, entry, credential, executor))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, key: CacheKey, entry: _CacheEntry, credential: ApiCredential, executor: Executor) -> None:
+        ttl = settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+        config = new_types.UpdateCachedContentConfig(ttl=f"{ttl}s")
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(executor, lambda: credential.client.caches.update(name=entry.name, config=config))
+        except Exception as e:
+            # Drop it; the next request past expiry creates a fresh cache
+            logger.warning(f"Gemini context cache refresh failed for {entry.name}: {e}")
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            return
+        finally:
+            entry.refreshing = False
+        entry.expires_at = time.monotonic() + ttl
+        self.counts["refreshes"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        prompt_tokens = self.usage["prompt_tokens"]
+        return {
+            "enabled": settings.GEMINI_CONTEXT_CACHE_ENABLED,
+            **self.counts,
+            **self.usage,
+            "cached_token_share": round(self.usage["cached_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "entries": [
+                {
+                    "key": entry.label,
+                    "model": entry.model,
+                    "template": entry.template,
+                    "expires_in": round(entry.expires_at - now, 1),
+                }
+                for entry in self._entries.values()
+            ],
+        }
+
+
+# Global instance
+gemini_context_cache = GeminiContextCache()
@@ -3,17 +3,22 @@ Google Gemini AI Service for Lifestring.
 Provides chat completion, function calling, and built-in web search capabilities.
 """
 import logging
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
 import json
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold, Tool
-# Import new SDK for Google Search grounding
+# google-genai SDK: one client per pooled API key (the older google.generativeai
+# SDK only supports a single process-wide key)
 from google import genai as new_genai
 from google.genai import types as new_types
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
+from app.core.admission import admission_controller
+from app.core.degradation import degradation_controller, DegradationTier
+from app.services.circuit_breaker import circuit_breakers, CircuitOpenError
+from app.services.credential_pool import ApiCredential, CredentialPool, configured_keys, is_rate_limit_error, retry_after_seconds
+from app.services.gemini_context_cache import gemini_context_cache, is_cached_content_error
+from app.services.prompt_templates import PromptTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -23,53 +28,190 @@ class GeminiService:
     
     def __init__(self):
         """Initialize Gemini service with API key and configuration."""
-        if settings.GOOGLE_API_KEY:
-            genai.configure(api_key=settings.GOOGLE_API_KEY)
+        self.pool = CredentialPool(
+            "gemini",
+            configured_keys(settings.GOOGLE_API_KEY, settings.GOOGLE_API_KEYS),
+            rpm_limit=settings.GEMINI_KEY_RPM_LIMIT,
+            tpm_limit=settings.GEMINI_KEY_TPM_LIMIT
+        )
+        if len(self.pool):
+            for credential in self.pool.credentials:
+                credential.client = new_genai.Client(api_key=credential.key)
             self.enabled = True
-            logger.info("Gemini service initialized successfully")
+            logger.info(f"Gemini service initialized successfully with {len(self.pool)} API key(s)")
         else:
             self.enabled = False
             logger.warning("Gemini service disabled - no API key provided")
 
-        # Thread pool for async operations
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Thread pool for async operations, sized to the admission limit so
+        # admitted calls never queue again inside the executor
+        self.executor = ThreadPoolExecutor(max_workers=settings.GEMINI_MAX_CONCURRENCY)
     
-    def _get_safety_settings(self) -> Dict[HarmCategory, HarmBlockThreshold]:
+    def _get_safety_settings(self) -> List[new_types.SafetySetting]:
         """Get safety settings for Gemini API."""
-        return {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-        }
-    
-    def _format_messages_for_gemini(self, messages: List[Dict[str, str]]) -> str:
-        """Convert OpenAI-style messages to Gemini prompt format."""
-        formatted_parts = []
-        
+        return [
+            new_types.SafetySetting(category=category, threshold="BLOCK_ONLY_HIGH")
+            for category in (
+                "HARM_CATEGORY_HARASSMENT",
+                "HARM_CATEGORY_HATE_SPEECH",
+                "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                "HARM_CATEGORY_DANGEROUS_CONTENT",
+            )
+        ]
+
+    async def _generate(
+        self,
+        model: str,
+        contents: List[new_types.Content],
+        config: new_types.GenerateContentConfig,
+        cache_template: Optional[PromptTemplate] = None
+    ) -> Any:
+        """
+        Run generate_content on the pooled key with the most headroom.
+
+        A 429 rests the key and, when another key is configured, retries there once.
+        With ``cache_template``, the template's static block is served from the
+        key's cached context instead of being sent in ``system_instruction``.
+        """
+        attempts = min(2, len(self.pool))
+        credential = None
+        for attempt in range(attempts):
+            credential = self.pool.acquire(exclude=credential)
+            try:
+                response = await self._generate_with_credential(credential, model, contents, config, cache_template)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    self.pool.release(credential)
+                    raise
+                self.pool.mark_rate_limited(credential, retry_after_seconds(e))
+                if attempt + 1 < attempts:
+                    continue
+                raise
+            except BaseException:
+                self.pool.release(credential)
+                raise
+
+            usage = getattr(response, "usage_metadata", None)
+            self.pool.release(credential, tokens=(getattr(usage, "total_token_count", 0) or 0) if usage else 0)
+            return response
+
+    async def _generate_with_credential(
+        self,
+        credential: ApiCredential,
+        model: str,
+        contents: List[new_types.Content],
+        config: new_types.GenerateContentConfig,
+        cache_template: Optional[PromptTemplate]
+    ) -> Any:
+        loop = asyncio.get_event_loop()
+
+        def call(request_contents, request_config):
+            return loop.run_in_executor(
+                self.executor,
+                lambda: credential.client.models.generate_content(
+                    model=model,
+                    contents=request_contents,
+                    config=request_config
+                )
+            )
+
+        cache_name = None
+        if cache_template is not None:
+            cache_name = await gemini_context_cache.lookup(credential, model, cache_template, self.executor)
+        if not cache_name:
+            return await call(contents, config)
+
+        try:
+            return await call(*self._with_cached_context(contents, config, cache_name, cache_template))
+        except Exception as e:
+            if is_rate_limit_error(e) or not is_cached_content_error(e):
+                raise
+            # Expired or deleted on the provider side: forget it and send this request uncached
+            logger.warning(f"Gemini cached context {cache_name} rejected, retrying uncached: {e}")
+            gemini_context_cache.invalidate(credential, model, cache_template)
+            return await call(contents, config)
+
+    @staticmethod
+    def _with_cached_context(
+        contents: List[new_types.Content],
+        config: new_types.GenerateContentConfig,
+        cache_name: str,
+        template: PromptTemplate
+    ) -> Tuple[List[new_types.Content], new_types.GenerateContentConfig]:
+        """Swap the system instruction's static block for the cached context."""
+        # A request may not set system_instruction alongside cached_content, so
+        # the per-request remainder (time, profile) leads the first user turn
+        remainder = (config.system_instruction or "")[len(template.static):].strip()
+        if remainder:
+            if contents and contents[0].role == "user":
+                first = new_types.Content(role="user", parts=[new_types.Part(text=remainder), *contents[0].parts])
+                contents = [first, *contents[1:]]
+            else:
+                contents = [new_types.Content(role="user", parts=[new_types.Part(text=remainder)]), *contents]
+        config = config.model_copy(update={"system_instruction": None, "cached_content": cache_name})
+        return contents, config
+
+    def _format_messages_for_gemini(
+        self, messages: List[Dict[str, str]]
+    ) -> Tuple[Optional[str], List[new_types.Content]]:
+        """
+        Convert OpenAI-style messages to a Gemini system instruction and role-tagged contents.
+
+        System messages are joined into the system instruction; assistant turns
+        become "model" turns, and consecutive turns of one role are merged.
+        """
+        system_parts = []
+        contents: List[new_types.Content] = []
+
         for message in messages:
             role = message.get("role", "user")
-            content = message.get("content", "")
-            
+            content = message.get("content") or ""
+
             if role == "system":
-                formatted_parts.append(f"System Instructions: {content}")
-            elif role == "user":
-                formatted_parts.append(f"User: {content}")
-            elif role == "assistant":
-                formatted_parts.append(f"Assistant: {content}")
-        
-        return "\n\n".join(formatted_parts)
-    
-    def _calculate_cost(self, input_tokens: int, output_tokens: int, model: str) -> float:
-        """Calculate cost based on Gemini pricing."""
+                system_parts.append(content)
+                continue
+            if role not in ("user", "assistant") or not content:
+                continue
+
+            gemini_role = "model" if role == "assistant" else "user"
+            if contents and contents[-1].role == gemini_role:
+                contents[-1].parts.append(new_types.Part(text=content))
+            else:
+                contents.append(new_types.Content(role=gemini_role, parts=[new_types.Part(text=content)]))
+
+        system_instruction = "\n\n".join(system_parts) or None
+        if not contents:
+            # generate_content needs at least one turn; send the instructions as the turn
+            contents = [new_types.Content(role="user", parts=[new_types.Part(text=system_instruction or "")])]
+            system_instruction = None
+
+        return system_instruction, contents
+
+    @staticmethod
+    def _usage_tokens(response: Any) -> Tuple[int, int, int]:
+        """(prompt, cached, output) token counts from a response's usage metadata."""
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return 0, 0, 0
+        return (
+            getattr(usage, "prompt_token_count", 0) or 0,
+            getattr(usage, "cached_content_token_count", 0) or 0,
+            getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+    def _calculate_cost(self, input_tokens: int, output_tokens: int, model: str, cached_tokens: int = 0) -> float:
+        """Calculate cost based on Gemini pricing; ``cached_tokens`` is the cached share of ``input_tokens``."""
         if "flash" in model.lower():
             # Gemini 1.5 Flash: $0.075/1M input, $0.30/1M output
-            input_cost = (input_tokens / 1_000_000) * 0.075
-            output_cost = (output_tokens / 1_000_000) * 0.30
+            input_rate, output_rate = 0.075, 0.30
         else:
             # Gemini 1.5 Pro: $1.25/1M input, $5.00/1M output
-            input_cost = (input_tokens / 1_000_000) * 1.25
-            output_cost = (output_tokens / 1_000_000) * 5.00
+            input_rate, output_rate = 1.25, 5.00
+
+        cached_tokens = min(cached_tokens, input_tokens)
+        input_cost = ((input_tokens - cached_tokens) / 1_000_000) * input_rate
+        input_cost += (cached_tokens / 1_000_000) * input_rate * settings.GEMINI_CACHED_INPUT_PRICE_FACTOR
+        output_cost = (output_tokens / 1_000_000) * output_rate
         
         return input_cost + output_cost
     
@@ -103,47 +245,53 @@ class GeminiService:
         
         if not model:
             model = settings.GEMINI_MODEL
-        
+
+        # Grounding search is the first thing shed under load; the cheap-model tier pins Flash
+        if use_search and degradation_controller.at_least(DegradationTier.NO_SCRAPING):
+            use_search = False
+        if degradation_controller.at_least(DegradationTier.CHEAP_NO_TOOLS):
+            model = settings.GEMINI_MODEL_FLASH
+
+        if circuit_breakers.get(f"gemini:{model}").is_open():
+            raise CircuitOpenError(f"Circuit gemini:{model} is open")
+
+        # Admission is taken outside the breakers so shed calls never count as provider failures
+        await admission_controller.acquire("gemini")
         try:
             # Format messages for Gemini
-            prompt = self._format_messages_for_gemini(messages)
+            system_instruction, contents = self._format_messages_for_gemini(messages)
 
             # Configure generation parameters
-            generation_config = genai.types.GenerationConfig(
+            generation_config = new_types.GenerateContentConfig(
+                system_instruction=system_instruction,
                 temperature=temperature,
                 max_output_tokens=max_tokens,
                 candidate_count=1,
-            )
-
-            # Create model instance (tools will be passed to generate_content)
-            gemini_model = genai.GenerativeModel(
-                model_name=model,
-                generation_config=generation_config,
                 safety_settings=self._get_safety_settings()
             )
 
             # Generate response (run in thread pool for async)
-            loop = asyncio.get_event_loop()
+            grounding_breaker = circuit_breakers.get("gemini:grounding")
+            if use_search and grounding_breaker.is_open():
+                logger.info("Google Search grounding circuit open, generating without search")
+                use_search = False
+
             if use_search:
                 # Enable Google Search grounding using new SDK
                 logger.info("Using Google Search grounding for real-time information")
                 try:
-                    # Use new SDK completely for Google Search grounding
-                    new_client = new_genai.Client(api_key=settings.GOOGLE_API_KEY)
                     grounding_tool = new_types.Tool(google_search=new_types.GoogleSearch())
+                    # Grounded calls send the system instruction uncached: a request
+                    # using a cached context cannot add tools of its own
                     config = new_types.GenerateContentConfig(
+                        system_instruction=system_instruction,
                         tools=[grounding_tool],
                         temperature=temperature,
                         max_output_tokens=max_tokens
                     )
 
-                    response = await loop.run_in_executor(
-                        self.executor,
-                        lambda: new_client.models.generate_content(
-                            model=model,
-                            contents=prompt,
-                            config=config
-                        )
+                    response = await grounding_breaker.call(
+                        lambda: self._generate(model, contents, config)
                     )
 
                     # Extract content from new SDK response with detailed debugging
@@ -229,21 +377,19 @@ class GeminiService:
                     logger.info(f"🔍 RESPONSE DEBUG: Final content length: {len(content)}")
 
                     # Get token usage if available, with proper None handling
-                    input_tokens = 0
-                    output_tokens = 0
-                    if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                        input_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0) or 0
-                        output_tokens = getattr(response.usage_metadata, 'candidates_token_count', 0) or 0
+                    input_tokens, cached_tokens, output_tokens = self._usage_tokens(response)
                     total_tokens = int(input_tokens + output_tokens)
+                    gemini_context_cache.record_usage(input_tokens, cached_tokens)
 
                     # Calculate cost
-                    cost = self._calculate_cost(int(input_tokens), int(output_tokens), model)
+                    cost = self._calculate_cost(int(input_tokens), int(output_tokens), model, cached_tokens)
 
-                    logger.info(f"Gemini completion with Google Search successful: {total_tokens} tokens, ${cost:.4f}")
+                    logger.info(f"Gemini completion with Google Search successful: {total_tokens} tokens ({cached_tokens} cached), ${cost:.4f}")
 
                     return {
                         "content": content,
                         "tokens": total_tokens,
+                        "cached_tokens": cached_tokens,
                         "cost": cost,
                         "model": model,
                         "search_used": True
@@ -255,42 +401,50 @@ class GeminiService:
                     use_search = False
 
             if not use_search:
-                # Regular generation without tools using old SDK
-                response = await loop.run_in_executor(
-                    self.executor,
-                    lambda: gemini_model.generate_content(prompt)
+                # Regular generation without tools
+                cache_template = gemini_context_cache.template_for(system_instruction)
+                response = await circuit_breakers.get(f"gemini:{model}").call(
+                    lambda: self._generate(model, contents, generation_config, cache_template)
                 )
 
             # Extract response content
             content = response.text if response.text else ""
 
             # Get actual token usage if available
+            cached_tokens = 0
             if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                input_tokens = response.usage_metadata.prompt_token_count or 0
-                output_tokens = response.usage_metadata.candidates_token_count or 0
+                input_tokens, cached_tokens, output_tokens = self._usage_tokens(response)
                 total_tokens = response.usage_metadata.total_token_count or (input_tokens + output_tokens)
+                gemini_context_cache.record_usage(input_tokens, cached_tokens)
             else:
                 # Fallback to estimation
-                input_tokens = len(prompt.split()) * 1.3  # Rough estimate
+                prompt_text = " ".join(message.get("content") or "" for message in messages)
+                input_tokens = len(prompt_text.split()) * 1.3  # Rough estimate
                 output_tokens = len(content.split()) * 1.3  # Rough estimate
                 total_tokens = int(input_tokens + output_tokens)
 
             # Calculate cost
-            cost = self._calculate_cost(int(input_tokens), int(output_tokens), model)
+            cost = self._calculate_cost(int(input_tokens), int(output_tokens), model, cached_tokens)
 
-            logger.info(f"Gemini completion successful: {total_tokens} tokens, ${cost:.4f}")
+            logger.info(f"Gemini completion successful: {total_tokens} tokens ({cached_tokens} cached), ${cost:.4f}")
 
             return {
                 "content": content,
                 "tokens": total_tokens,
+                "cached_tokens": cached_tokens,
                 "cost": cost,
                 "model": model,
                 "search_used": False  # This is the fallback path without search
             }
             
+        except CircuitOpenError:
+            # Let callers see the short-circuit and move straight to their fallback
+            raise
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             raise Exception(f"Gemini API error: {str(e)}")
+        finally:
+            admission_controller.release("gemini")
 
 
 # Global instance
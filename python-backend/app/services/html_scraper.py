@@ -0,0 +1,293 @@
+"""
+Event page scraping kept off the event loop.
+
+Pages are streamed in chunks and cut off at SCRAPE_MAX_BYTES (pages that
+announce more than SCRAPE_SKIP_BYTES are not read at all), and parsing,
+the regex- and BeautifulSoup-heavy part, runs in a process pool so a large
+page cannot stall the requests sharing this worker's event loop. Patterns
+are compiled once per process. Fetch size, truncation, parse time and
+failures are recorded per source.
+
+The parsers are module-level functions so the pool can pickle them by name.
+"""
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_BYTES = 64 * 1024
+
+# Eventbrite cards (BeautifulSoup) and the regex fallback
+_CARD_CLASS = re.compile(r'event|card|listing', re.I)
+_CARD_TITLE = re.compile(r'.{5,}')
+_MONTH_DAY = re.compile(r'(Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct)\s+(\d{1,2})')
+_MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+           'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+_TITLE_PATTERNS = [
+    re.compile(r'<h[1-6][^>]*>([^<]{10,100})</h[1-6]>', re.I),  # Headers
+    re.compile(r'<a[^>]*>([^<]{10,100})</a>', re.I),  # Links
+    re.compile(r'title="([^"]{10,100})"', re.I),  # Title attributes
+    re.compile(r'alt="([^"]{10,100})"', re.I),  # Alt attributes
+]
+# Common non-event text
+_SKIP_WORDS = ('cookie', 'privacy', 'terms', 'login', 'sign up', 'search',
+               'menu', 'navigation', 'footer', 'header', 'advertisement')
+
+
+def _card_date(text: str, today: datetime) -> str:
+    """Month/day found in a card, in its next occurrence; this weekend when there is none."""
+    match = _MONTH_DAY.search(text)
+    if not match:
+        return (today + timedelta(days=2)).strftime('%Y-%m-%d')
+    month, day = _MONTHS[match.group(1)], int(match.group(2))
+    try:
+        date = datetime(today.year, month, day)
+    except ValueError:
+        return (today + timedelta(days=2)).strftime('%Y-%m-%d')
+    if date < today - timedelta(days=30):
+        # "Jan 5" seen in December is next year's
+        date = date.replace(year=today.year + 1)
+    return date.strftime('%Y-%m-%d')
+
+
+def parse_eventbrite_html(html: str, location: str, limit: int) -> List[Dict[str, Any]]:
+    """Parse Eventbrite HTML to extract real events (like ChatGPT does)."""
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return parse_eventbrite_html_regex(html, location, limit)
+
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        today = datetime.now()
+        events = []
+
+        # Look for event cards/containers
+        for element in soup.find_all(['div', 'article', 'section'], class_=_CARD_CLASS)[:limit]:
+            title_elem = element.find(['h1', 'h2', 'h3', 'h4', 'a'], string=_CARD_TITLE)
+            if not title_elem:
+                continue
+
+            title = title_elem.get_text().strip()
+            if len(title) < 5 or 'cookie' in title.lower():
+                continue
+
+            text = element.get_text()
+            events.append({
+                'title': title[:100],
+                'date': _card_date(text, today),
+                'time': '19:00',  # Default evening time
+                'location': location,
+                'description': f'Live event: {title}',
+                'free': 'free' in text.lower(),
+                'source': 'Eventbrite (Web)'
+            })
+
+        return events
+    except Exception:
+        return parse_eventbrite_html_regex(html, location, limit)
+
+
+def parse_eventbrite_html_regex(html: str, location: str, limit: int) -> List[Dict[str, Any]]:
+    """Parse Eventbrite HTML using regex (fallback when BeautifulSoup not available)."""
+    # Undated titles are assumed to be this weekend
+    event_date = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
+    events = []
+    found_titles = set()
+
+    for pattern in _TITLE_PATTERNS:
+        for match in pattern.finditer(html):
+            title = match.group(1).strip()
+            if (len(title) < 10 or title in found_titles or
+                    any(skip in title.lower() for skip in _SKIP_WORDS)):
+                continue
+
+            found_titles.add(title)
+            events.append({
+                'title': title,
+                'date': event_date,
+                'time': '19:00',
+                'location': location,
+                'description': f'Live event: {title}',
+                'free': 'free' in title.lower(),
+                'source': 'Eventbrite (Web/Regex)'
+            })
+            if len(events) >= limit:
+                return events
+
+    return events
+
+
+def parse_facebook_html(html: str, location: str, limit: int) -> List[Dict[str, Any]]:
+    """Parse Facebook HTML to extract real events."""
+    # Facebook is heavily protected, so return empty for now
+    # In production, you'd use Facebook Graph API
+    return []
+
+
+Parser = Callable[[str, str, int], List[Dict[str, Any]]]
+
+
+def _timed_parse(parser: Parser, html: str, location: str, limit: int) -> Tuple[List[Dict[str, Any]], float]:
+    """Runs in a pool process; returns the events and the CPU time spent parsing."""
+    started = time.process_time()
+    events = parser(html, location, limit)
+    return events, time.process_time() - started
+
+
+class ScrapeStats:
+    """Fetch sizes and parse times for one scraped source."""
+
+    def __init__(self, window: int = 50):
+        self.fetches = 0
+        self.truncated = 0
+        self.skipped_oversize = 0
+        self.failures = 0
+        self.parse_timeouts = 0
+        self._bytes: Deque[int] = deque(maxlen=window)
+        self._parse_seconds: Deque[float] = deque(maxlen=window)
+
+    def record_fetch(self, size: int) -> None:
+        self._bytes.append(size)
+
+    def record_parse(self, seconds: float) -> None:
+        self._parse_seconds.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        parse = sorted(self._parse_seconds)
+        return {
+            "fetches": self.fetches,
+            "truncated": self.truncated,
+            "skipped_oversize": self.skipped_oversize,
+            "failures": self.failures,
+            "parse_timeouts": self.parse_timeouts,
+            "avg_bytes": int(sum(self._bytes) / len(self._bytes)) if self._bytes else None,
+            "avg_parse_seconds": round(sum(parse) / len(parse), 4) if parse else None,
+            "max_parse_seconds": round(parse[-1], 4) if parse else None,
+        }
+
+
+class HtmlScraper:
+    """Size-capped streamed fetches and out-of-process parsing."""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats: Dict[str, ScrapeStats] = {}
+        self._recycles = 0
+
+    def _stats_for(self, source: str) -> ScrapeStats:
+        if source not in self._stats:
+            self._stats[source] = ScrapeStats()
+        return self._stats[source]
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the parent has an event loop and client threads running
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.SCRAPE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def fetch(self, session: aiohttp.ClientSession, source: str, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Page text, cut off at SCRAPE_MAX_BYTES; None on errors or oversized pages."""
+        stats = self._stats_for(source)
+        stats.fetches += 1
+        try:
+            timeout = aiohttp.ClientTimeout(total=settings.SCRAPE_FETCH_TIMEOUT)
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                if response.status != 200:
+                    logger.warning(f"{source} returned status {response.status}")
+                    stats.failures += 1
+                    return None
+                if (response.content_length or 0) > settings.SCRAPE_SKIP_BYTES:
+                    logger.warning(f"Skipping {source}: {response.content_length} bytes")
+                    stats.skipped_oversize += 1
+                    return None
+
+                chunks, size = [], 0
+                async for chunk in response.content.iter_chunked(_CHUNK_BYTES):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= settings.SCRAPE_MAX_BYTES:
+                        stats.truncated += 1
+                        break
+                encoding = response.get_encoding() if response.charset else 'utf-8'
+        except Exception as e:
+            logger.warning(f"Could not scrape {source}: {e}")
+            stats.failures += 1
+            return None
+
+        body = b''.join(chunks)[:settings.SCRAPE_MAX_BYTES]
+        stats.record_fetch(len(body))
+        return body.decode(encoding, errors='replace')
+
+    async def parse(self, source: str, parser: Parser, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
+        """Run ``parser`` in the process pool, bounded by SCRAPE_PARSE_TIMEOUT."""
+        stats = self._stats_for(source)
+        loop = asyncio.get_event_loop()
+        try:
+            events, seconds = await asyncio.wait_for(
+                loop.run_in_executor(self._executor(), _timed_parse, parser, html, location, limit),
+                timeout=settings.SCRAPE_PARSE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            stats.parse_timeouts += 1
+            logger.warning(f"Parsing {source} timed out after {settings.SCRAPE_PARSE_TIMEOUT}s; restarting the scrape pool")
+            # The worker is still stuck on the page; kill it rather than lose the slot for good
+            self._recycle()
+            return []
+        except BrokenProcessPool:
+            stats.failures += 1
+            logger.error(f"Scrape pool broke while parsing {source}; restarting it")
+            self._pool = None
+            return []
+        except Exception as e:
+            stats.failures += 1
+            logger.error(f"Error parsing {source} HTML: {e}")
+            return []
+
+        stats.record_parse(seconds)
+        logger.info(f"Parsed {len(events)} events from {source} ({len(html)} chars) in {seconds:.3f}s")
+        return events
+
+    def _recycle(self) -> None:
+        """Terminate the pool's workers; the next parse starts a fresh pool."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self._recycles += 1
+        # shutdown() drops the process table, so take it first
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool_started": self._pool is not None,
+            "pool_recycles": self._recycles,
+            "sources": {source: stats.snapshot() for source, stats in self._stats.items()},
+        }
+
+
+# Global instance
+html_scraper = HtmlScraper()
@@ -2,14 +2,23 @@
 Hybrid AI Service for Lifestring.
 Intelligently routes queries between Gemini and GPT based on query type and complexity.
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 import re
 from enum import Enum
 
 from app.services.openai_service import openai_service
 from app.services.gemini_service import gemini_service
 from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.admission import AdmissionRejected
+from app.core.degradation import degradation_controller, DegradationTier
+from app.services.provider_stats import provider_stats, hedge_stats
+from app.services.circuit_breaker import circuit_breakers
+from app.services.model_cascade import response_verifier, cascade_stats
+from app.services.intent_classifier import query_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -56,53 +65,12 @@ class HybridAIService:
         user_message = ""
         for msg in reversed(messages):
             if msg.get("role") == "user":
-                user_message = msg.get("content", "").lower()
+                user_message = msg.get("content", "")
                 break
-        
-        # Real-time/Events queries (Gemini excels with built-in search)
-        realtime_keywords = [
-            "events", "happening", "today", "tomorrow", "weekend", "this week",
-            "weather", "news", "current", "latest", "now", "recent",
-            "what's going on", "activities", "concerts", "shows", "live music",
-            "playing", "performing", "tickets", "tix", "venue", "theater", "theatre"
-        ]
-        
-        if any(keyword in user_message for keyword in realtime_keywords):
-            return QueryType.REALTIME_EVENTS
-        
-        # Profile matching and connections (GPT excels at reasoning)
-        profile_keywords = [
-            "find people", "connections", "match", "similar interests",
-            "profile", "compatibility", "recommend users", "meet people"
-        ]
-        
-        if any(keyword in user_message for keyword in profile_keywords):
-            return QueryType.PROFILE_MATCHING
-        
-        # Creative writing (GPT excels at creativity)
-        creative_keywords = [
-            "write", "create", "compose", "draft", "story", "poem",
-            "creative", "imagine", "describe", "elaborate"
-        ]
-        
-        if any(keyword in user_message for keyword in creative_keywords):
-            return QueryType.CREATIVE_WRITING
-        
-        # Complex reasoning (GPT excels at logic)
-        complex_keywords = [
-            "analyze", "compare", "explain why", "reasoning", "logic",
-            "complex", "detailed analysis", "pros and cons", "evaluate"
-        ]
-        
-        if any(keyword in user_message for keyword in complex_keywords):
-            return QueryType.COMPLEX_REASONING
-        
-        # Simple questions (Gemini is faster and cheaper)
-        if len(user_message.split()) <= 10 and ("?" in user_message or user_message.startswith(("what", "how", "when", "where", "who"))):
-            return QueryType.SIMPLE_QUESTION
-        
-        # Default to general chat
-        return QueryType.GENERAL_CHAT
+
+        query_type, confidence, source = query_classifier.classify(user_message)
+        logger.debug(f"Classified query as {query_type} via {source} (confidence {confidence})")
+        return QueryType(query_type)
     
     def _choose_model(self, query_type: QueryType, force_model: Optional[ModelChoice] = None) -> ModelChoice:
         """Choose the best model based on query type and availability."""
@@ -143,6 +111,68 @@ class HybridAIService:
             # Default to Gemini for cost savings
             return ModelChoice.GEMINI if settings.USE_GEMINI_FOR_REALTIME else ModelChoice.GPT
     
+    def _circuit_open(self, choice: ModelChoice) -> bool:
+        """Whether the provider's default model(s) are currently short-circuited."""
+        if choice == ModelChoice.GEMINI:
+            return circuit_breakers.get(f"gemini:{settings.GEMINI_MODEL}").is_open()
+        # OpenAIService falls back to CHAT_MODEL_FALLBACK on its own, so both must be open
+        return (
+            circuit_breakers.get(f"openai:{settings.CHAT_MODEL}").is_open()
+            and circuit_breakers.get(f"openai:{settings.CHAT_MODEL_FALLBACK}").is_open()
+        )
+
+    def _route(self, query_type: QueryType, force_model: Optional[ModelChoice] = None) -> Tuple[ModelChoice, str]:
+        """
+        Pick a provider using live stats on top of the static keyword routing.
+
+        The static choice from _choose_model is kept unless the objective in
+        settings.ROUTING_OBJECTIVE says otherwise, or it is currently missing
+        its p95/error-rate targets and the other provider is not.
+        """
+        static_choice = self._choose_model(query_type, force_model)
+        objective = settings.ROUTING_OBJECTIVE
+
+        if force_model and force_model != ModelChoice.AUTO:
+            return static_choice, f"{static_choice.value} forced by caller"
+
+        # An open circuit means the provider is failing outright; skip it without paying for the call
+        if self.gemini_enabled and self.gpt_enabled and self._circuit_open(static_choice):
+            other = ModelChoice.GPT if static_choice == ModelChoice.GEMINI else ModelChoice.GEMINI
+            if not self._circuit_open(other):
+                return other, f"{other.value} chosen for {query_type.value}: {static_choice.value} circuit open"
+        if not (self.gemini_enabled and self.gpt_enabled) or objective == "static":
+            return static_choice, f"{static_choice.value} chosen for {query_type.value}"
+
+        candidates = [ModelChoice.GEMINI, ModelChoice.GPT]
+        healthy = [c for c in candidates if provider_stats.is_healthy(c.value, query_type.value)]
+        if not healthy:
+            return static_choice, f"{static_choice.value} chosen for {query_type.value} (no provider meeting targets)"
+        if static_choice not in healthy:
+            alternative = healthy[0]
+            return alternative, f"{alternative.value} chosen for {query_type.value}: {static_choice.value} degraded"
+
+        # Only compare providers that have enough fresh samples to be trusted
+        measured = [
+            c for c in healthy
+            if provider_stats.get(c.value, query_type.value).samples >= settings.ROUTING_MIN_SAMPLES
+        ]
+        if len(measured) < 2:
+            return static_choice, f"{static_choice.value} chosen for {query_type.value}"
+
+        if objective == "fastest":
+            best = min(measured, key=lambda c: provider_stats.get(c.value, query_type.value).latency_ewma or float("inf"))
+            return best, f"{best.value} chosen for {query_type.value}: lowest EWMA latency"
+
+        # "cheapest": lowest EWMA cost among providers meeting the targets
+        best = min(measured, key=lambda c: provider_stats.get(c.value, query_type.value).cost_ewma or 0.0)
+        return best, f"{best.value} chosen for {query_type.value}: cheapest within p95 target"
+
+    async def _bounded(self, stage: str, coro, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Await a provider call, bounded by the request deadline when one is given."""
+        if deadline is None:
+            return await coro
+        return await deadline.run(stage, coro, cap=settings.LLM_CALL_TIMEOUT)
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -152,6 +182,9 @@ class HybridAIService:
         tools: Optional[List[Dict[str, Any]]] = None,
         context: Dict[str, Any] = None,
         force_model: Optional[ModelChoice] = None,
+        deadline: Optional[Deadline] = None,
+        hedge: Optional[bool] = None,
+        cascade: Optional[bool] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -165,66 +198,85 @@ class HybridAIService:
             tools: Available tools/functions
             context: Additional context for routing decisions
             force_model: Force use of specific AI provider
+            deadline: Optional request deadline; each provider call is bounded by
+                the remaining budget and the fallback is skipped when it runs out
+            hedge: Send a backup request if the chosen provider is slow
+                (defaults to settings.HEDGING_ENABLED)
+            cascade: Answer on the cheap tier first and escalate to
+                CHAT_MODEL_PREMIUM if the verifier rejects the answer
+                (defaults to settings.MODEL_CASCADE_ENABLED; ignored when model is set)
             **kwargs: Additional parameters
             
         Returns:
             Dict with response, model info, and routing decision
         """
+        chosen_model = None
+        degraded_model = None
+        query_type = QueryType.GENERAL_CHAT
         try:
             # Classify query and choose model
             query_type = self._classify_query(messages, context)
-            chosen_model = self._choose_model(query_type, force_model)
+            chosen_model, routing_reason = self._route(query_type, force_model)
             
-            logger.info(f"Query classified as {query_type.value}, routing to {chosen_model.value}")
+            logger.info(f"Query classified as {query_type.value}, routing to {chosen_model.value} ({routing_reason})")
+
+            # Under heavy load: one cheap call, no escalation or hedge
+            if degradation_controller.at_least(DegradationTier.CHEAP_NO_TOOLS):
+                # Kept apart from ``model``: the GPT fallback below must not inherit a Gemini name
+                degraded_model = settings.GEMINI_MODEL_FLASH if chosen_model == ModelChoice.GEMINI else settings.CHAT_MODEL_FALLBACK
+                tools = None
+                cascade = hedge = False
+                routing_reason = f"{routing_reason}; degraded to {degraded_model}"
             
-            # Route to appropriate service
-            if chosen_model == ModelChoice.GEMINI:
-                # Use Gemini with built-in search for real-time queries
-                use_search = query_type == QueryType.REALTIME_EVENTS
-                
-                response = await self.gemini_service.chat_completion(
-                    messages=messages,
-                    model=model or settings.GEMINI_MODEL,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    tools=tools,
-                    use_search=use_search,
-                    **kwargs
+            # Cheap-first cascade: start on the fast tier unless the caller pinned a model
+            use_cascade = (settings.MODEL_CASCADE_ENABLED if cascade is None else cascade) and not (model or degraded_model)
+            first_model = degraded_model or model
+            if use_cascade:
+                first_model = settings.GEMINI_MODEL_FLASH if chosen_model == ModelChoice.GEMINI else settings.CHAT_MODEL_FALLBACK
+
+            # A forced provider must not be hedged onto the other one
+            forced = force_model is not None and force_model != ModelChoice.AUTO
+            if (settings.HEDGING_ENABLED if hedge is None else hedge) and not forced:
+                response, answered_by = await self._call_with_hedge(
+                    chosen_model, query_type, messages, first_model, temperature, max_tokens, tools, deadline, **kwargs
                 )
-                
-                response["provider"] = "gemini"
-                response["query_type"] = query_type.value
-                response["routing_reason"] = f"Gemini chosen for {query_type.value}"
-                
-            else:  # GPT
-                response = await self.openai_service.chat_completion(
-                    messages=messages,
-                    model=model or settings.CHAT_MODEL,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    tools=tools,
-                    **kwargs
+                if answered_by != chosen_model:
+                    routing_reason = f"{routing_reason}; hedge to {answered_by.value} won"
+            else:
+                response = await self._call_provider(
+                    chosen_model, query_type, messages, first_model, temperature, max_tokens, tools, deadline, **kwargs
                 )
-                
-                response["provider"] = "openai"
-                response["query_type"] = query_type.value
-                response["routing_reason"] = f"GPT chosen for {query_type.value}"
+                answered_by = chosen_model
+
+            if use_cascade:
+                response, escalation_reason = await self._escalate_if_rejected(
+                    response, query_type, messages, temperature, max_tokens, tools, deadline, **kwargs
+                )
+                if escalation_reason:
+                    answered_by = ModelChoice.GPT
+                    routing_reason = f"{routing_reason}; escalated to {settings.CHAT_MODEL_PREMIUM} ({escalation_reason})"
+
+            response["provider"] = "gemini" if answered_by == ModelChoice.GEMINI else "openai"
+            response["query_type"] = query_type.value
+            response["routing_reason"] = routing_reason
             
             return response
             
         except Exception as e:
             logger.error(f"Hybrid AI service error: {e}")
             
-            # Fallback to available model
+            # Fallback to available model, but only if the request can still afford it
+            if deadline is not None and not deadline.allows_optional():
+                deadline.skip("llm:openai_fallback")
+                raise e
+
             if self.gpt_enabled and chosen_model != ModelChoice.GPT:
                 logger.info("Falling back to GPT")
-                response = await self.openai_service.chat_completion(
-                    messages=messages,
-                    model=model or settings.CHAT_MODEL_FALLBACK,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    tools=tools,
-                    **kwargs
+                # A model the caller pinned for Gemini means nothing to OpenAI
+                fallback_model = model if model and not model.startswith("gemini") else settings.CHAT_MODEL_FALLBACK
+                response = await self._call_provider(
+                    ModelChoice.GPT, query_type, messages, fallback_model,
+                    temperature, max_tokens, tools, deadline, stage="llm:openai_fallback", **kwargs
                 )
                 response["provider"] = "openai_fallback"
                 response["routing_reason"] = "Fallback to GPT after error"
@@ -232,6 +284,190 @@ class HybridAIService:
             
             raise e
 
+    def _hedge_target(
+        self, primary: ModelChoice, query_type: QueryType, primary_model: Optional[str] = None
+    ) -> Tuple[Optional[ModelChoice], Optional[str]]:
+        """
+        Backup for a slow primary: the other provider if healthy, else the cheaper GPT model.
+
+        The backup stays on the primary's tier, so a cheap-tier call is hedged onto
+        the other provider's cheap model rather than its premium default. Returns
+        (None, None) when the only backup would be the model already being called.
+        """
+        cheap = primary_model in (settings.CHAT_MODEL_FALLBACK, settings.GEMINI_MODEL_FLASH)
+        other = ModelChoice.GPT if primary == ModelChoice.GEMINI else ModelChoice.GEMINI
+        other_enabled = self.gpt_enabled if other == ModelChoice.GPT else self.gemini_enabled
+        if other_enabled and not self._circuit_open(other) and provider_stats.is_healthy(other.value, query_type.value):
+            if other == ModelChoice.GPT:
+                return other, settings.CHAT_MODEL_FALLBACK if cheap else settings.CHAT_MODEL
+            return other, settings.GEMINI_MODEL_FLASH if cheap else settings.GEMINI_MODEL
+        if self.gpt_enabled and primary == ModelChoice.GPT and (primary_model or settings.CHAT_MODEL) != settings.CHAT_MODEL_FALLBACK:
+            return ModelChoice.GPT, settings.CHAT_MODEL_FALLBACK
+        return None, None
+
+    def _hedge_delay(self, primary: ModelChoice, query_type: QueryType) -> float:
+        """How long to wait on the primary before hedging, from its recent latency percentile."""
+        stats = provider_stats.get(primary.value, query_type.value)
+        delay = stats.percentile(settings.HEDGE_DELAY_PERCENTILE) if stats.samples >= settings.ROUTING_MIN_SAMPLES else None
+        return max(settings.HEDGE_MIN_DELAY_SECONDS, delay if delay is not None else settings.HEDGE_DEFAULT_DELAY_SECONDS)
+
+    async def _call_with_hedge(
+        self,
+        chosen_model: ModelChoice,
+        query_type: QueryType,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        deadline: Optional[Deadline],
+        **kwargs
+    ) -> Tuple[Dict[str, Any], ModelChoice]:
+        """
+        Call the chosen provider and, if it is slower than its usual tail latency,
+        race a backup request against it. The first successful answer wins and
+        the other request is cancelled.
+
+        Returns:
+            The winning response and the provider that produced it
+        """
+        primary = asyncio.ensure_future(self._call_provider(
+            chosen_model, query_type, messages, model, temperature, max_tokens, tools, deadline, **kwargs
+        ))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(chosen_model, query_type))
+            if done:
+                hedge_stats.record_request(hedged=False)
+                return primary.result(), chosen_model
+
+            hedge_choice, hedge_model = self._hedge_target(chosen_model, query_type, model)
+            if hedge_choice is None or not hedge_stats.allow() or (deadline is not None and not deadline.allows_optional()):
+                hedge_stats.record_request(hedged=False, denied=hedge_choice is not None)
+                return await primary, chosen_model
+
+            logger.info(f"{chosen_model.value} slow for {query_type.value}, hedging to {hedge_choice.value}")
+            hedge_stats.record_request(hedged=True)
+            hedge = asyncio.ensure_future(self._call_provider(
+                hedge_choice, query_type, messages, hedge_model, temperature, max_tokens, tools, deadline,
+                stage="llm:hedge", **kwargs
+            ))
+
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        hedge_stats.record_win(winner)
+                        return task.result(), chosen_model if task is primary else hedge_choice
+
+            # Both failed; surface the primary's error so the normal fallback runs
+            return primary.result(), chosen_model
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _escalate_if_rejected(
+        self,
+        response: Dict[str, Any],
+        query_type: QueryType,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        deadline: Optional[Deadline],
+        **kwargs
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Verify a cheap-tier answer and re-ask CHAT_MODEL_PREMIUM if it is rejected.
+
+        Returns:
+            The response to use and the escalation reason (None if not escalated)
+        """
+        expect_json = (kwargs.get("response_format") or {}).get("type") == "json_object"
+        reason = response_verifier.rejection_reason(response, expect_json=expect_json)
+
+        can_escalate = bool(reason) and self.gpt_enabled and response.get("model") != settings.CHAT_MODEL_PREMIUM
+        if can_escalate and deadline is not None and not deadline.allows_optional():
+            deadline.skip("llm:escalation")
+            can_escalate = False
+
+        cascade_stats.record(query_type.value, reason if can_escalate else None)
+        if not can_escalate:
+            return response, None
+
+        logger.info(f"Cheap-tier answer rejected ({reason}) for {query_type.value}, escalating to {settings.CHAT_MODEL_PREMIUM}")
+        try:
+            premium = await self._call_provider(
+                ModelChoice.GPT, query_type, messages, settings.CHAT_MODEL_PREMIUM,
+                temperature, max_tokens, tools, deadline, stage="llm:escalation", **kwargs
+            )
+        except Exception as e:
+            logger.warning(f"Escalation to {settings.CHAT_MODEL_PREMIUM} failed, keeping cheap-tier answer: {e}")
+            return response, None
+
+        premium["tokens"] = (premium.get("tokens") or 0) + (response.get("tokens") or 0)
+        premium["cost"] = (premium.get("cost") or 0.0) + (response.get("cost") or 0.0)
+        return premium, reason
+
+    async def _call_provider(
+        self,
+        choice: ModelChoice,
+        query_type: QueryType,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        deadline: Optional[Deadline],
+        stage: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Call one provider and record its latency, tokens, cost and outcome."""
+        if choice == ModelChoice.GEMINI:
+            # Use Gemini with built-in search for real-time queries
+            coro = self.gemini_service.chat_completion(
+                messages=messages,
+                model=model or settings.GEMINI_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                tools=tools,
+                use_search=query_type == QueryType.REALTIME_EVENTS,
+                **kwargs
+            )
+        else:
+            coro = self.openai_service.chat_completion(
+                messages=messages,
+                model=model or settings.CHAT_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                tools=tools,
+                **kwargs
+            )
+
+        started = time.monotonic()
+        try:
+            response = await self._bounded(stage or f"llm:{choice.value}", coro, deadline)
+        except (asyncio.CancelledError, AdmissionRejected):
+            # Cancelled by the caller or shed by our own admission control;
+            # neither says anything about provider health
+            raise
+        except Exception:
+            provider_stats.record(choice.value, query_type.value, time.monotonic() - started, success=False)
+            raise
+
+        provider_stats.record(
+            choice.value,
+            query_type.value,
+            time.monotonic() - started,
+            success=True,
+            tokens=response.get("tokens", 0) or 0,
+            cost=response.get("cost", 0.0) or 0.0
+        )
+        return response
+
 
 # Global instance
 hybrid_ai_service = HybridAIService()
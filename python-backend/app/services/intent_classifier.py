@@ -0,0 +1,230 @@
+"""
+Local intent classifier for hybrid model routing.
+
+Messages are turned into hashed n-gram features (word unigrams and bigrams,
+character trigrams and a few shape features) and scored by a small linear
+softmax model trained offline with ``train_intent_classifier.py``. The model
+is a NumPy ``.npz`` file (INTENT_MODEL_PATH); predicting is one gather-and-sum
+over the weight rows, which takes microseconds.
+
+``query_classifier.classify()`` returns a QueryType value with a confidence.
+Below INTENT_MIN_CONFIDENCE, or when NumPy or the model file is missing, it
+falls back to the keyword rules, so routing works without a trained model.
+The bundled model is trained on app/data/intent_seed.jsonl.
+"""
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.message_matcher import match_message
+
+try:
+    import numpy as np
+except ImportError:  # Optional: routing falls back to keywords without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# QueryType values, kept here so offline tools need not import the providers
+QUERY_TYPES = (
+    "realtime_events",
+    "general_chat",
+    "profile_matching",
+    "creative_writing",
+    "complex_reasoning",
+    "simple_question",
+)
+
+DEFAULT_FEATURE_DIM = 2 ** 16
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+_BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+def classify_by_keywords(message: str) -> str:
+    """Keyword routing rules; first matching rule wins."""
+    match = match_message(message)
+
+    # Real-time/Events queries (Gemini excels with built-in search)
+    if match.has("query_realtime"):
+        return "realtime_events"
+
+    # Profile matching and connections (GPT excels at reasoning)
+    if match.has("query_profile"):
+        return "profile_matching"
+
+    # Creative writing (GPT excels at creativity)
+    if match.has("query_creative"):
+        return "creative_writing"
+
+    # Complex reasoning (GPT excels at logic)
+    if match.has("query_complex"):
+        return "complex_reasoning"
+
+    # Simple questions (Gemini is faster and cheaper)
+    message_lower = (message or "").lower()
+    if len(message_lower.split()) <= 10 and ("?" in message_lower or message_lower.startswith(("what", "how", "when", "where", "who"))):
+        return "simple_question"
+
+    return "general_chat"
+
+
+def extract_features(text: str, dim: int = DEFAULT_FEATURE_DIM) -> List[int]:
+    """Hashed feature indices for a message (crc32, so stable across processes)."""
+    text = (text or "").lower()
+    tokens = _TOKEN_PATTERN.findall(text)
+
+    names = [f"w:{token}" for token in tokens]
+    names.extend(f"b:{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    for token in tokens:
+        padded = f"<{token}>"
+        names.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+    # Shape features the keyword rules also rely on
+    names.append(f"len:{min(len(tokens), 20) // 5}")
+    if "?" in text:
+        names.append("shape:question")
+    if tokens:
+        names.append(f"first:{tokens[0]}")
+
+    return [zlib.crc32(name.encode()) % dim for name in names]
+
+
+class LinearIntentModel:
+    """Multinomial logistic regression over hashed features."""
+
+    def __init__(self, weights, bias, labels: Sequence[str]):
+        self.weights = weights  # (dim, classes)
+        self.bias = bias  # (classes,)
+        self.labels = list(labels)
+        self.dim = weights.shape[0]
+
+    def predict_proba(self, text: str):
+        indices = extract_features(text, self.dim)
+        scores = self.weights[indices].sum(axis=0) + self.bias
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probabilities = self.predict_proba(text)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, str]],
+        labels: Sequence[str] = QUERY_TYPES,
+        dim: int = DEFAULT_FEATURE_DIM,
+        epochs: int = 10,
+        learning_rate: float = 0.1,
+        l2: float = 1e-6,
+        seed: int = 0,
+    ) -> "LinearIntentModel":
+        """Fit with plain SGD; ``examples`` are (message, query type) pairs."""
+        label_index = {label: i for i, label in enumerate(labels)}
+        data = [(np.array(extract_features(text, dim)), label_index[label]) for text, label in examples]
+        if not data:
+            raise ValueError("No training examples")
+
+        weights = np.zeros((dim, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            for i in rng.permutation(len(data)):
+                indices, target = data[i]
+                scores = weights[indices].sum(axis=0) + bias
+                probabilities = np.exp(scores - scores.max())
+                probabilities /= probabilities.sum()
+                gradient = probabilities
+                gradient[target] -= 1.0
+                if l2:
+                    weights[indices] *= (1 - rate * l2)
+                np.add.at(weights, indices, -rate * gradient)
+                bias -= rate * gradient
+
+        return cls(weights, bias, labels)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str) -> "LinearIntentModel":
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], [str(label) for label in data["labels"]])
+
+
+class QueryClassifier:
+    """Local model first, keyword rules when the model is missing or unsure."""
+
+    def __init__(self):
+        self._model: Optional[LinearIntentModel] = None
+        self._loaded = False
+        self.counts: Dict[str, int] = {"model": 0, "keywords": 0, "low_confidence": 0}
+
+    @staticmethod
+    def model_path() -> Path:
+        path = Path(settings.INTENT_MODEL_PATH)
+        return path if path.is_absolute() else _BACKEND_ROOT / path
+
+    @property
+    def model(self) -> Optional[LinearIntentModel]:
+        if not self._loaded:
+            self._loaded = True
+            self._model = self._load()
+        return self._model
+
+    def _load(self) -> Optional[LinearIntentModel]:
+        if not settings.INTENT_CLASSIFIER_ENABLED:
+            return None
+        if np is None:
+            logger.warning("numpy not installed, routing on keywords")
+            return None
+        path = self.model_path()
+        if not path.exists():
+            logger.info(f"No intent model at {path}, routing on keywords")
+            return None
+        try:
+            model = LinearIntentModel.load(str(path))
+        except Exception as e:
+            logger.error(f"Could not load intent model {path}: {e}")
+            return None
+        logger.info(f"Loaded intent model {path} ({model.dim} features, {len(model.labels)} labels)")
+        return model
+
+    def classify(self, message: str) -> Tuple[str, Optional[float], str]:
+        """
+        Classify a message.
+
+        Returns:
+            (query type value, model confidence or None, source) where source
+            is "model" or "keywords"
+        """
+        confidence = None
+        model = self.model
+        if model is not None:
+            label, confidence = model.predict(message)
+            if confidence >= settings.INTENT_MIN_CONFIDENCE and label in QUERY_TYPES:
+                self.counts["model"] += 1
+                return label, confidence, "model"
+            self.counts["low_confidence"] += 1
+
+        self.counts["keywords"] += 1
+        return classify_by_keywords(message), confidence, "keywords"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.INTENT_CLASSIFIER_ENABLED,
+            "model_loaded": self.model is not None,
+            "min_confidence": settings.INTENT_MIN_CONFIDENCE,
+            **self.counts,
+        }
+
+
+# Global instance
+query_classifier = QueryClassifier()
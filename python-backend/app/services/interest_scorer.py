@@ -0,0 +1,189 @@
+"""
+Interest-based ranking of events and joins.
+
+The keyword -> interest map is built once from INTEREST_KEYWORDS. Each item
+(event or join) is tokenized once into stemmed 1-3 word terms and put in a
+small inverted index, so scoring a query only touches the postings of the
+terms it contains instead of looping items x interests x keywords.
+
+An item's score sums, over the query terms it contains, the term weight
+(1.0 for a stated interest or a term the text used, KEYWORD_WEIGHT for the
+related keywords it expands to) times the field weight (title over tags over
+description). Dated items that match also get up to RECENCY_WEIGHT for
+starting soon. Items without any match are left out.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+# Words that count as a match for each user interest
+INTEREST_KEYWORDS: Dict[str, List[str]] = {
+    'hiking': ['hiking', 'trail', 'mountain', 'outdoor', 'nature', 'park', 'walk'],
+    'climbing': ['climbing', 'rock', 'boulder', 'mountain', 'outdoor'],
+    'boating': ['boating', 'sailing', 'water', 'lake', 'river', 'marina', 'kayak'],
+    'skiing': ['skiing', 'snow', 'winter', 'mountain', 'resort'],
+    'art': ['art', 'gallery', 'museum', 'creative', 'artist', 'exhibition', 'photography', 'photo', 'camera'],
+    'music': ['music', 'concert', 'band', 'jazz', 'festival', 'symphony', 'live', 'show', 'performance'],
+    'entertainment': ['entertainment', 'comedy', 'show', 'performance', 'theater', 'live'],
+    'food': ['food', 'restaurant', 'culinary', 'cooking', 'farmers market', 'dining', 'beer', 'festival'],
+    'fitness': ['fitness', 'gym', 'yoga', 'workout', 'sports', 'active', 'biking', 'cycling'],
+    'culture': ['culture', 'museum', 'history', 'temple', 'heritage'],
+    'social': ['social', 'community', 'meetup', 'gathering', 'festival'],
+    'sports': ['sports', 'basketball', 'jazz', 'game', 'arena', 'team']
+}
+
+FIELD_WEIGHTS: Dict[str, float] = {'title': 3.0, 'tags': 2.0, 'description': 1.0, 'event_type': 1.0}
+KEYWORD_WEIGHT = 0.5
+RECENCY_WEIGHT = 1.0
+RECENCY_DAYS = 30
+MAX_TERM_WORDS = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "ers", "er", "es", "ed", "s")
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so "hike", "hikes" and "hiking" share a term."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def phrase(text: str) -> str:
+    """A keyword or interest as one stemmed term ("Rock Climbing" -> "rock climb")."""
+    return " ".join(stem(word) for word in _WORD.findall(text.lower()))
+
+
+def terms(value: Any, max_words: int = MAX_TERM_WORDS) -> Set[str]:
+    """Every stemmed 1..max_words-word term in a field value (string or list of strings)."""
+    if not value:
+        return set()
+    text = " ".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+    words = [stem(word) for word in _WORD.findall(text.lower())]
+    found = set()
+    for size in range(1, max_words + 1):
+        for start in range(len(words) - size + 1):
+            found.add(" ".join(words[start:start + size]))
+    return found
+
+
+def interest_terms(user_interests: List[str]) -> List[str]:
+    """The interests plus their keywords, for the event catalog's full-text match."""
+    found = []
+    for interest in user_interests:
+        interest_lower = interest.strip().lower()
+        for term in [interest_lower] + INTEREST_KEYWORDS.get(interest_lower, []):
+            if term and term not in found:
+                found.append(term)
+    return found
+
+
+class TermIndex:
+    """Inverted index of items' weighted fields: term -> [(item position, field weight)]."""
+
+    def __init__(self, items: Sequence[Dict[str, Any]], fields: Dict[str, float] = FIELD_WEIGHTS):
+        self.items = list(items)
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for position, item in enumerate(self.items):
+            for field, weight in fields.items():
+                for term in terms(item.get(field)):
+                    self._postings[term].append((position, weight))
+
+    def postings(self, term: str) -> List[Tuple[int, float]]:
+        return self._postings.get(term, [])
+
+
+class InterestScorer:
+    """Ranks items against stated interests or free text."""
+
+    def __init__(self, keywords: Dict[str, List[str]] = INTEREST_KEYWORDS):
+        self._interest_terms: Dict[str, Set[str]] = {}  # interest -> its own term and its keywords'
+        self._term_interests: Dict[str, Set[str]] = defaultdict(set)  # term -> interests it belongs to
+        for interest, words in keywords.items():
+            interest_terms = {phrase(interest)} | {phrase(word) for word in words}
+            self._interest_terms[interest] = interest_terms
+            for term in interest_terms:
+                self._term_interests[term].add(interest)
+
+    def _add(self, weights: Dict[str, float], term: str) -> None:
+        """Weight a matched term 1.0 and the keywords of the interests it belongs to KEYWORD_WEIGHT."""
+        weights[term] = 1.0
+        for interest in self._term_interests.get(term, ()):
+            for related in self._interest_terms[interest]:
+                weights.setdefault(related, KEYWORD_WEIGHT)
+
+    def query(self, interests: Iterable[str]) -> Dict[str, float]:
+        """Weighted terms for stated interests (unknown interests match as phrases)."""
+        weights: Dict[str, float] = {}
+        for interest in interests:
+            term = phrase(interest or '')
+            if term:
+                self._add(weights, term)
+        return weights
+
+    def query_text(self, text: str) -> Dict[str, float]:
+        """Weighted terms for the known interest vocabulary mentioned in free text."""
+        weights: Dict[str, float] = {}
+        for term in terms(text):
+            if term in self._term_interests:
+                self._add(weights, term)
+        return weights
+
+    @staticmethod
+    def _recency(item: Dict[str, Any], today: datetime) -> float:
+        try:
+            days = (datetime.strptime(str(item.get('date', ''))[:10], '%Y-%m-%d') - today).days
+        except ValueError:
+            return 0.0
+        if days < 0:
+            return 0.0
+        return RECENCY_WEIGHT * max(0.0, 1 - days / RECENCY_DAYS)
+
+    def rank(
+        self,
+        items: Union[TermIndex, Sequence[Dict[str, Any]]],
+        weights: Dict[str, float],
+        limit: Optional[int] = None,
+        min_ratio: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Items containing any query term, best score first (ties keep input order).
+
+        Args:
+            items: Items, or a TermIndex built over them once
+            weights: Query from ``query`` or ``query_text``
+            limit: Maximum number of items
+            min_ratio: Drop items scoring below this fraction of the best one
+        """
+        index = items if isinstance(items, TermIndex) else TermIndex(items)
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in weights.items():
+            for position, field_weight in index.postings(term):
+                scores[position] += weight * field_weight
+        if not scores:
+            return []
+
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for position in scores:
+            scores[position] += self._recency(index.items[position], today)
+
+        cutoff = max(scores.values()) * min_ratio
+        ranked = sorted((p for p, score in scores.items() if score >= cutoff), key=lambda p: (-scores[p], p))
+        return [index.items[position] for position in ranked[:limit]]
+
+    def rank_by_interests(self, items, interests: Iterable[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Events (or any items) matching a user's interests, best first."""
+        return self.rank(items, self.query(interests), limit)
+
+    def rank_by_text(self, items, text: str, limit: Optional[int] = None, min_ratio: float = 0.5) -> List[Dict[str, Any]]:
+        """Joins (or any items) for the activities a message mentions; weak matches are dropped."""
+        return self.rank(items, self.query_text(text), limit, min_ratio)
+
+
+# Global instance
+interest_scorer = InterestScorer()
@@ -7,14 +7,20 @@ from pydantic import BaseModel
 from enum import Enum
 import json
 import logging
+import re
 from datetime import datetime, timezone
 import pytz
 from sqlalchemy.orm import Session
 
 from app.services.openai_service import openai_service
+from app.services.message_matcher import match_message
+from app.services.prompt_templates import LIFESTRING_PROMPT, PUBLIC_PROMPT, current_time_section
 from app.models.user import User, DetailedProfile
 from app.models.event import Event
 
+# Candidate words for activities missing from the shared vocabulary
+_WORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+
 
 class IntentType(str, Enum):
     """AI intent types for Lifestring features."""
@@ -288,31 +294,11 @@ class LifestringAIService:
 
     def _extract_activity_keywords(self, message: str) -> List[str]:
         """Extract potential activity keywords from user message."""
-        # Common activity keywords to search for
-        activity_keywords = [
-            'boating', 'sailing', 'fishing', 'hiking', 'camping', 'climbing', 'skiing', 'snowboarding',
-            'surfing', 'swimming', 'diving', 'kayaking', 'canoeing', 'rafting', 'cycling', 'biking',
-            'running', 'jogging', 'yoga', 'pilates', 'gym', 'fitness', 'workout', 'tennis', 'golf',
-            'basketball', 'football', 'soccer', 'volleyball', 'baseball', 'hockey', 'cricket',
-            'photography', 'painting', 'drawing', 'music', 'singing', 'dancing', 'cooking', 'baking',
-            'gardening', 'reading', 'writing', 'gaming', 'chess', 'poker', 'board games',
-            'travel', 'trip', 'vacation', 'adventure', 'explore', 'sightseeing', 'backpacking',
-            'startup', 'business', 'entrepreneur', 'coding', 'programming', 'tech', 'design',
-            'study', 'learn', 'language', 'course', 'workshop', 'meetup', 'event', 'party',
-            'coffee', 'drinks', 'dinner', 'lunch', 'brunch', 'restaurant', 'bar', 'club'
-        ]
-
-        message_lower = message.lower()
-        found_keywords = []
-
-        for keyword in activity_keywords:
-            if keyword in message_lower:
-                found_keywords.append(keyword)
+        # Known activities, in vocabulary order, from the shared message scan
+        found_keywords = match_message(message).keywords('activity')
 
         # Also extract potential custom keywords (nouns that might be activities)
-        import re
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', message_lower)
-        for word in words:
+        for word in _WORD_PATTERN.findall(message.lower()):
             if word not in found_keywords and len(word) > 3:
                 # Add words that might be activities but aren't in our predefined list
                 if any(activity_word in word for activity_word in ['ing', 'sport', 'game', 'club']):
@@ -322,37 +308,15 @@ class LifestringAIService:
 
     def _analyze_user_intent(self, message: str) -> Dict[str, Any]:
         """Analyze user message to understand their intent and context."""
-        message_lower = message.lower()
-
-        # Intent patterns
-        intent_patterns = {
-            'seeking_activity': ['what should i do', 'i\'m bored', 'looking for something', 'need ideas', 'suggestions'],
-            'planning_activity': ['planning to', 'want to', 'thinking about', 'considering', 'going to'],
-            'seeking_companions': ['anyone want to', 'looking for people', 'find someone', 'join me', 'together'],
-            'new_to_area': ['new to', 'just moved', 'don\'t know anyone', 'new in town', 'recently relocated'],
-            'free_time': ['weekend', 'free time', 'nothing to do', 'spare time', 'day off', 'evening'],
-            'skill_learning': ['learn', 'beginner', 'new to', 'never tried', 'how to', 'teach me'],
-            'social_anxiety': ['shy', 'nervous', 'anxious', 'introverted', 'don\'t know how', 'scared']
-        }
+        match = match_message(message)
 
-        # Time indicators
-        time_indicators = {
-            'immediate': ['now', 'today', 'tonight', 'this evening'],
-            'soon': ['tomorrow', 'this weekend', 'next week', 'soon'],
-            'planning': ['next month', 'planning', 'future', 'someday', 'eventually']
-        }
+        # Intent patterns, e.g. intent_seeking_activity -> seeking_activity
+        detected_intents = [category[len('intent_'):] for category in match.categories('intent_')]
 
-        detected_intents = []
+        # Time context; immediate wins over soon, soon over planning
         time_context = 'general'
-
-        # Check for intent patterns
-        for intent, patterns in intent_patterns.items():
-            if any(pattern in message_lower for pattern in patterns):
-                detected_intents.append(intent)
-
-        # Check for time context
-        for time_type, indicators in time_indicators.items():
-            if any(indicator in message_lower for indicator in indicators):
+        for time_type in ('immediate', 'soon', 'planning'):
+            if match.has(f'time_{time_type}'):
                 time_context = time_type
                 break
 
@@ -365,104 +329,15 @@ class LifestringAIService:
 
     async def _build_public_system_prompt(self, context: Dict[str, Any] = None) -> str:
         """Build system prompt for natural chat experience."""
-
-        # Get current time information
-        from datetime import datetime
-        import pytz
         from app.services.realtime_service import realtime_service
 
         # Get current time (default timezone for public endpoint)
         time_info = await realtime_service.get_current_time()
 
-        # Also get UTC and other major timezones for reference
-        utc_now = datetime.now(pytz.UTC)
-        pst_now = utc_now.astimezone(pytz.timezone('US/Pacific'))
-        est_now = utc_now.astimezone(pytz.timezone('US/Eastern'))
-
-        current_time_info = f"""
-CURRENT TIME INFORMATION:
-- Current Time: {time_info['current_time']} on {time_info['current_date']}
-- UTC: {utc_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Pacific Time: {pst_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Eastern Time: {est_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Day of week: {utc_now.strftime('%A')}
-"""
-
-        prompt_parts = [
-            "You are Strings, the AI companion for Lifestring - a platform that helps people connect through shared interests and activities.",
-            "",
-            current_time_info,
-            "",
-            "🎯 YOUR MISSION: Help people find their tribe and create meaningful connections through shared experiences.",
-            "",
-            "LIFESTRING FEATURES:",
-            "• STRINGS: Social posts where users share thoughts, interests, and activities",
-            "• CONNECTIONS: Users can connect with others who share similar interests",
-            "• JOINS: Events, trips, and activities that users can participate in together",
-            "",
-            "YOUR PERSONALITY:",
-            "• Genuinely excited about helping people connect and try new things",
-            "• Conversational and relatable - like talking to a knowledgeable friend",
-            "• Proactive in suggesting activities and connections",
-            "• Encouraging but not pushy - respect when people just want to chat",
-            "• Use emojis sparingly but effectively to add warmth",
-            "",
-            "🚀 CORE INTELLIGENCE - You excel at:",
-            "",
-            "1. **ACTIVITY RECOGNITION** - Instantly recognize when someone mentions:",
-            "   • Hobbies (photography, cooking, gaming, reading, art, music)",
-            "   • Sports & fitness (hiking, cycling, yoga, rock climbing, running)",
-            "   • Travel & adventures (weekend trips, international travel, road trips)",
-            "   • Learning & growth (languages, skills, courses, workshops)",
-            "   • Social activities (parties, meetups, networking, dating)",
-            "   • Professional goals (startups, collaborations, career development)",
-            "",
-            "2. **CONTEXTUAL SUGGESTIONS** - When users mention activities:",
-            "   • If they seem lonely/bored → Suggest finding activity partners via Joins",
-            "   • If they have free time → Recommend existing Joins they could join",
-            "   • If they're planning something → Suggest creating a Join to find companions",
-            "   • If they're new to an area → Help them find local community through Joins",
-            "",
-            "3. **SMART RESPONSES** - Always consider:",
-            "   • Time context (weekend plans, evening activities, seasonal events)",
-            "   • Location relevance (local vs travel activities)",
-            "   • Skill level (beginner-friendly vs advanced)",
-            "   • Social energy (solo activities vs group experiences)",
-            "",
-            "CRITICAL RULES:",
-            "• NEVER mention external platforms (Facebook, Meetup, Discord, etc.)",
-            "• ALWAYS keep suggestions within Lifestring ecosystem",
-            "• Be specific and actionable in your suggestions",
-            "• Match your energy to the user's mood and context",
-            "",
-            "ANTI-HALLUCINATION RULES:",
-            "• NEVER make up information you don't know",
-            "• When asked about time, ONLY use the current time information provided above",
-            "• NEVER answer with random times when confused",
-            "• If you don't know specific facts, events, or schedules, say so clearly",
-            "• If asked about personal preferences (favorite movies, etc.), explain you're an AI without personal preferences",
-            "• Only provide information you're confident about or that's provided in the context",
-            "",
-            "RESPONSE STYLE:",
-            "• Start with acknowledgment of what they shared",
-            "• Provide relevant, specific suggestions",
-            "• End with encouragement to take action on Lifestring",
-            "• Keep responses conversational, not robotic",
-        ]
-
-        # Add context if provided
-        if context:
-            prompt_parts.extend([
-                "",
-                f"Current context: {json.dumps(context)}"
-            ])
-
-        prompt_parts.extend([
-            "",
-            "Be helpful, friendly, and conversational. Answer questions naturally without offering structured actions."
-        ])
-
-        return "\n".join(prompt_parts)
+        return PUBLIC_PROMPT.render(
+            time_section=current_time_section(time_info),
+            context=f"\n\nCurrent context: {json.dumps(context)}" if context else "",
+        )
 
     def _generate_natural_fallback_response(self, message: str) -> str:
         """Generate a natural ChatGPT-like response when OpenAI API is unavailable."""
@@ -512,10 +387,6 @@ CURRENT TIME INFORMATION:
 
     async def _build_lifestring_system_prompt(self, user: User, context: Dict[str, Any] = None, db_session = None, relevant_joins: List[Dict] = None) -> str:
         """Build enhanced system prompt for Lifestring AI."""
-
-        # Get current time information
-        from datetime import datetime
-        import pytz
         from app.services.realtime_service import realtime_service
 
         # Get user's location for timezone detection
@@ -526,82 +397,10 @@ CURRENT TIME INFORMATION:
         # Get current time in user's timezone
         time_info = await realtime_service.get_current_time(user_location)
 
-        # Also get UTC and other major timezones for reference
-        utc_now = datetime.now(pytz.UTC)
-        pst_now = utc_now.astimezone(pytz.timezone('US/Pacific'))
-        est_now = utc_now.astimezone(pytz.timezone('US/Eastern'))
-
-        current_time_info = f"""
-CURRENT TIME INFORMATION:
-- Current Time: {time_info['current_time']} on {time_info['current_date']} ({time_info['timezone']})
-- UTC: {utc_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Pacific Time: {pst_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Eastern Time: {est_now.strftime('%Y-%m-%d %H:%M:%S %Z')}
-- Day of week: {utc_now.strftime('%A')}
-"""
-
-        # Enhanced prompt with intelligent context awareness
-        prompt_parts = [
-            "You are Strings, the AI companion for Lifestring - a platform that helps people connect through shared interests and activities.",
-            "",
-            current_time_info,
-            "",
-            "🎯 YOUR MISSION: Be the ultimate social connector - help people find their tribe and create amazing experiences together.",
-            "",
-            "LIFESTRING ECOSYSTEM:",
-            "• STRINGS: Social posts for sharing thoughts, interests, and activities",
-            "• CONNECTED STRINGS: Special Strings that show people looking for companions for activities, trips, and events",
-            "• CONNECTIONS: Smart matching with compatible users based on shared interests",
-            "",
-            "🧠 ADVANCED INTELLIGENCE:",
-            "",
-            "**CONTEXT AWARENESS:**",
-            "• Time sensitivity (weekend plans, seasonal activities, evening events)",
-            "• Location relevance (local meetups vs travel adventures)",
-            "• Social energy (introvert-friendly vs high-energy group activities)",
-            "• Skill levels (beginner workshops vs advanced challenges)",
-            "",
-            "**ACTIVITY PATTERN RECOGNITION:**",
-            "• 'I'm bored' → Show existing Connected Strings for immediate activities",
-            "• 'I want to try X' → Recommend Connected Strings or suggest creating one",
-            "• 'I'm new here' → Focus on local Connected Strings for community building",
-            "• 'I love X but...' → Help find like-minded people through Connected Strings",
-            "• 'This weekend I...' → Show time-specific Connected Strings",
-            "",
-            "**SMART SUGGESTIONS:**",
-            "• Match suggestions to user's expressed interests and personality",
-            "• Consider practical factors (location, timing, cost, difficulty)",
-            "• Prioritize activities that build lasting connections",
-            "• Balance solo growth with social experiences",
-            "",
-            "CRITICAL RULES:",
-            "• NEVER mention external platforms (Facebook, Meetup, Discord, etc.)",
-            "• ALWAYS suggest Lifestring-based solutions",
-            "• Be specific and actionable, not generic",
-            "• Match energy level to user's mood and context",
-            "",
-            "ANTI-HALLUCINATION RULES:",
-            "• NEVER make up information you don't know",
-            "• When asked about time, ONLY use the current time information provided above",
-            "• NEVER answer with random times when confused",
-            "• If you don't know specific facts, events, or schedules, say so clearly",
-            "• If asked about personal preferences (favorite movies, etc.), explain you're an AI without personal preferences",
-            "• Only provide information you're confident about or that's provided in the context",
-            "",
-            "RESPONSE FORMAT:",
-            "Always respond with JSON containing:",
-            "- message: Your conversational response (warm and encouraging)",
-            "- intent: One of [create_string, find_connections, suggest_joins, create_join, general_chat, profile_help, time_query]",
-            "- confidence: Float 0-1 indicating confidence in intent",
-            "- actions: Array of actions to perform",
-            "- suggested_strings: Array of string suggestions",
-            "- suggested_connections: Array of user IDs to suggest",
-            "- suggested_joins: Array of join/activity suggestions",
-        ]
-        
         # Add user context
+        user_parts = []
         if user:
-            prompt_parts.extend([
+            user_parts.extend([
                 "",
                 f"CURRENT USER: {user.name or 'User'}",
             ])
@@ -619,75 +418,49 @@ CURRENT TIME INFORMATION:
             if detailed_profile:
                 # Use detailed profile data
                 if detailed_profile.bio:
-                    prompt_parts.append(f"Bio: {detailed_profile.bio}")
+                    user_parts.append(f"Bio: {detailed_profile.bio}")
 
                 if detailed_profile.location:
-                    prompt_parts.append(f"Location: {detailed_profile.location}")
+                    user_parts.append(f"Location: {detailed_profile.location}")
 
                 if detailed_profile.interests:
-                    prompt_parts.append(f"Interests: {', '.join(detailed_profile.interests)}")
+                    user_parts.append(f"Interests: {', '.join(detailed_profile.interests)}")
 
                 if detailed_profile.passions:
-                    prompt_parts.append(f"Passions: {', '.join(detailed_profile.passions)}")
+                    user_parts.append(f"Passions: {', '.join(detailed_profile.passions)}")
 
                 if detailed_profile.hobbies:
-                    prompt_parts.append(f"Hobbies: {', '.join(detailed_profile.hobbies)}")
+                    user_parts.append(f"Hobbies: {', '.join(detailed_profile.hobbies)}")
 
                 if detailed_profile.goals:
-                    prompt_parts.append(f"Goals: {detailed_profile.goals}")
+                    user_parts.append(f"Goals: {detailed_profile.goals}")
 
                 if detailed_profile.work:
-                    prompt_parts.append(f"Work: {detailed_profile.work}")
+                    user_parts.append(f"Work: {detailed_profile.work}")
 
                 if detailed_profile.education:
-                    prompt_parts.append(f"Education: {detailed_profile.education}")
+                    user_parts.append(f"Education: {detailed_profile.education}")
             else:
                 # Fallback to basic user data
                 if hasattr(user, 'interests') and user.interests:
-                    prompt_parts.append(f"Interests: {', '.join(user.interests)}")
+                    user_parts.append(f"Interests: {', '.join(user.interests)}")
 
                 if hasattr(user, 'passions') and user.passions:
-                    prompt_parts.append(f"Passions: {', '.join(user.passions)}")
+                    user_parts.append(f"Passions: {', '.join(user.passions)}")
 
                 # Add location if available
                 if hasattr(user, 'contact_info') and user.contact_info:
                     location = user.contact_info.get('location')
                     if location:
-                        prompt_parts.append(f"Location: {location}")
-        
+                        user_parts.append(f"Location: {location}")
+
         # Add context
-        if context:
-            prompt_parts.extend([
-                "",
-                f"ADDITIONAL CONTEXT: {json.dumps(context)}"
-            ])
-        
-        prompt_parts.extend([
-            "",
-            "EXAMPLES:",
-            "",
-            "User: 'I want to find people who like hiking'",
-            "Response: {",
-            '  "message": "I\'d love to help you find hiking enthusiasts! Let me search for people with similar interests.",',
-            '  "intent": "find_connections",',
-            '  "confidence": 0.9,',
-            '  "actions": [{"type": "search_users", "data": {"interests": ["hiking"]}, "description": "Search for users interested in hiking"}]',
-            "}",
-            "",
-            "User: 'I want to plan a trip to Japan'",
-            "Response: {",
-            '  "message": "That sounds amazing! I can help you create a trip and find travel companions.",',
-            '  "intent": "suggest_joins",',
-            '  "confidence": 0.85,',
-            '  "actions": [{"type": "create_join", "data": {"type": "trip", "destination": "Japan"}, "description": "Create Japan trip"}]',
-            "}",
-            "",
-            "Be conversational, helpful, and always include actionable suggestions."
-        ])
+        context_part = f"\n\nADDITIONAL CONTEXT: {json.dumps(context)}" if context else ""
 
         # Add relevant Connected Strings if found
+        join_parts = []
         if relevant_joins:
-            prompt_parts.extend([
+            join_parts.extend([
                 "",
                 "🔗 **IMPORTANT: RELEVANT CONNECTED STRINGS FOUND**",
                 "",
@@ -700,7 +473,7 @@ CURRENT TIME INFORMATION:
                 creator_name = creator_info.get('name', 'Unknown')
                 creator_email = creator_info.get('email', '')
 
-                prompt_parts.extend([
+                join_parts.extend([
                     f"**{join['title']}**",
                     f"- Creator: {creator_name} ({creator_email})",
                     f"- Description: {join['description']}",
@@ -711,23 +484,38 @@ CURRENT TIME INFORMATION:
                     ""
                 ])
 
-            prompt_parts.extend([
+            join_parts.extend([
                 "**IMPORTANT**: Mention these specific Connected Strings in your response and provide the creator's contact information so the user can reach out directly.",
                 ""
             ])
 
-        return "\n".join(prompt_parts)
+        return LIFESTRING_PROMPT.render(
+            time_section=current_time_section(time_info, include_timezone=True),
+            user="\n" + "\n".join(user_parts) if user_parts else "",
+            context=context_part,
+            joins="\n" + "\n".join(join_parts) if join_parts else "",
+        )
     
     async def _get_structured_response(self, messages: List[Dict[str, str]]) -> AIResponse:
-        """Get structured response from OpenAI."""
+        """Get structured response, cheap tier first with escalation on a weak answer."""
         
-        # Request JSON response
-        response = await self.openai.chat_completion(
-            messages=messages,
-            temperature=0.7,
-            max_tokens=800,
-            response_format={"type": "json_object"}
-        )
+        # Request JSON response; the hybrid cascade escalates invalid or low-confidence JSON
+        try:
+            from app.services.hybrid_ai_service import hybrid_ai_service, ModelChoice
+            response = await hybrid_ai_service.chat_completion(
+                messages=messages,
+                temperature=0.7,
+                max_tokens=800,
+                force_model=ModelChoice.GPT,
+                response_format={"type": "json_object"}
+            )
+        except ImportError:
+            response = await self.openai.chat_completion(
+                messages=messages,
+                temperature=0.7,
+                max_tokens=800,
+                response_format={"type": "json_object"}
+            )
         
         try:
             # Parse JSON response
@@ -0,0 +1,235 @@
+"""
+Single-pass keyword matching for chat routing.
+
+Chat routing used to scan every message against dozens of keyword lists
+rebuilt on each call. Every list now lives in ``CHAT_VOCABULARY`` and is
+compiled once, at import, into one trie-shaped regex. A single scan of the
+message returns every category hit (real-time, sports, locations,
+activities, intents, ...) as a ``MessageMatch``. Results are cached per
+message, so the endpoint, the hybrid router and the Lifestring service
+all share one scan.
+
+Matching keeps the old ``keyword in message_lower`` substring semantics,
+including overlapping hits such as "games today" and "today". The city a
+message names is the exception: it comes from the gazetteer's word scan.
+"""
+import logging
+import re
+from functools import cached_property, lru_cache
+from typing import Dict, List, Mapping, Optional, Pattern, Sequence, Set, Tuple
+
+from app.services.gazetteer import gazetteer
+
+logger = logging.getLogger(__name__)
+
+# Sport for each alias; earlier entries win when several match
+SPORT_ALIASES: Dict[str, str] = {
+    'nfl': 'nfl',
+    'football': 'nfl',
+    'nba': 'nba',
+    'basketball': 'nba',
+    'mlb': 'mlb',
+    'baseball': 'mlb',
+    'nhl': 'nhl',
+    'hockey': 'nhl',
+}
+
+CHAT_VOCABULARY: Dict[str, Tuple[str, ...]] = {
+    # Queries that should pull in real-time events
+    'realtime_events': (
+        'nfl games', 'nba games', 'mlb games', 'nhl games',
+        'football games', 'basketball games', 'baseball games', 'hockey games',
+        'games today', 'games tonight', 'games this week',
+        'sports schedule', 'game schedule',
+        'concerts', 'shows', 'events', 'what\'s happening',
+        'events today', 'events tonight', 'events this week',
+        'local events', 'things to do', 'activities',
+        'festivals', 'farmers market', 'art shows',
+        'live music', 'theater', 'comedy shows',
+        'community events', 'meetups', 'workshops',
+        'what can i do', 'weekend',
+        'tomorrow', 'today', 'tonight', 'this evening',
+        'next week', 'this month', 'upcoming', 'this weekend',
+    ),
+    # Time-specific queries that should ONLY show real-time events (no joins)
+    'realtime_only': (
+        'tomorrow', 'today', 'tonight', 'this evening',
+        'this weekend', 'weekend', 'next week', 'this month',
+        'what can i do tomorrow', 'what can i do today',
+        'what can i do this weekend', 'what\'s happening tomorrow',
+        'what\'s happening today', 'what\'s happening this weekend',
+    ),
+    'local_events': (
+        'concerts', 'shows', 'events', 'festivals', 'live music',
+        'theater', 'comedy', 'art shows', 'farmers market',
+        'community events', 'meetups', 'workshops', 'things to do',
+        'activities', 'what\'s happening', 'what can i do', 'weekend',
+    ),
+    'sports_query': (
+        'nba games', 'nfl games', 'mlb games', 'nhl games', 'games today', 'games tonight', 'sports',
+        'basketball games', 'football games', 'baseball games', 'hockey games',
+    ),
+    'sports_generic': ('games', 'sports', 'schedule'),
+    'sport': tuple(SPORT_ALIASES),
+    'salt_lake': ('salt lake', 'slc', 'utah', 'antelope island'),
+
+    # Joins suggestions
+    'group_activity': (
+        'group', 'join', 'activity', 'event', 'meetup', 'together',
+        'group activity', 'things to do', 'activities', 'events near me',
+        'what can i do', 'looking for', 'want to do', 'interested in doing',
+        'learn', 'meet', 'connect', 'find people', 'enthusiasts', 'community',
+        'club', 'groups', 'sailing', 'hiking', 'climbing', 'boating', 'photography',
+        'people who like', 'people who enjoy', 'others who', 'someone who',
+    ),
+
+    # Hybrid AI query types
+    'query_realtime': (
+        'events', 'happening', 'today', 'tomorrow', 'weekend', 'this week',
+        'weather', 'news', 'current', 'latest', 'now', 'recent',
+        'what\'s going on', 'activities', 'concerts', 'shows', 'live music',
+        'playing', 'performing', 'tickets', 'tix', 'venue', 'theater', 'theatre',
+    ),
+    'query_profile': (
+        'find people', 'connections', 'match', 'similar interests',
+        'profile', 'compatibility', 'recommend users', 'meet people',
+    ),
+    'query_creative': (
+        'write', 'create', 'compose', 'draft', 'story', 'poem',
+        'creative', 'imagine', 'describe', 'elaborate',
+    ),
+    'query_complex': (
+        'analyze', 'compare', 'explain why', 'reasoning', 'logic',
+        'complex', 'detailed analysis', 'pros and cons', 'evaluate',
+    ),
+
+    # Lifestring user intents
+    'intent_seeking_activity': ('what should i do', 'i\'m bored', 'looking for something', 'need ideas', 'suggestions'),
+    'intent_planning_activity': ('planning to', 'want to', 'thinking about', 'considering', 'going to'),
+    'intent_seeking_companions': ('anyone want to', 'looking for people', 'find someone', 'join me', 'together'),
+    'intent_new_to_area': ('new to', 'just moved', 'don\'t know anyone', 'new in town', 'recently relocated'),
+    'intent_free_time': ('weekend', 'free time', 'nothing to do', 'spare time', 'day off', 'evening'),
+    'intent_skill_learning': ('learn', 'beginner', 'new to', 'never tried', 'how to', 'teach me'),
+    'intent_social_anxiety': ('shy', 'nervous', 'anxious', 'introverted', 'don\'t know how', 'scared'),
+    'weather': ('weather', 'forecast', 'temperature', 'rain', 'snow', 'sunny'),
+    'time_immediate': ('now', 'today', 'tonight', 'this evening'),
+    'time_soon': ('tomorrow', 'this weekend', 'next week', 'soon'),
+    'time_planning': ('next month', 'planning', 'future', 'someday', 'eventually'),
+    'activity': (
+        'boating', 'sailing', 'fishing', 'hiking', 'camping', 'climbing', 'skiing', 'snowboarding',
+        'surfing', 'swimming', 'diving', 'kayaking', 'canoeing', 'rafting', 'cycling', 'biking',
+        'running', 'jogging', 'yoga', 'pilates', 'gym', 'fitness', 'workout', 'tennis', 'golf',
+        'basketball', 'football', 'soccer', 'volleyball', 'baseball', 'hockey', 'cricket',
+        'photography', 'painting', 'drawing', 'music', 'singing', 'dancing', 'cooking', 'baking',
+        'gardening', 'reading', 'writing', 'gaming', 'chess', 'poker', 'board games',
+        'travel', 'trip', 'vacation', 'adventure', 'explore', 'sightseeing', 'backpacking',
+        'startup', 'business', 'entrepreneur', 'coding', 'programming', 'tech', 'design',
+        'study', 'learn', 'language', 'course', 'workshop', 'meetup', 'event', 'party',
+        'coffee', 'drinks', 'dinner', 'lunch', 'brunch', 'restaurant', 'bar', 'club',
+    ),
+}
+
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """
+    Regex matching any keyword, shaped like a trie so the engine only
+    follows one branch per character; longer keywords are preferred.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class MessageMatch:
+    """Every vocabulary hit for one message."""
+
+    def __init__(self, hits: Mapping[str, List[str]], text: str = ""):
+        self._hits = hits
+        self._text = text
+
+    def has(self, category: str) -> bool:
+        return category in self._hits
+
+    def keywords(self, category: str) -> List[str]:
+        """Matched keywords of a category, in vocabulary order."""
+        return list(self._hits.get(category, ()))
+
+    def first(self, category: str) -> Optional[str]:
+        hits = self._hits.get(category)
+        return hits[0] if hits else None
+
+    def categories(self, prefix: str = "") -> List[str]:
+        return [category for category in self._hits if category.startswith(prefix)]
+
+    @property
+    def sport(self) -> Optional[str]:
+        keyword = self.first('sport')
+        return SPORT_ALIASES[keyword] if keyword else None
+
+    @cached_property
+    def city(self) -> Optional[str]:
+        """The first place the message names, as a gazetteer label ("Denver, CO")."""
+        place = gazetteer.find_in_text(self._text)
+        return place.label if place else None
+
+
+class KeywordMatcher:
+    """Matches all vocabulary categories in one pass over a message."""
+
+    def __init__(self, vocabulary: Mapping[str, Sequence[str]]):
+        self._categories = list(vocabulary)
+        # keyword -> [(category index, position within category)]
+        self._owners: Dict[str, List[Tuple[int, int]]] = {}
+        for category_index, category in enumerate(self._categories):
+            for position, keyword in enumerate(vocabulary[category]):
+                self._owners.setdefault(keyword, []).append((category_index, position))
+
+        keywords = list(self._owners)
+        # Only the longest keyword at each offset is reported by the scan;
+        # shorter keywords starting at the same offset are its prefixes
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self._pattern: Pattern = re.compile(f"(?=({_trie_pattern(keywords)}))")
+
+    def scan(self, text: str) -> MessageMatch:
+        found: Set[str] = set()
+        for match in self._pattern.finditer(text.lower()):
+            longest = match.group(1)
+            if longest not in found:
+                found.add(longest)
+                found.update(self._prefixes[longest])
+
+        ranked: Dict[int, List[Tuple[int, str]]] = {}
+        for keyword in found:
+            for category_index, position in self._owners[keyword]:
+                ranked.setdefault(category_index, []).append((position, keyword))
+
+        hits = {
+            self._categories[category_index]: [keyword for _, keyword in sorted(entries)]
+            for category_index, entries in sorted(ranked.items())
+        }
+        return MessageMatch(hits, text)
+
+
+# Global instance
+message_matcher = KeywordMatcher(CHAT_VOCABULARY)
+
+
+@lru_cache(maxsize=1024)
+def match_message(message: str) -> MessageMatch:
+    """Vocabulary hits for a message, scanned once and shared by every caller."""
+    return message_matcher.scan(message or "")
@@ -0,0 +1,100 @@
+"""
+Cheap-first model cascade support.
+
+Queries are answered by the fast/cheap tier first (CHAT_MODEL_FALLBACK or
+Gemini Flash). ``ResponseVerifier`` checks the answer and, if it is rejected,
+HybridAIService escalates the same request to CHAT_MODEL_PREMIUM.
+Escalation rates are tracked per query type.
+"""
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+REFUSAL_PATTERN = re.compile(
+    r"^\s*(?:i'?m sorry,? but i|i'?m (?:unable|not able) to|i am (?:unable|not able) to|"
+    r"i can(?:no|')t (?:help|assist|answer|do that|provide)|sorry,? i can(?:no|')t)",
+    re.IGNORECASE
+)
+
+
+class ResponseVerifier:
+    """Decides whether a cheap-tier answer is good enough to return."""
+
+    def rejection_reason(self, response: Dict[str, Any], expect_json: bool = False) -> Optional[str]:
+        """
+        Check a provider response.
+
+        Args:
+            response: Provider response dict ('content', optional 'tool_calls')
+            expect_json: Whether the caller asked for a JSON object
+
+        Returns:
+            Why the answer should be escalated, or None if it is acceptable
+        """
+        # Tool calls are judged after the tools run, on the follow-up answer
+        if response.get("tool_calls"):
+            return None
+
+        content = (response.get("content") or "").strip()
+        if not content:
+            return "empty"
+
+        if REFUSAL_PATTERN.search(content):
+            return "refusal"
+
+        if not expect_json:
+            return None
+
+        try:
+            data = json.loads(content)
+        except (json.JSONDecodeError, ValueError):
+            return "invalid_json"
+        if not isinstance(data, dict):
+            return "invalid_json"
+
+        confidence = data.get("confidence")
+        try:
+            if confidence is not None and float(confidence) < settings.CASCADE_MIN_CONFIDENCE:
+                return "low_confidence"
+        except (TypeError, ValueError):
+            return "invalid_json"
+
+        return None
+
+
+class CascadeStats:
+    """Escalation counts per query type and reason."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._escalations: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, query_type: str, reason: Optional[str]) -> None:
+        with self._lock:
+            self._requests[query_type] += 1
+            if reason:
+                self._escalations[query_type][reason] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for query_type, total in sorted(self._requests.items()):
+                reasons = dict(self._escalations.get(query_type, {}))
+                escalated = sum(reasons.values())
+                result[query_type] = {
+                    "requests": total,
+                    "escalated": escalated,
+                    "escalation_rate": round(escalated / total, 4) if total else 0.0,
+                    "reasons": reasons,
+                }
+            return result
+
+
+# Global instances
+response_verifier = ResponseVerifier()
+cascade_stats = CascadeStats()
@@ -7,16 +7,56 @@ import hashlib
 import json
 
 from app.core.config import settings
+from app.core.admission import admission_controller
+from app.core.degradation import degradation_controller, DegradationTier
+from app.services.circuit_breaker import circuit_breakers
+from app.services.credential_pool import CredentialPool, configured_keys, is_rate_limit_error, retry_after_seconds
 
 
 class OpenAIService:
     """Service for interacting with OpenAI API."""
     
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            organization=settings.OPENAI_ORG_ID if settings.OPENAI_ORG_ID else None
-        )
+        keys = configured_keys(settings.OPENAI_API_KEY, settings.OPENAI_API_KEYS) or [settings.OPENAI_API_KEY]
+        self.pool = CredentialPool("openai", keys)
+        for credential in self.pool.credentials:
+            credential.client = AsyncOpenAI(
+                api_key=credential.key,
+                organization=settings.OPENAI_ORG_ID if settings.OPENAI_ORG_ID else None
+            )
+        # Primary-key client for callers that talk to the SDK directly
+        self.client = self.pool.credentials[0].client
+
+    async def _create_completion(self, request_params: Dict[str, Any]) -> Any:
+        """
+        Create a chat completion on the key with the most headroom.
+
+        Rate-limit headers from the response update that key's headroom. A 429
+        rests the key and, when another key is configured, retries there once.
+        """
+        attempts = min(2, len(self.pool))
+        credential = None
+        for attempt in range(attempts):
+            credential = self.pool.acquire(exclude=credential)
+            try:
+                raw = await credential.client.chat.completions.with_raw_response.create(**request_params)
+                response = raw.parse()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    self.pool.release(credential)
+                    raise
+                self.pool.mark_rate_limited(credential, retry_after_seconds(e))
+                if attempt + 1 < attempts:
+                    continue
+                raise
+            except BaseException:
+                # Cancelled mid-call
+                self.pool.release(credential)
+                raise
+
+            tokens = response.usage.total_tokens if response.usage else 0
+            self.pool.release(credential, tokens=tokens, headers=raw.headers)
+            return response
     
     async def create_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
         """
@@ -32,10 +72,18 @@ class OpenAIService:
         if not model:
             model = settings.EMBED_MODEL
         
-        response = await self.client.embeddings.create(
-            model=model,
-            input=text
-        )
+        await admission_controller.acquire("openai")
+        credential = self.pool.acquire()
+        tokens = 0
+        try:
+            response = await credential.client.embeddings.create(
+                model=model,
+                input=text
+            )
+            tokens = response.usage.total_tokens if response.usage else 0
+        finally:
+            self.pool.release(credential, tokens=tokens)
+            admission_controller.release("openai")
         
         return response.data[0].embedding
     
@@ -67,6 +115,11 @@ class OpenAIService:
         if not model:
             model = settings.CHAT_MODEL
 
+        # Under heavy load every caller gets the cheap model without tool rounds
+        if degradation_controller.at_least(DegradationTier.CHEAP_NO_TOOLS):
+            model = settings.CHAT_MODEL_FALLBACK
+            tools = None
+
         # Prepare request parameters
         request_params = {
             "model": model,
@@ -81,8 +134,13 @@ class OpenAIService:
             request_params["tools"] = tools
             request_params["tool_choice"] = "auto"
 
+        # Admission is taken outside the breaker so shed calls never count as provider failures
+        await admission_controller.acquire("openai")
         try:
-            response = await self.client.chat.completions.create(**request_params)
+            # An open breaker raises CircuitOpenError immediately, skipping the failing call
+            response = await circuit_breakers.get(f"openai:{model}").call(
+                lambda: self._create_completion(request_params)
+            )
         except Exception as e:
             # Try fallback model if enabled and not already using fallback
             if use_fallback and model != settings.CHAT_MODEL_FALLBACK:
@@ -92,9 +150,13 @@ class OpenAIService:
 
                 request_params["model"] = settings.CHAT_MODEL_FALLBACK
                 model = settings.CHAT_MODEL_FALLBACK
-                response = await self.client.chat.completions.create(**request_params)
+                response = await circuit_breakers.get(f"openai:{model}").call(
+                    lambda: self._create_completion(request_params)
+                )
             else:
                 raise e
+        finally:
+            admission_controller.release("openai")
 
         content = response.choices[0].message.content
         tokens = response.usage.total_tokens
@@ -157,18 +219,43 @@ class OpenAIService:
         if not model:
             model = settings.CHAT_MODEL
         
-        stream = await self.client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True,
-            **kwargs
-        )
+        await admission_controller.acquire("openai")
+        try:
+            credential = self.pool.acquire()
+        except BaseException:
+            admission_controller.release("openai")
+            raise
+        try:
+            stream = await credential.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **kwargs
+            )
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.pool.mark_rate_limited(credential, retry_after_seconds(e))
+            else:
+                self.pool.release(credential)
+            admission_controller.release("openai")
+            raise
+        except BaseException:
+            # Cancelled (client disconnect) while the stream was being opened
+            self.pool.release(credential)
+            admission_controller.release("openai")
+            raise
         
-        async for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield chunk.choices[0].delta.content
+        try:
+            async for chunk in stream:
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the upstream connection if the consumer stops early
+            await stream.close()
+            self.pool.release(credential)
+            admission_controller.release("openai")
     
     @staticmethod
     def generate_content_hash(content: str) -> str:
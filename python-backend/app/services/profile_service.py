@@ -1,10 +1,12 @@
 """
 Profile service for centralized user profile data management.
 """
+import asyncio
 import os
 import httpx
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.deadline import Deadline
 
 
 class ProfileService:
@@ -14,19 +16,25 @@ class ProfileService:
         self.supabase_url = settings.SUPABASE_URL
         self.supabase_anon_key = settings.SUPABASE_ANON_KEY
     
-    async def get_user_profile(self, user_id: str, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def get_user_profile(self, user_id: str, token: Optional[str] = None, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
         """
         Get comprehensive user profile data from both user_profiles and detailed_profiles.
         
         Args:
             user_id: The user's ID
             token: Optional JWT token for RLS policies
+            deadline: Optional request deadline bounding the fetch
             
         Returns:
             Consolidated profile data or None if not found
         """
+        timeout = deadline.timeout(cap=settings.PROFILE_FETCH_TIMEOUT) if deadline else settings.PROFILE_FETCH_TIMEOUT
+        if timeout <= 0:
+            print("Skipping profile fetch: request deadline exhausted")
+            return None
+
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 headers = {
                     "apikey": self.supabase_anon_key,
                     "Content-Type": "application/json"
@@ -36,11 +44,13 @@ class ProfileService:
                 if token:
                     headers["Authorization"] = f"Bearer {token}"
                 
-                # Get detailed profile data (where frontend saves detailed info)
-                detailed_profile = await self._get_detailed_profile(client, headers, user_id)
-                
-                # Get basic user profile data (created automatically)
-                user_profile = await self._get_user_profile(client, headers, user_id)
+                # Fetch detailed profile (where frontend saves detailed info) and the
+                # basic user profile (created automatically) concurrently so both
+                # fit inside one timeout window
+                detailed_profile, user_profile = await asyncio.gather(
+                    self._get_detailed_profile(client, headers, user_id),
+                    self._get_user_profile(client, headers, user_id)
+                )
                 
                 # Merge the data with detailed_profile taking precedence
                 return self._merge_profile_data(user_profile, detailed_profile)
@@ -0,0 +1,174 @@
+"""
+Rolling per-provider, per-query-type performance stats for model routing.
+
+HybridAIService records every provider call here; the router reads the
+stats back to steer traffic toward whichever provider currently meets the
+configured latency/cost objective.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class ProviderStats:
+    """EWMA latency, error rate, tokens and cost for one provider/query type."""
+
+    def __init__(self, alpha: float, window: int):
+        self.alpha = alpha
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.tokens_ewma: Optional[float] = None
+        self.cost_ewma: Optional[float] = None
+        self.calls = 0
+        self.errors = 0
+        self.last_sample_at: Optional[float] = None
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        return value if current is None else self.alpha * value + (1 - self.alpha) * current
+
+    def record(self, latency: float, success: bool, tokens: int = 0, cost: float = 0.0) -> None:
+        self.calls += 1
+        self.last_sample_at = time.monotonic()
+        self.latency_ewma = self._ewma(self.latency_ewma, latency)
+        self.error_rate = self._ewma(self.error_rate if self.calls > 1 else None, 0.0 if success else 1.0)
+        self._latencies.append(latency)
+
+        if success:
+            self.tokens_ewma = self._ewma(self.tokens_ewma, float(tokens))
+            self.cost_ewma = self._ewma(self.cost_ewma, float(cost))
+        else:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over the recent window."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def is_stale(self, max_age: float) -> bool:
+        return self.last_sample_at is None or time.monotonic() - self.last_sample_at > max_age
+
+    def snapshot(self) -> Dict[str, Any]:
+        def _round(value: Optional[float], digits: int = 4) -> Optional[float]:
+            return round(value, digits) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": _round(self.error_rate),
+            "latency_ewma_seconds": _round(self.latency_ewma),
+            "latency_p95_seconds": _round(self.percentile(95)),
+            "tokens_ewma": _round(self.tokens_ewma, 1),
+            "cost_ewma": _round(self.cost_ewma, 6),
+            "samples": self.samples,
+        }
+
+
+class ProviderStatsTracker:
+    """Thread-safe registry of ProviderStats keyed by (provider, query_type)."""
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, query_type: str) -> ProviderStats:
+        key = (provider, query_type)
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = ProviderStats(
+                    alpha=settings.ROUTING_EWMA_ALPHA,
+                    window=settings.ROUTING_LATENCY_WINDOW
+                )
+            return self._stats[key]
+
+    def record(self, provider: str, query_type: str, latency: float, success: bool, tokens: int = 0, cost: float = 0.0) -> None:
+        stats = self.get(provider, query_type)
+        with self._lock:
+            stats.record(latency, success, tokens, cost)
+
+    def is_healthy(self, provider: str, query_type: str) -> bool:
+        """
+        Whether the provider currently meets the error-rate and p95 targets.
+
+        Providers with too few samples, or whose stats have gone stale because
+        traffic was steered away, count as healthy so they get probed again.
+        """
+        stats = self.get(provider, query_type)
+        if stats.samples < settings.ROUTING_MIN_SAMPLES or stats.is_stale(settings.ROUTING_STATS_MAX_AGE):
+            return True
+        p95 = stats.percentile(95)
+        return (
+            stats.error_rate <= settings.ROUTING_MAX_ERROR_RATE
+            and (p95 is None or p95 <= settings.ROUTING_P95_TARGET_SECONDS)
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._stats.items())
+        result: Dict[str, Any] = {}
+        for (provider, query_type), stats in sorted(items):
+            result.setdefault(provider, {})[query_type] = {
+                **stats.snapshot(),
+                "healthy": self.is_healthy(provider, query_type),
+            }
+        return result
+
+
+class HedgeStats:
+    """Hedge rate, win counts and the budget cap on hedged requests."""
+
+    def __init__(self):
+        self._recent: Deque[bool] = deque(maxlen=settings.HEDGE_BUDGET_WINDOW)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.denied_by_budget = 0
+        self.wins = {"primary": 0, "hedge": 0}
+
+    def allow(self) -> bool:
+        """Whether another hedge fits under HEDGE_MAX_FRACTION of recent requests."""
+        with self._lock:
+            if not self._recent:
+                return True
+            return sum(self._recent) / len(self._recent) < settings.HEDGE_MAX_FRACTION
+
+    def record_request(self, hedged: bool, denied: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self._recent.append(hedged)
+            if hedged:
+                self.hedged += 1
+            if denied:
+                self.denied_by_budget += 1
+
+    def record_win(self, winner: str) -> None:
+        with self._lock:
+            self.wins[winner] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent_rate = sum(self._recent) / len(self._recent) if self._recent else 0.0
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                "recent_hedge_rate": round(recent_rate, 4),
+                "denied_by_budget": self.denied_by_budget,
+                "wins": dict(self.wins),
+            }
+
+
+# Global instances
+provider_stats = ProviderStatsTracker()
+hedge_stats = HedgeStats()
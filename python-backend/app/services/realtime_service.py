@@ -9,15 +9,274 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import json
 import logging
+from app.core.config import settings
+from app.core.degradation import degradation_controller, DegradationTier
+from app.core.deadline import Deadline
+from app.services.event_dedup import event_deduplicator
+from app.services.event_ingestion import event_ingestion
+from app.services.gazetteer import gazetteer
+from app.services.html_scraper import html_scraper, parse_eventbrite_html, parse_facebook_html
+from app.services.interest_scorer import interest_scorer, interest_terms
 from app.services.profile_service import profile_service
+from app.services.sports_scoreboard import ScoreboardUnavailable, sports_scoreboard
+from app.services.tool_cache import CONVERSATION, GLOBAL, ToolPolicy
+from app.services.tool_registry import MUTATING, ToolContext, ToolRegistry, ToolSpec
+from app.services.weather_cache import weather_cache
 
 logger = logging.getLogger(__name__)
 
+# OpenAI function-calling schemas; handlers, timeouts and cache policies are
+# declared with them in RealtimeService._register_tools
+_TOOL_SCHEMA_LIST = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_time",
+            "description": "Get the current time and date, optionally for a specific location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The location to get time for (optional)"
+                    }
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Get current weather information for a location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The city or location to get weather for"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_local_news",
+            "description": "Get recent local news for a location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The city or location to get news for"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of news articles to return (default 3)",
+                        "default": 3
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_sports_events",
+            "description": "Get current sports events and schedules for NFL, NBA, MLB, etc.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "sport_type": {
+                        "type": "string",
+                        "description": "Type of sport (nfl, nba, mlb, nhl) - optional",
+                        "enum": ["nfl", "nba", "mlb", "nhl"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of events to return (default 5)",
+                        "default": 5
+                    }
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_local_events",
+            "description": "Get local events, concerts, festivals, and activities for a location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The city or location to get events for"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of events to return (default 10)",
+                        "default": 10
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "update_profile_location",
+            "description": "Update the user's location in their profile",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The new location for the user"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_hobbies",
+            "description": "Add new hobbies to the user's profile",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "hobbies": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of hobbies to add to the user's profile"
+                    }
+                },
+                "required": ["hobbies"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_interests",
+            "description": "Add new interests to the user's profile",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "interests": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of interests to add to the user's profile"
+                    }
+                },
+                "required": ["interests"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "add_skills",
+            "description": "Add new skills to the user's profile",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "skills": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of skills to add to the user's profile"
+                    }
+                },
+                "required": ["skills"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "update_bio",
+            "description": "Update the user's bio/description in their profile",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "bio": {
+                        "type": "string",
+                        "description": "The new bio text for the user"
+                    }
+                },
+                "required": ["bio"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "suggest_people_to_connect",
+            "description": "Find people with similar interests who the user might want to connect with",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "interests": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of interests to find people with similar interests"
+                    },
+                    "location": {
+                        "type": "string",
+                        "description": "Location to find people nearby (optional)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of people to suggest (default: 5)"
+                    }
+                },
+                "required": ["interests"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "suggest_joins_for_activity",
+            "description": "Find joins/activities based on user's interests and location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "activity": {
+                        "type": "string",
+                        "description": "The activity or interest to find joins for (e.g., 'hiking', 'climbing', 'photography')"
+                    },
+                    "location": {
+                        "type": "string",
+                        "description": "Location to find activities nearby (optional)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of joins to suggest (default: 5)"
+                    }
+                },
+                "required": ["activity"]
+            }
+        }
+    }
+]
+
+TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {schema["function"]["name"]: schema for schema in _TOOL_SCHEMA_LIST}
 
 class RealtimeService:
     """Service for fetching real-time data like weather, news, and current events."""
-    
+
     def __init__(self):
+        self.tools = ToolRegistry()
+        self._register_tools()
+        self._register_event_sources()
         # Load API keys from environment variables
         self.weather_api_key = os.getenv('OPENWEATHER_API_KEY')
         self.news_api_key = os.getenv('NEWSAPI_KEY')
@@ -70,7 +329,8 @@ class RealtimeService:
                 location = match.group(1).strip()
                 # Clean up common endings
                 location = re.sub(r'\s*(now|right now|\?|\.)*$', '', location)
-                return location.title()  # Capitalize properly
+                place = gazetteer.lookup(location)
+                return place.label if place else location.title()
 
         return None
 
@@ -94,118 +354,13 @@ class RealtimeService:
         return time_info
 
     def _get_timezone_from_location(self, location: Optional[str]) -> pytz.BaseTzInfo:
-        """Get timezone based on location string."""
-        import pytz
-
-        if not location:
-            return pytz.timezone('US/Pacific')  # Default fallback
-
-        location_lower = location.lower()
-
-        # US timezone mappings
-        timezone_mappings = {
-            # Mountain Time
-            'utah': 'US/Mountain',
-            'salt lake': 'US/Mountain',
-            'salt lake city': 'US/Mountain',
-            'denver': 'US/Mountain',
-            'colorado': 'US/Mountain',
-            'arizona': 'US/Arizona',  # Arizona doesn't observe DST
-            'phoenix': 'US/Arizona',
-            'montana': 'US/Mountain',
-            'wyoming': 'US/Mountain',
-            'new mexico': 'US/Mountain',
-            'idaho': 'US/Mountain',
-
-            # Pacific Time
-            'california': 'US/Pacific',
-            'san francisco': 'US/Pacific',
-            'los angeles': 'US/Pacific',
-            'berkeley': 'US/Pacific',
-            'seattle': 'US/Pacific',
-            'washington': 'US/Pacific',
-            'oregon': 'US/Pacific',
-            'nevada': 'US/Pacific',
-
-            # Eastern Time
-            'new york': 'US/Eastern',
-            'florida': 'US/Eastern',
-            'georgia': 'US/Eastern',
-            'virginia': 'US/Eastern',
-            'north carolina': 'US/Eastern',
-            'south carolina': 'US/Eastern',
-            'pennsylvania': 'US/Eastern',
-            'massachusetts': 'US/Eastern',
-            'connecticut': 'US/Eastern',
-            'maine': 'US/Eastern',
-            'vermont': 'US/Eastern',
-            'new hampshire': 'US/Eastern',
-            'rhode island': 'US/Eastern',
-            'delaware': 'US/Eastern',
-            'maryland': 'US/Eastern',
-            'washington dc': 'US/Eastern',
-            'dc': 'US/Eastern',
-
-            # Central Time
-            'texas': 'US/Central',
-            'chicago': 'US/Central',
-            'illinois': 'US/Central',
-            'wisconsin': 'US/Central',
-            'minnesota': 'US/Central',
-            'iowa': 'US/Central',
-            'missouri': 'US/Central',
-            'arkansas': 'US/Central',
-            'louisiana': 'US/Central',
-            'mississippi': 'US/Central',
-            'alabama': 'US/Central',
-            'tennessee': 'US/Central',
-            'kentucky': 'US/Central',
-            'indiana': 'US/Central',
-            'michigan': 'US/Central',
-            'ohio': 'US/Eastern',  # Most of Ohio is Eastern
-            'oklahoma': 'US/Central',
-            'kansas': 'US/Central',
-            'nebraska': 'US/Central',
-            'south dakota': 'US/Central',
-            'north dakota': 'US/Central',
-        }
-
-        # Check for matches
-        for location_key, timezone_name in timezone_mappings.items():
-            if location_key in location_lower:
-                try:
-                    return pytz.timezone(timezone_name)
-                except pytz.UnknownTimeZoneError:
-                    continue
-
-        # Default to Pacific if no match found
-        return pytz.timezone('US/Pacific')
+        """Get timezone based on location string (US/Pacific when the place is unknown)."""
+        return gazetteer.timezone(location)
     
     async def get_weather(self, location: str) -> Dict[str, Any]:
-        """Get current weather for a location using free weather service."""
-        try:
-            # Use wttr.in - a free weather service that doesn't require API keys
-            async with aiohttp.ClientSession() as session:
-                # wttr.in provides weather data in JSON format
-                url = f"https://wttr.in/{location}?format=j1"
-
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        current = data["current_condition"][0]
-
-                        return {
-                            "location": location,
-                            "temperature": f"{current['temp_F']}°F ({current['temp_C']}°C)",
-                            "condition": current["weatherDesc"][0]["value"],
-                            "humidity": f"{current['humidity']}%",
-                            "wind_speed": f"{current['windspeedMiles']} mph",
-                            "feels_like": f"{current['FeelsLikeF']}°F"
-                        }
-                    else:
-                        return self._get_weather_fallback(location)
-        except Exception as e:
-            return self._get_weather_fallback(location)
+        """Get current weather for a location (wttr.in, via the shared weather cache)."""
+        weather = await weather_cache.get(location)
+        return weather if weather is not None else self._get_weather_fallback(location)
 
     def _get_weather_fallback(self, location: str) -> Dict[str, Any]:
         """Fallback weather response when API is unavailable."""
@@ -213,7 +368,8 @@ class RealtimeService:
             "location": location,
             "temperature": "Unable to fetch",
             "condition": "Weather data temporarily unavailable",
-            "message": f"Please check your local weather app or website for current conditions in {location}. You can also try asking me again in a moment."
+            "message": f"Please check your local weather app or website for current conditions in {location}. You can also try asking me again in a moment.",
+            "fallback": True  # Not cached, so the next ask retries the API
         }
     
     async def get_local_news(self, location: str, limit: int = 3) -> List[Dict[str, Any]]:
@@ -284,180 +440,59 @@ class RealtimeService:
             }]
     
     async def get_sports_events(self, sport_type: str = None, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get current sports events and schedules using ESPN API."""
+        """Get current sports games from the background-polled ESPN scoreboards."""
+        sport_name = sport_type.upper() if sport_type else "sports"
         try:
-            events = []
-            now = datetime.now()
-            today = now.strftime('%Y-%m-%d')
-
-            # Use ESPN API for real-time sports data
-            async with aiohttp.ClientSession() as session:
-                urls_to_try = []
-
-                # Determine which APIs to call based on sport_type
-                if sport_type and 'nfl' in sport_type.lower():
-                    urls_to_try = [("https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard", "NFL")]
-                elif sport_type and 'nba' in sport_type.lower():
-                    urls_to_try = [("https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard", "NBA")]
-                elif sport_type and 'mlb' in sport_type.lower():
-                    urls_to_try = [("https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard", "MLB")]
-                elif sport_type and 'nhl' in sport_type.lower():
-                    urls_to_try = [("https://site.api.espn.com/apis/site/v2/sports/hockey/nhl/scoreboard", "NHL")]
-                else:
-                    # Try multiple sports if no specific type requested
-                    urls_to_try = [
-                        ("https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard", "NBA"),
-                        ("https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard", "NFL"),
-                        ("https://site.api.espn.com/apis/site/v2/sports/hockey/nhl/scoreboard", "NHL")
-                    ]
-
-                for url, league in urls_to_try:
-                    try:
-                        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                            if response.status == 200:
-                                data = await response.json()
-
-                                for game in data.get('events', []):
-                                    if len(events) >= limit:
-                                        break
-
-                                    competition = game.get('competitions', [{}])[0]
-                                    competitors = competition.get('competitors', [])
-
-                                    if len(competitors) >= 2:
-                                        team1 = competitors[0].get('team', {}).get('displayName', 'Team 1')
-                                        team2 = competitors[1].get('team', {}).get('displayName', 'Team 2')
-
-                                        # Get scores if available
-                                        score1 = competitors[0].get('score', '')
-                                        score2 = competitors[1].get('score', '')
-                                        score_text = f" ({score1}-{score2})" if score1 and score2 else ""
-
-                                        # Get game status and time
-                                        status_info = game.get('status', {})
-                                        status_type = status_info.get('type', {})
-                                        status_name = status_type.get('name', 'scheduled')
-                                        status_detail = status_info.get('type', {}).get('detail', '')
-
-                                        # Parse game date/time
-                                        game_date = game.get('date', '')
-                                        game_time = ""
-                                        if game_date:
-                                            try:
-                                                import pytz
-                                                game_dt = datetime.fromisoformat(game_date.replace('Z', '+00:00'))
-                                                # Convert to user's timezone (default to Pacific for now)
-                                                pst = pytz.timezone('US/Pacific')
-                                                game_local = game_dt.astimezone(pst)
-                                                game_time = game_local.strftime("%I:%M %p PT")
-                                            except:
-                                                game_time = "Time TBD"
-
-                                        # Create description based on game status
-                                        if status_name.lower() in ['in', 'live']:
-                                            description = f"🔴 LIVE: {status_detail}{score_text}"
-                                        elif status_name.lower() in ['final', 'completed']:
-                                            description = f"✅ Final{score_text}"
-                                        else:
-                                            description = f"📅 Scheduled for {game_time}"
-
-                                        # Get venue information
-                                        venue = competition.get('venue', {})
-                                        venue_name = venue.get('fullName', 'TBD')
-
-                                        # Create ESPN URL
-                                        game_id = game.get('id', '')
-                                        sport_path = 'nfl' if league == 'NFL' else 'nba' if league == 'NBA' else 'nhl' if league == 'NHL' else 'mlb'
-                                        espn_url = f"https://espn.com/{sport_path}/game/_/gameId/{game_id}" if game_id else "https://espn.com"
-
-                                        events.append({
-                                            'title': f"{league}: {team1} vs {team2}",
-                                            'description': description,
-                                            'location': venue_name,
-                                            'date': game_date,
-                                            'time': game_time,
-                                            'status': status_name,
-                                            'league': league,
-                                            'url': espn_url,
-                                            'event_type': 'sports',
-                                            'source': 'ESPN'
-                                        })
-
-                    except Exception as e:
-                        logger.error(f"Error fetching {league} data from ESPN: {e}")
-                        continue
-
-            # If no real data found, provide helpful fallback
-            if not events:
-                sport_name = sport_type.upper() if sport_type else "sports"
-                events = [{
-                    'title': f"Current {sport_name} Schedule",
-                    'description': f"For the latest {sport_name} games and schedules, check ESPN.com, the official league app, or your local sports channels.",
-                    'location': 'Various locations',
-                    'date': today,
-                    'time': 'Various times',
-                    'url': 'https://espn.com',
-                    'event_type': 'sports_info',
-                    'source': 'ESPN'
-                }]
-
-            return events
-
-        except Exception as e:
-            logger.error(f"Error in get_sports_events: {e}")
+            events = await sports_scoreboard.events(sport_type, limit)
+        except ScoreboardUnavailable:
+            # Scores not loaded yet; that says nothing about whether games are on
             return [{
-                'title': 'Sports Events',
-                'description': 'For current sports schedules, check ESPN.com or your favorite sports app.',
-                'location': 'Various',
-                'date': datetime.now().isoformat(),
+                'title': f"{sport_name} Scores Unavailable",
+                'description': f"Live {sport_name} scores could not be loaded right now, so it is unknown which games are on. Suggest checking ESPN.com or the official league app.",
+                'location': 'Various locations',
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'time': 'Various times',
+                'url': 'https://espn.com',
+                'event_type': 'sports_info',
+                'source': 'ESPN'
+            }]
+
+        # If no games are listed, provide helpful fallback
+        if not events:
+            events = [{
+                'title': f"Current {sport_name} Schedule",
+                'description': f"For the latest {sport_name} games and schedules, check ESPN.com, the official league app, or your local sports channels.",
+                'location': 'Various locations',
+                'date': datetime.now().strftime('%Y-%m-%d'),
                 'time': 'Various times',
                 'url': 'https://espn.com',
-                'event_type': 'sports_fallback',
+                'event_type': 'sports_info',
                 'source': 'ESPN'
             }]
 
+        return events
+
     async def get_local_events(self, location: str, limit: int = 10, user_interests: List[str] = None) -> List[Dict[str, Any]]:
-        """Get comprehensive local events using multiple APIs."""
+        """Get local events from the catalog that scheduled ingestion keeps filled."""
         try:
-            all_events = []
-
-            # Try multiple event sources with higher limits to get more events before filtering
-            async with aiohttp.ClientSession() as session:
-                # 1. Try Eventbrite API (get more events for better filtering)
-                eventbrite_events = await self._get_eventbrite_events(session, location, 20)
-                all_events.extend(eventbrite_events)
-                logger.info(f"Got {len(eventbrite_events)} events from Eventbrite")
-
-                # 2. Try Ticketmaster API (get more events for better filtering)
-                ticketmaster_events = await self._get_ticketmaster_events(session, location, 20)
-                all_events.extend(ticketmaster_events)
-                logger.info(f"Got {len(ticketmaster_events)} events from Ticketmaster")
-
-                # 3. Try SeatGeek API (get more events for better filtering)
-                seatgeek_events = await self._get_seatgeek_events(session, location, 20)
-                all_events.extend(seatgeek_events)
-                logger.info(f"Got {len(seatgeek_events)} events from SeatGeek")
-
-                # 4. Try web scraping (like ChatGPT does)
-                web_events = await self._get_web_scraped_events(session, location, 10)
-                all_events.extend(web_events)
-                logger.info(f"Got {len(web_events)} events from web scraping")
-
-                # 5. Try free event APIs that don't require keys
-                free_api_events = await self._get_free_api_events(session, location, 20)
-                all_events.extend(free_api_events)
-                logger.info(f"Got {len(free_api_events)} events from free APIs")
-
-                # 6. Try location-specific curated events (don't filter here, filter later)
-                curated_events = await self._get_curated_local_events(location, None)  # Don't filter yet
-                all_events.extend(curated_events)
-                logger.info(f"Got {len(curated_events)} curated events")
-
-            logger.info(f"Total events before filtering: {len(all_events)}")
-
-            # Remove duplicates and sort by date
-            unique_events = self._deduplicate_events(all_events)
-            sorted_events = sorted(unique_events, key=lambda x: x.get('date', ''))
+            if not degradation_controller.at_least(DegradationTier.CACHED_EVENTS):
+                if not user_interests:
+                    events = await event_ingestion.search(location, limit)
+                else:
+                    # Full-text prefilter in the catalog, then rank the candidates by interest score
+                    events = await event_ingestion.search(location, limit * 4, interest_terms(user_interests))
+                    if events is not None:
+                        events = self._filter_events_by_interests(events, user_interests)[:limit]
+                if events is not None:
+                    logger.info(f"Catalog returned {len(events)} events for {location}" + (f" matching {user_interests}" if user_interests else ""))
+                    return events
+
+            # Under heavy load, or when the catalog is unreachable, serve the last ingested (or curated) events
+            sorted_events = event_ingestion.recent(location)
+            if not sorted_events:
+                curated_events = await self._get_curated_local_events(location, None)
+                sorted_events = sorted(self._deduplicate_events(curated_events), key=lambda x: x.get('date', ''))
+            logger.info(f"Serving {len(sorted_events)} in-memory events for {location}")
 
             # Apply interest filtering to the full set of events
             if user_interests and sorted_events:
@@ -471,8 +506,12 @@ class RealtimeService:
             logger.error(f"Error getting local events: {e}")
             return await self._get_fallback_events(location)
 
-    async def _get_eventbrite_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
-        """Get events from Eventbrite API via RapidAPI."""
+    async def _get_eventbrite_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """Get events from Eventbrite API via RapidAPI.
+
+        Errors are logged and give [] unless raise_errors is set (scheduled ingestion
+        sets it, so source failures show up in its stats).
+        """
         if not self.eventbrite_api_key:
             return []
 
@@ -495,6 +534,7 @@ class RealtimeService:
             }
 
             # Try each endpoint
+            last_error = None
             for endpoint in endpoints_to_try:
                 try:
                     async with session.get(endpoint['url'], headers=headers, params=endpoint['params'], timeout=10) as response:
@@ -505,19 +545,25 @@ class RealtimeService:
                             return await self._parse_rapidapi_eventbrite_events(data, location, limit)
                         else:
                             logger.warning(f"Eventbrite API returned status {response.status}")
+                            last_error = f"status {response.status}"
 
                 except Exception as e:
                     logger.error(f"Error with Eventbrite endpoint {endpoint['url']}: {e}")
+                    last_error = str(e) or type(e).__name__
                     continue
 
             # If all endpoints fail, return empty list
+            if raise_errors and last_error:
+                raise RuntimeError(f"All Eventbrite endpoints failed: {last_error}")
             return []
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error fetching Eventbrite events: {e}")
             return []
 
-    async def _get_ticketmaster_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_ticketmaster_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """Get events from Ticketmaster API via RapidAPI."""
         if not self.eventbrite_api_key:  # Using same key for now
             return []
@@ -557,13 +603,17 @@ class RealtimeService:
                     return events
                 else:
                     logger.warning(f"Ticketmaster API returned status {response.status}")
+                    if raise_errors:
+                        response.raise_for_status()
                     return []
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error fetching Ticketmaster events: {e}")
             return []
 
-    async def _get_seatgeek_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_seatgeek_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """Get events from SeatGeek API via RapidAPI."""
         if not self.eventbrite_api_key:  # Using same key for now
             return []
@@ -603,13 +653,17 @@ class RealtimeService:
                     return events
                 else:
                     logger.warning(f"SeatGeek API returned status {response.status}")
+                    if raise_errors:
+                        response.raise_for_status()
                     return []
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error fetching SeatGeek events: {e}")
             return []
 
-    async def _get_web_scraped_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_web_scraped_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """Get events by scraping public event websites (like ChatGPT Online does)."""
         try:
             events = []
@@ -621,12 +675,12 @@ class RealtimeService:
                 {
                     'url': f'https://www.eventbrite.com/d/{state}--{city}/events/',
                     'name': 'Eventbrite',
-                    'parser': self._parse_eventbrite_html
+                    'parser': parse_eventbrite_html
                 },
                 {
                     'url': f'https://www.facebook.com/events/search/?q={city.replace("-", "%20")}%20events',
                     'name': 'Facebook',
-                    'parser': self._parse_facebook_html
+                    'parser': parse_facebook_html
                 }
             ]
 
@@ -634,172 +688,29 @@ class RealtimeService:
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
 
+            fetched = 0
             for site in event_sites:
-                try:
-                    async with session.get(site['url'], headers=headers, timeout=10) as response:
-                        if response.status == 200:
-                            html = await response.text()
-                            logger.info(f"Successfully scraped {site['name']} ({len(html)} chars)")
-
-                            # Parse HTML to extract real events
-                            site_events = await site['parser'](html, location, limit)
-                            events.extend(site_events)
-
-                            if len(events) >= limit:
-                                break
-
-                        else:
-                            logger.warning(f"{site['name']} returned status {response.status}")
-
-                except Exception as e:
-                    logger.warning(f"Could not scrape {site['name']}: {e}")
-                    continue
-
-            return events[:limit]
-
-        except Exception as e:
-            logger.error(f"Error web scraping events: {e}")
-            return []
-
-    async def _parse_eventbrite_html(self, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
-        """Parse Eventbrite HTML to extract real events (like ChatGPT does)."""
-        try:
-            try:
-                from bs4 import BeautifulSoup
-            except ImportError:
-                logger.error("BeautifulSoup not available - using regex parsing instead")
-                return await self._parse_eventbrite_html_regex(html, location, limit)
-
-            import re
-            from datetime import datetime, timedelta
-
-            soup = BeautifulSoup(html, 'html.parser')
-            events = []
-
-            # Look for event cards/containers
-            event_elements = soup.find_all(['div', 'article', 'section'],
-                                         class_=re.compile(r'event|card|listing', re.I))
-
-            for element in event_elements[:limit]:
-                try:
-                    # Extract title
-                    title_elem = element.find(['h1', 'h2', 'h3', 'h4', 'a'],
-                                            string=re.compile(r'.{5,}'))
-                    if not title_elem:
-                        continue
-
-                    title = title_elem.get_text().strip()
-                    if len(title) < 5 or 'cookie' in title.lower():
-                        continue
-
-                    # Extract date (look for date patterns)
-                    date_text = element.get_text()
-                    date_match = re.search(r'(Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct)\s+(\d{1,2})', date_text)
-
-                    if date_match:
-                        month_name = date_match.group(1)
-                        day = date_match.group(2)
-                        # Convert to date
-                        month_map = {'Nov': 11, 'Dec': 12, 'Jan': 1, 'Feb': 2, 'Mar': 3,
-                                   'Apr': 4, 'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8,
-                                   'Sep': 9, 'Oct': 10}
-                        month = month_map.get(month_name, 11)
-                        year = 2025 if month <= 12 else 2024
-                        event_date = f"{year}-{month:02d}-{int(day):02d}"
-                    else:
-                        # Default to this weekend
-                        weekend = datetime.now() + timedelta(days=2)
-                        event_date = weekend.strftime('%Y-%m-%d')
-
-                    events.append({
-                        'title': title[:100],
-                        'date': event_date,
-                        'time': '19:00',  # Default evening time
-                        'location': location,
-                        'description': f'Live event: {title}',
-                        'free': 'free' in element.get_text().lower(),
-                        'source': 'Eventbrite (Web)'
-                    })
-
-                except Exception as e:
+                # Size-capped streamed read, then parsed in the scrape process pool
+                html = await html_scraper.fetch(session, site['name'], site['url'], headers)
+                if not html:
                     continue
+                fetched += 1
 
-            return events
-
-        except ImportError:
-            logger.error("BeautifulSoup not installed - using regex fallback")
-            return await self._parse_eventbrite_html_regex(html, location, limit)
-        except Exception as e:
-            logger.error(f"Error parsing Eventbrite HTML: {e}")
-            return await self._parse_eventbrite_html_regex(html, location, limit)
-
-    async def _parse_eventbrite_html_regex(self, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
-        """Parse Eventbrite HTML using regex (fallback when BeautifulSoup not available)."""
-        try:
-            import re
-            from datetime import datetime, timedelta
-
-            events = []
-
-            # Look for event titles in common HTML patterns
-            title_patterns = [
-                r'<h[1-6][^>]*>([^<]{10,100})</h[1-6]>',  # Headers
-                r'<a[^>]*>([^<]{10,100})</a>',  # Links
-                r'title="([^"]{10,100})"',  # Title attributes
-                r'alt="([^"]{10,100})"'  # Alt attributes
-            ]
-
-            found_titles = set()
-
-            for pattern in title_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                for match in matches:
-                    title = match.strip()
-
-                    # Filter out common non-event text
-                    skip_words = ['cookie', 'privacy', 'terms', 'login', 'sign up', 'search',
-                                'menu', 'navigation', 'footer', 'header', 'advertisement']
-
-                    if (len(title) >= 10 and len(title) <= 100 and
-                        not any(skip in title.lower() for skip in skip_words) and
-                        title not in found_titles):
-
-                        found_titles.add(title)
-
-                        # Generate a realistic date (this weekend)
-                        weekend = datetime.now() + timedelta(days=2)
-                        event_date = weekend.strftime('%Y-%m-%d')
-
-                        events.append({
-                            'title': title,
-                            'date': event_date,
-                            'time': '19:00',
-                            'location': location,
-                            'description': f'Live event: {title}',
-                            'free': 'free' in title.lower(),
-                            'source': 'Eventbrite (Web/Regex)'
-                        })
-
-                        if len(events) >= limit:
-                            break
-
+                events.extend(await html_scraper.parse(site['name'], site['parser'], html, location, limit))
                 if len(events) >= limit:
                     break
 
-            logger.info(f"Regex parsing found {len(events)} events from Eventbrite HTML")
-            return events
+            if raise_errors and not fetched:
+                raise RuntimeError("No event site could be scraped")
+            return events[:limit]
 
         except Exception as e:
-            logger.error(f"Error in regex HTML parsing: {e}")
+            if raise_errors:
+                raise
+            logger.error(f"Error web scraping events: {e}")
             return []
 
-    async def _parse_facebook_html(self, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
-        """Parse Facebook HTML to extract real events."""
-        # Facebook is heavily protected, so return empty for now
-        # In production, you'd use Facebook Graph API
-        return []
-
-    async def _get_ticketmaster_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_ticketmaster_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """Get events from Ticketmaster Discovery API."""
         if not self.ticketmaster_api_key:
             return []
@@ -825,8 +736,12 @@ class RealtimeService:
                     return self._parse_ticketmaster_events(data)
                 else:
                     logger.warning(f"Ticketmaster API returned status {response.status}")
+                    if raise_errors:
+                        response.raise_for_status()
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.warning(f"Ticketmaster API error: {e}")
 
         return []
@@ -1048,7 +963,7 @@ class RealtimeService:
 
         return events
 
-    async def _get_free_api_events(self, session: aiohttp.ClientSession, location: str, limit: int) -> List[Dict[str, Any]]:
+    async def _get_free_api_events(self, session: aiohttp.ClientSession, location: str, limit: int, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """Get events from free APIs that don't require API keys."""
         events = []
 
@@ -1299,55 +1214,17 @@ class RealtimeService:
                 events.extend(boulder_events)
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.warning(f"Error fetching free API events: {e}")
 
         return events
 
     def _filter_events_by_interests(self, events: List[Dict[str, Any]], user_interests: List[str]) -> List[Dict[str, Any]]:
-        """Filter events based on user interests."""
+        """Events matching the user's interests, ranked by interest score and how soon they start."""
         if not user_interests:
             return events
-
-        filtered_events = []
-        interest_keywords = {
-            'hiking': ['hiking', 'trail', 'mountain', 'outdoor', 'nature', 'park', 'walk'],
-            'climbing': ['climbing', 'rock', 'boulder', 'mountain', 'outdoor'],
-            'boating': ['boating', 'sailing', 'water', 'lake', 'river', 'marina', 'kayak'],
-            'skiing': ['skiing', 'snow', 'winter', 'mountain', 'resort'],
-            'art': ['art', 'gallery', 'museum', 'creative', 'artist', 'exhibition', 'photography'],
-            'music': ['music', 'concert', 'band', 'jazz', 'festival', 'symphony', 'live', 'show', 'performance'],
-            'entertainment': ['entertainment', 'comedy', 'show', 'performance', 'theater', 'live'],
-            'food': ['food', 'restaurant', 'culinary', 'cooking', 'farmers market', 'dining', 'beer', 'festival'],
-            'fitness': ['fitness', 'gym', 'yoga', 'workout', 'sports', 'active', 'biking'],
-            'culture': ['culture', 'museum', 'history', 'temple', 'heritage'],
-            'social': ['social', 'community', 'meetup', 'gathering', 'festival'],
-            'sports': ['sports', 'basketball', 'jazz', 'game', 'arena', 'team']
-        }
-
-        for event in events:
-            event_text = f"{event.get('title', '')} {event.get('description', '')} {event.get('event_type', '')}".lower()
-
-            # Check if event matches any user interest
-            matches_interest = False
-            for interest in user_interests:
-                interest_lower = interest.lower()
-                # Direct match
-                if interest_lower in event_text:
-                    matches_interest = True
-                    break
-                # Keyword match
-                if interest_lower in interest_keywords:
-                    for keyword in interest_keywords[interest_lower]:
-                        if keyword in event_text:
-                            matches_interest = True
-                            break
-                if matches_interest:
-                    break
-
-            if matches_interest:
-                filtered_events.append(event)
-
-        return filtered_events
+        return interest_scorer.rank_by_interests(events, user_interests)
 
     def _get_next_date(self, days_ahead: int) -> str:
         """Get a date N days from now."""
@@ -1560,18 +1437,8 @@ class RealtimeService:
         return events
 
     def _deduplicate_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate events based on title and date."""
-        seen = set()
-        unique_events = []
-
-        for event in events:
-            # Create a key based on title and date
-            key = (event.get('title', '').lower(), event.get('date', ''))
-            if key not in seen:
-                seen.add(key)
-                unique_events.append(event)
-
-        return unique_events
+        """Merge duplicate and near-duplicate events (same day, similar title)."""
+        return event_deduplicator.collapse(events)
 
     async def _get_fallback_events(self, location: str) -> List[Dict[str, Any]]:
         """Get fallback events when APIs fail."""
@@ -1585,26 +1452,9 @@ class RealtimeService:
             "source": "Local Community"
         }]
 
-    def _get_location_coordinates(self, location: str) -> Dict[str, float]:
-        """Get approximate coordinates for major cities (simplified version)."""
-        # This is a simplified version - in production you'd use a geocoding API
-        coordinates = {
-            'salt lake city': {'lat': 40.7608, 'lng': -111.8910},
-            'san francisco': {'lat': 37.7749, 'lng': -122.4194},
-            'berkeley': {'lat': 37.8715, 'lng': -122.2730},
-            'new york': {'lat': 40.7128, 'lng': -74.0060},
-            'los angeles': {'lat': 34.0522, 'lng': -118.2437},
-            'chicago': {'lat': 41.8781, 'lng': -87.6298},
-            'denver': {'lat': 39.7392, 'lng': -104.9903}
-        }
-
-        location_lower = location.lower()
-        for city, coords in coordinates.items():
-            if city in location_lower:
-                return coords
-
-        # Default to Salt Lake City if not found
-        return coordinates['salt lake city']
+    def _get_location_coordinates(self, location: str) -> Optional[Dict[str, float]]:
+        """Get coordinates for a location from the gazetteer, or None when it is unknown."""
+        return gazetteer.coordinates(location)
 
     async def suggest_people_to_connect(self, interests: List[str], location: str = None, limit: int = 5, user_id: str = None, token: str = None) -> Dict[str, Any]:
         """Suggest people to connect with based on interests and location."""
@@ -1811,23 +1661,9 @@ class RealtimeService:
                 not location  # Default to Salt Lake for testing
             )
 
-            joins = []
-            activity_lower = activity.lower()
-
-            # Match activities to joins
-            if any(word in activity_lower for word in ['hiking', 'hike', 'trail', 'mountain', 'nature', 'outdoor']):
-                if is_salt_lake:
-                    joins.append(salt_lake_joins['hiking_slc'])
-                else:
-                    joins.append(bay_area_joins['hiking_bay_area'])
-
-            if any(word in activity_lower for word in ['climbing', 'climb', 'rock climbing', 'bouldering']):
-                if is_salt_lake:
-                    joins.append(salt_lake_joins['climbing_slc'])
-
-            if any(word in activity_lower for word in ['boating', 'boat', 'sailing', 'sail', 'marina', 'water sports']):
-                if is_salt_lake:
-                    joins.append(salt_lake_joins['boating_slc'])
+            # Rank the area's joins against the activities mentioned
+            area_joins = salt_lake_joins if is_salt_lake else bay_area_joins
+            joins = interest_scorer.rank_by_text(list(area_joins.values()), activity, limit)
 
             # If no specific activity matched, suggest hiking as default
             if not joins:
@@ -1869,318 +1705,109 @@ class RealtimeService:
                 "joins": []
             }
 
+    def _register_tools(self) -> None:
+        """Declare every tool the chat models can call."""
+        def register(name, handler, **options):
+            self.tools.register(ToolSpec(name, TOOL_SCHEMAS[name], handler, **options))
+
+        register("get_current_time", lambda args, ctx: self.get_current_time(args.get("location")), timeout=2.0)
+        register(
+            "get_weather",
+            lambda args, ctx: self.get_weather(args["location"]),
+            timeout=5.0  # Memoized by weather_cache, which the background refresher keeps fresher
+        )
+        register(
+            "get_local_news",
+            lambda args, ctx: self.get_local_news(args["location"], args.get("limit", 3)),
+            cache=ToolPolicy(900, GLOBAL, {"limit": 3})
+        )
+        register(
+            "get_sports_events",
+            lambda args, ctx: self.get_sports_events(args.get("sport_type"), args.get("limit", 5)),
+            timeout=2.0  # Reads the scoreboard snapshot; memoizing would only serve older scores
+        )
+        register(
+            "get_local_events",
+            lambda args, ctx: self.get_local_events(args["location"], args.get("limit", 3)),
+            cache=ToolPolicy(3600, GLOBAL, {"limit": 3})
+        )
+
+        # Profile updates: never cached, run one at a time in the order asked
+        register(
+            "update_profile_location",
+            lambda args, ctx: profile_service.update_profile_field(ctx.user_id, "location", args["location"], ctx.token),
+            side_effect=MUTATING,
+            requires_user=True
+        )
+        for name, field in (("add_hobbies", "hobbies"), ("add_interests", "interests"), ("add_skills", "skills")):
+            register(
+                name,
+                lambda args, ctx, field=field: profile_service.add_to_array_field(ctx.user_id, field, args[field], ctx.token),
+                side_effect=MUTATING,
+                requires_user=True
+            )
+        register(
+            "update_bio",
+            lambda args, ctx: profile_service.update_profile_field(ctx.user_id, "bio", args["bio"], ctx.token),
+            side_effect=MUTATING,
+            requires_user=True
+        )
+
+        # Personalized suggestions are only reused within the same conversation
+        register(
+            "suggest_people_to_connect",
+            lambda args, ctx: self.suggest_people_to_connect(
+                args["interests"], args.get("location"), args.get("limit", 5), ctx.user_id, ctx.token
+            ),
+            cache=ToolPolicy(600, CONVERSATION, {"location": None, "limit": 5})
+        )
+        register(
+            "suggest_joins_for_activity",
+            lambda args, ctx: self.suggest_joins_for_activity(
+                args["activity"], args.get("location"), args.get("limit", 5), ctx.user_id, ctx.token
+            ),
+            cache=ToolPolicy(600, CONVERSATION, {"location": None, "limit": 5})
+        )
+
+    def _register_event_sources(self) -> None:
+        """Sources the scheduled event ingestion pulls from, in dedupe priority order.
+
+        Fetchers raise instead of returning [] so ingestion records the failure.
+        """
+        register = event_ingestion.register_source
+        register("eventbrite", lambda session, location: self._get_eventbrite_events(session, location, 20, raise_errors=True))
+        register("ticketmaster", lambda session, location: self._get_ticketmaster_events(session, location, 20, raise_errors=True))
+        register("seatgeek", lambda session, location: self._get_seatgeek_events(session, location, 20, raise_errors=True))
+        # Scraping is the first source shed under load
+        register("web_scraped", lambda session, location: self._get_web_scraped_events(session, location, 10, raise_errors=True), sheddable=True)
+        register("free_api", lambda session, location: self._get_free_api_events(session, location, 20, raise_errors=True))
+        register("curated", lambda session, location: self._get_curated_local_events(location, None))
+
     def get_available_functions(self) -> List[Dict[str, Any]]:
-        """Get list of available real-time functions for OpenAI function calling."""
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_current_time",
-                    "description": "Get the current time and date, optionally for a specific location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "The location to get time for (optional)"
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_weather",
-                    "description": "Get current weather information for a location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "The city or location to get weather for"
-                            }
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_local_news",
-                    "description": "Get recent local news for a location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "The city or location to get news for"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of news articles to return (default 3)",
-                                "default": 3
-                            }
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_sports_events",
-                    "description": "Get current sports events and schedules for NFL, NBA, MLB, etc.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "sport_type": {
-                                "type": "string",
-                                "description": "Type of sport (nfl, nba, mlb, nhl) - optional",
-                                "enum": ["nfl", "nba", "mlb", "nhl"]
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of events to return (default 5)",
-                                "default": 5
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_local_events",
-                    "description": "Get local events, concerts, festivals, and activities for a location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "The city or location to get events for"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of events to return (default 10)",
-                                "default": 10
-                            }
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_profile_location",
-                    "description": "Update the user's location in their profile",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "The new location for the user"
-                            }
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_hobbies",
-                    "description": "Add new hobbies to the user's profile",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "hobbies": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of hobbies to add to the user's profile"
-                            }
-                        },
-                        "required": ["hobbies"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_interests",
-                    "description": "Add new interests to the user's profile",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "interests": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of interests to add to the user's profile"
-                            }
-                        },
-                        "required": ["interests"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_skills",
-                    "description": "Add new skills to the user's profile",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "skills": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of skills to add to the user's profile"
-                            }
-                        },
-                        "required": ["skills"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_bio",
-                    "description": "Update the user's bio/description in their profile",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "bio": {
-                                "type": "string",
-                                "description": "The new bio text for the user"
-                            }
-                        },
-                        "required": ["bio"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "suggest_people_to_connect",
-                    "description": "Find people with similar interests who the user might want to connect with",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "interests": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of interests to find people with similar interests"
-                            },
-                            "location": {
-                                "type": "string",
-                                "description": "Location to find people nearby (optional)"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of people to suggest (default: 5)"
-                            }
-                        },
-                        "required": ["interests"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "suggest_joins_for_activity",
-                    "description": "Find joins/activities based on user's interests and location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "activity": {
-                                "type": "string",
-                                "description": "The activity or interest to find joins for (e.g., 'hiking', 'climbing', 'photography')"
-                            },
-                            "location": {
-                                "type": "string",
-                                "description": "Location to find activities nearby (optional)"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of joins to suggest (default: 5)"
-                            }
-                        },
-                        "required": ["activity"]
-                    }
-                }
-            }
-        ]
+        """Get list of available real-time functions for OpenAI function calling.
+
+        The list is built once and shared across requests; do not mutate it.
+        """
+        return self.tools.schemas.tools
     
-    async def execute_function(self, function_name: str, arguments: Dict[str, Any], user_id: str = None, token: str = None) -> Dict[str, Any]:
-        """Execute a real-time function by name."""
-        if function_name == "get_current_time":
-            return await self.get_current_time(arguments.get("location"))
-        elif function_name == "get_weather":
-            return await self.get_weather(arguments["location"])
-        elif function_name == "get_local_news":
-            return await self.get_local_news(
-                arguments["location"],
-                arguments.get("limit", 3)
-            )
-        elif function_name == "get_local_events":
-            return await self.get_local_events(
-                arguments["location"],
-                arguments.get("limit", 3)
-            )
-        elif function_name == "get_sports_events":
-            return await self.get_sports_events(
-                arguments.get("sport_type"),
-                arguments.get("limit", 5)
-            )
-        elif function_name == "update_profile_location":
-            if not user_id:
-                return {"error": "User ID required for profile updates"}
-            return await profile_service.update_profile_field(
-                user_id, "location", arguments["location"], token
-            )
-        elif function_name == "add_hobbies":
-            if not user_id:
-                return {"error": "User ID required for profile updates"}
-            return await profile_service.add_to_array_field(
-                user_id, "hobbies", arguments["hobbies"], token
-            )
-        elif function_name == "add_interests":
-            if not user_id:
-                return {"error": "User ID required for profile updates"}
-            return await profile_service.add_to_array_field(
-                user_id, "interests", arguments["interests"], token
-            )
-        elif function_name == "add_skills":
-            if not user_id:
-                return {"error": "User ID required for profile updates"}
-            return await profile_service.add_to_array_field(
-                user_id, "skills", arguments["skills"], token
-            )
-        elif function_name == "update_bio":
-            if not user_id:
-                return {"error": "User ID required for profile updates"}
-            return await profile_service.update_profile_field(
-                user_id, "bio", arguments["bio"], token
-            )
-        elif function_name == "suggest_people_to_connect":
-            return await self.suggest_people_to_connect(
-                arguments["interests"],
-                arguments.get("location"),
-                arguments.get("limit", 5),
-                user_id,
-                token
-            )
-        elif function_name == "suggest_joins_for_activity":
-            return await self.suggest_joins_for_activity(
-                arguments["activity"],
-                arguments.get("location"),
-                arguments.get("limit", 5),
-                user_id,
-                token
-            )
-        else:
-            return {"error": f"Unknown function: {function_name}"}
+    async def execute_function(
+        self,
+        function_name: str,
+        arguments: Dict[str, Any],
+        user_id: str = None,
+        token: str = None,
+        deadline: Optional[Deadline] = None,
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a real-time function by name, bounded by the request deadline if given.
+
+        Results still fresh under the tool's cache policy are reused (marked
+        ``from_cache``) instead of calling upstream again.
+        """
+        return await self.tools.execute(
+            function_name, arguments, ToolContext(user_id, token, deadline, conversation_id)
+        )
 
 
 # Global instance
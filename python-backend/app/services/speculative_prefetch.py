@@ -0,0 +1,158 @@
+"""
+Speculative prefetch for the chat pipeline.
+
+Starts the tool calls the model is most likely to request (based on the
+hybrid router's query classification and the detected location) while the
+first model call is still running. If the model asks for the same call the
+prefetched result is reused; otherwise the task is cancelled and counted as
+wasted.
+"""
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from app.core.deadline import Deadline
+from app.services.gazetteer import gazetteer
+from app.services.message_matcher import match_message
+
+logger = logging.getLogger(__name__)
+
+# Tools that are safe to start speculatively (read-only) and the defaults
+# execute_function applies, so model-issued arguments can be matched exactly
+PREFETCHABLE_TOOLS: Dict[str, Dict[str, Any]] = {
+    "get_local_events": {"limit": 3},
+    "get_weather": {},
+}
+
+_LOCATION_PATTERN = re.compile(
+    r"\b(?:in|near|around|at)\s+([a-z][a-z .'-]*?)"
+    r"(?=\s+(?:this|today|tonight|tomorrow|now|on|for|next|right)\b|[?.!,]|$)"
+)
+
+
+class PrefetchStats:
+    """Counts useful vs. wasted speculative tool calls."""
+
+    def __init__(self):
+        self._started: Dict[str, int] = defaultdict(int)
+        self._useful: Dict[str, int] = defaultdict(int)
+        self._wasted: Dict[str, int] = defaultdict(int)
+
+    def record(self, outcome: str, tool: str) -> None:
+        getattr(self, f"_{outcome}")[tool] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        tools = set(self._started) | set(self._useful) | set(self._wasted)
+        return {
+            tool: {
+                "started": self._started[tool],
+                "useful": self._useful[tool],
+                "wasted": self._wasted[tool],
+                "hit_rate": round(self._useful[tool] / self._started[tool], 3) if self._started[tool] else 0.0,
+            }
+            for tool in sorted(tools)
+        }
+
+
+prefetch_stats = PrefetchStats()
+
+
+class PrefetchSet:
+    """Speculative tasks belonging to a single chat request."""
+
+    def __init__(self):
+        self._tasks: Dict[Tuple[str, Tuple], asyncio.Task] = {}
+
+    @staticmethod
+    def _key(function_name: str, arguments: Dict[str, Any]) -> Tuple[str, Tuple]:
+        merged = {**PREFETCHABLE_TOOLS.get(function_name, {}), **(arguments or {})}
+        normalized = tuple(sorted(
+            (k, v.strip().lower() if isinstance(v, str) else v) for k, v in merged.items()
+        ))
+        return function_name, normalized
+
+    def start(self, function_name: str, arguments: Dict[str, Any], coro: Awaitable[Any]) -> None:
+        key = self._key(function_name, arguments)
+        if key in self._tasks:
+            coro.close()
+            return
+        self._tasks[key] = asyncio.ensure_future(coro)
+        prefetch_stats.record("started", function_name)
+        logger.info(f"Speculatively started {function_name} with {arguments}")
+
+    def claim(self, function_name: str, arguments: Dict[str, Any]) -> Optional[asyncio.Task]:
+        """Hand over a matching prefetched task, or None if nothing matches."""
+        task = self._tasks.pop(self._key(function_name, arguments), None)
+        if task is not None:
+            prefetch_stats.record("useful", function_name)
+        return task
+
+    def discard(self) -> None:
+        """Cancel and count every prefetched task the model never asked for."""
+        for (function_name, _), task in self._tasks.items():
+            task.cancel()
+            prefetch_stats.record("wasted", function_name)
+        self._tasks.clear()
+
+
+class SpeculativePrefetcher:
+    """Predicts and starts likely tool calls for a chat turn."""
+
+    def extract_location(self, message: str) -> Optional[str]:
+        """Pull a place name out of phrases like 'events in Denver this weekend'."""
+        match = _LOCATION_PATTERN.search((message or "").lower())
+        if not match:
+            return None
+        location = match.group(1).strip()
+        if len(location) <= 1:
+            return None
+        place = gazetteer.lookup(location)
+        return place.label if place else location.title()
+
+    def predict(self, query_type: Optional[str], message: str, profile_location: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Guess which read-only tools the model will call.
+
+        Only realtime/event queries are predicted; other query types rarely
+        trigger a tool call before the model has reasoned about the request.
+        """
+        if query_type != "realtime_events":
+            return []
+
+        location = self.extract_location(message) or profile_location
+        if not location:
+            return []
+
+        if match_message(message).has("weather"):
+            return [("get_weather", {"location": location})]
+        return [("get_local_events", {"location": location})]
+
+    def start(
+        self,
+        query_type: Optional[str],
+        message: str,
+        profile_location: Optional[str] = None,
+        user_id: Optional[str] = None,
+        token: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        conversation_id: Optional[str] = None,
+    ) -> PrefetchSet:
+        """Start predicted tool calls and return the request's prefetch set."""
+        from app.services.realtime_service import realtime_service
+
+        prefetch = PrefetchSet()
+        for function_name, arguments in self.predict(query_type, message, profile_location):
+            prefetch.start(
+                function_name,
+                arguments,
+                realtime_service.execute_function(
+                    function_name, arguments, user_id, token, deadline=deadline, conversation_id=conversation_id
+                )
+            )
+        return prefetch
+
+
+# Global instance
+speculative_prefetcher = SpeculativePrefetcher()
@@ -0,0 +1,277 @@
+"""
+Background ESPN scoreboard poller and in-memory snapshot store.
+
+The NBA, NFL, MLB and NHL scoreboards are polled in the background, every
+SPORTS_POLL_LIVE_SECONDS while a league has a game in progress (or about to
+start) and every SPORTS_POLL_IDLE_SECONDS otherwise. Each poll is parsed
+once into a LeagueSnapshot with live, upcoming and completed games already
+sorted, so sports answers are a read from memory and never wait on ESPN. A
+failed poll keeps the previous snapshot and is retried sooner.
+
+Right after startup the store is empty. A read then waits up to
+SPORTS_COLD_START_WAIT_SECONDS for the first poll of its leagues, and raises
+ScoreboardUnavailable if none has a snapshot yet, so an empty store is
+never mistaken for a day without games.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import pytz
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCOREBOARD_URLS: Dict[str, str] = {
+    "NBA": "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard",
+    "NFL": "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard",
+    "MLB": "https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard",
+    "NHL": "https://site.api.espn.com/apis/site/v2/sports/hockey/nhl/scoreboard",
+}
+
+LIVE = "live"
+UPCOMING = "upcoming"
+COMPLETED = "completed"
+
+_PACIFIC = pytz.timezone('US/Pacific')
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _phase(status_type: Dict[str, Any]) -> str:
+    # ESPN's state is "pre", "in" or "post"; older payloads only carry a name
+    state = (status_type.get('state') or '').lower()
+    name = (status_type.get('name') or '').lower()
+    if state == 'in' or name in ('in', 'live', 'status_in_progress', 'status_halftime'):
+        return LIVE
+    if state == 'post' or status_type.get('completed') or name in ('final', 'completed', 'status_final'):
+        return COMPLETED
+    return UPCOMING
+
+
+def parse_game(game: Dict[str, Any], league: str) -> Optional[Dict[str, Any]]:
+    """One ESPN scoreboard event as a sports event dict (None without two teams)."""
+    competition = (game.get('competitions') or [{}])[0]
+    competitors = competition.get('competitors', [])
+    if len(competitors) < 2:
+        return None
+
+    team1 = competitors[0].get('team', {}).get('displayName', 'Team 1')
+    team2 = competitors[1].get('team', {}).get('displayName', 'Team 2')
+
+    # Get scores if available
+    score1 = competitors[0].get('score', '')
+    score2 = competitors[1].get('score', '')
+    score_text = f" ({score1}-{score2})" if score1 and score2 else ""
+
+    status_type = game.get('status', {}).get('type', {})
+    status_name = status_type.get('name', 'scheduled')
+    status_detail = status_type.get('detail', '')
+    phase = _phase(status_type)
+
+    # Parse game date/time (shown in Pacific for now)
+    game_date = game.get('date', '')
+    game_time = ""
+    starts_at = None
+    if game_date:
+        try:
+            starts_at = datetime.fromisoformat(game_date.replace('Z', '+00:00'))
+            game_time = starts_at.astimezone(_PACIFIC).strftime("%I:%M %p PT")
+        except ValueError:
+            game_time = "Time TBD"
+
+    if phase == LIVE:
+        description = f"🔴 LIVE: {status_detail}{score_text}"
+    elif phase == COMPLETED:
+        description = f"✅ Final{score_text}"
+    else:
+        description = f"📅 Scheduled for {game_time}"
+
+    game_id = game.get('id', '')
+    espn_url = f"https://espn.com/{league.lower()}/game/_/gameId/{game_id}" if game_id else "https://espn.com"
+
+    return {
+        'title': f"{league}: {team1} vs {team2}",
+        'description': description,
+        'location': competition.get('venue', {}).get('fullName', 'TBD'),
+        'date': game_date,
+        'time': game_time,
+        'status': status_name,
+        'phase': phase,
+        'league': league,
+        'url': espn_url,
+        'event_type': 'sports',
+        'source': 'ESPN',
+        '_starts_at': starts_at or _EPOCH,
+    }
+
+
+class ScoreboardUnavailable(Exception):
+    """Raised when no requested league has been polled successfully yet."""
+
+
+class LeagueSnapshot:
+    """Parsed scoreboard for one league at one point in time."""
+
+    def __init__(self, league: str, games: List[Dict[str, Any]]):
+        self.league = league
+        self.fetched_at = time.monotonic()
+        by_phase: Dict[str, List[Dict[str, Any]]] = {LIVE: [], UPCOMING: [], COMPLETED: []}
+        for game in games:
+            by_phase[game['phase']].append(game)
+        self.live = sorted(by_phase[LIVE], key=lambda g: g['_starts_at'])
+        self.upcoming = sorted(by_phase[UPCOMING], key=lambda g: g['_starts_at'])
+        self.completed = sorted(by_phase[COMPLETED], key=lambda g: g['_starts_at'], reverse=True)
+
+    def starts_soon(self) -> bool:
+        """A game is live, or one starts within SPORTS_POLL_LEAD_SECONDS."""
+        if self.live:
+            return True
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=settings.SPORTS_POLL_LEAD_SECONDS)
+        return any(_EPOCH < game['_starts_at'] <= horizon for game in self.upcoming)
+
+
+def _public(game: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in game.items() if not key.startswith('_')}
+
+
+class SportsScoreboard:
+    """Latest LeagueSnapshot per league, kept current by a background poller."""
+
+    def __init__(self):
+        self._snapshots: Dict[str, LeagueSnapshot] = {}
+        self._next_poll: Dict[str, float] = {league: 0.0 for league in SCOREBOARD_URLS}
+        # Set once a league's first poll has finished, successfully or not
+        self._first_poll: Dict[str, asyncio.Event] = {league: asyncio.Event() for league in SCOREBOARD_URLS}
+        self._poller: Optional[asyncio.Task] = None
+        self.counts: Dict[str, int] = {
+            "polls": 0, "failures": 0, "reads": 0, "empty_reads": 0, "cold_waits": 0, "unavailable": 0,
+        }
+
+    @staticmethod
+    def leagues_for(sport_type: Optional[str]) -> List[str]:
+        """Leagues a sport type ("nba", "NFL games", ...) refers to; all of them when unspecified."""
+        if sport_type:
+            requested = [league for league in SCOREBOARD_URLS if league.lower() in sport_type.lower()]
+            if requested:
+                return requested
+        return list(SCOREBOARD_URLS)
+
+    async def _await_first_poll(self, leagues: List[str]) -> None:
+        pending = [league for league in leagues if not self._first_poll[league].is_set()]
+        if not pending:
+            return
+        self.counts["cold_waits"] += 1
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._first_poll[league].wait() for league in pending)),
+                timeout=settings.SPORTS_COLD_START_WAIT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.info(f"First scoreboard poll for {', '.join(pending)} still running")
+
+    async def buckets(self, sport_type: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Live, upcoming and completed games across the requested leagues, each sorted.
+
+        Raises:
+            ScoreboardUnavailable: if none of the leagues has been polled successfully yet
+        """
+        if self._poller is None:
+            self.start()
+        leagues = self.leagues_for(sport_type)
+        if not any(league in self._snapshots for league in leagues):
+            await self._await_first_poll(leagues)
+        snapshots = [self._snapshots[league] for league in leagues if league in self._snapshots]
+        if not snapshots:
+            self.counts["unavailable"] += 1
+            raise ScoreboardUnavailable(f"No scoreboard yet for {', '.join(leagues)}")
+        merged = {
+            LIVE: sorted((g for s in snapshots for g in s.live), key=lambda g: g['_starts_at']),
+            UPCOMING: sorted((g for s in snapshots for g in s.upcoming), key=lambda g: g['_starts_at']),
+            COMPLETED: sorted((g for s in snapshots for g in s.completed), key=lambda g: g['_starts_at'], reverse=True),
+        }
+        return {phase: [_public(game) for game in games] for phase, games in merged.items()}
+
+    async def events(self, sport_type: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Up to ``limit`` games, live first, then upcoming, then most recent results.
+
+        Raises:
+            ScoreboardUnavailable: if none of the leagues has been polled successfully yet
+        """
+        buckets = await self.buckets(sport_type)
+        events = (buckets[LIVE] + buckets[UPCOMING] + buckets[COMPLETED])[:limit]
+        self.counts["reads"] += 1
+        if not events:
+            self.counts["empty_reads"] += 1
+        return events
+
+    def start(self) -> None:
+        """Start the background poller (idempotent; needs a running event loop)."""
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_event_loop().create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+    async def _poll_loop(self) -> None:
+        async with aiohttp.ClientSession() as session:
+            while True:
+                now = time.monotonic()
+                due = [league for league, at in self._next_poll.items() if at <= now]
+                if due:
+                    await asyncio.gather(*(self._poll(session, league) for league in due))
+                wait = min(self._next_poll.values()) - time.monotonic()
+                await asyncio.sleep(min(max(wait, 1.0), settings.SPORTS_POLL_IDLE_SECONDS))
+
+    async def _poll(self, session: aiohttp.ClientSession, league: str) -> None:
+        self.counts["polls"] += 1
+        try:
+            timeout = aiohttp.ClientTimeout(total=settings.SPORTS_FETCH_TIMEOUT)
+            async with session.get(SCOREBOARD_URLS[league], timeout=timeout) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+                data = await response.json(content_type=None)
+            games = [game for game in (parse_game(event, league) for event in data.get('events', [])) if game]
+        except Exception as e:
+            self.counts["failures"] += 1
+            logger.warning(f"Error polling {league} scoreboard from ESPN: {e}")
+            self._next_poll[league] = time.monotonic() + settings.SPORTS_POLL_RETRY_SECONDS
+            self._first_poll[league].set()
+            return
+
+        snapshot = LeagueSnapshot(league, games)
+        self._snapshots[league] = snapshot
+        self._first_poll[league].set()
+        interval = settings.SPORTS_POLL_LIVE_SECONDS if snapshot.starts_soon() else settings.SPORTS_POLL_IDLE_SECONDS
+        self._next_poll[league] = time.monotonic() + interval
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "poller_running": self._poller is not None and not self._poller.done(),
+            "leagues": {
+                league: {
+                    "live": len(s.live),
+                    "upcoming": len(s.upcoming),
+                    "completed": len(s.completed),
+                    "age_seconds": round(now - s.fetched_at, 1),
+                    "next_poll_in_seconds": round(max(self._next_poll[league] - now, 0.0), 1),
+                }
+                for league, s in self._snapshots.items()
+            },
+            **self.counts,
+        }
+
+
+# Global instance
+sports_scoreboard = SportsScoreboard()
@@ -0,0 +1,172 @@
+"""
+Memoization of tool results for the chat function-calling loop.
+
+Each tool declares a ToolPolicy: how long its result stays fresh and whether
+it may be shared across users ("global", e.g. weather for a city) or only
+within one user's conversation ("conversation", e.g. personalized people
+suggestions). Tools without a policy, such as the current time and profile
+mutations, always run. Keys use normalized arguments (defaults filled in,
+strings trimmed and lowercased, lists sorted), so "Denver" and "denver "
+share an entry.
+
+Cached results are returned as copies marked ``from_cache`` so the model
+(and logs) can tell a reused answer from a fresh one.
+"""
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = "global"
+CONVERSATION = "conversation"
+
+
+class ToolPolicy:
+    """Freshness and sharing rules for one tool's results."""
+
+    def __init__(self, ttl: float, scope: str = GLOBAL, defaults: Optional[Dict[str, Any]] = None):
+        self.ttl = ttl  # Seconds a result stays fresh
+        self.scope = scope  # GLOBAL or CONVERSATION
+        self.defaults = defaults or {}  # Argument defaults the dispatcher applies
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(str(_normalize(item)) for item in value))
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    return value
+
+
+def _is_cacheable(result: Any) -> bool:
+    """Errors, timeouts, fallbacks and empty answers are never cached."""
+    if isinstance(result, dict):
+        return not (
+            result.get("error") or result.get("success") is False or result.get("timed_out") or result.get("fallback")
+        )
+    return bool(result)
+
+
+def _mark_cached(result: Any, age: float) -> Any:
+    if isinstance(result, dict):
+        return {**result, "from_cache": True, "cache_age_seconds": round(age, 1)}
+    if isinstance(result, list):
+        return [{**item, "from_cache": True} if isinstance(item, dict) else item for item in result]
+    return result
+
+
+class ToolResultCache:
+    """Global and per-conversation result caches keyed on normalized tool arguments."""
+
+    def __init__(self):
+        self._global: "OrderedDict[Tuple, Tuple[float, float, Any]]" = OrderedDict()
+        self._conversations: "OrderedDict[str, Dict[Tuple, Tuple[float, float, Any]]]" = OrderedDict()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def conversation_key(user_id: Optional[str], conversation_id: Optional[str]) -> Optional[str]:
+        """Conversation scope; without either id nothing is cached per conversation."""
+        if not user_id and not conversation_id:
+            return None
+        return f"{user_id or 'anonymous'}:{conversation_id or 'default'}"
+
+    @staticmethod
+    def _key(function_name: str, arguments: Dict[str, Any], policy: ToolPolicy) -> Tuple:
+        merged = {**policy.defaults, **(arguments or {})}
+        return function_name, _normalize(merged)
+
+    def _store(self, policy: ToolPolicy, conversation: Optional[str], create: bool = False):
+        if policy.scope == GLOBAL:
+            return self._global
+        if conversation is None:
+            return None
+        store = self._conversations.get(conversation)
+        if store is None and create:
+            store = self._conversations[conversation] = {}
+            while len(self._conversations) > settings.TOOL_CACHE_MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+        if store is not None:
+            self._conversations.move_to_end(conversation)
+        return store
+
+    def get(
+        self,
+        function_name: str,
+        arguments: Dict[str, Any],
+        policy: Optional[ToolPolicy],
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+    ) -> Optional[Any]:
+        """A fresh cached result marked ``from_cache``, or None."""
+        if policy is None or not settings.TOOL_CACHE_ENABLED:
+            return None
+        store = self._store(policy, self.conversation_key(user_id, conversation_id))
+        key = self._key(function_name, arguments, policy)
+        entry = store.get(key) if store is not None else None
+        now = time.monotonic()
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del store[key]
+            self._misses[function_name] += 1
+            return None
+
+        expires_at, stored_at, result = entry
+        self._hits[function_name] += 1
+        logger.info(f"Tool cache hit: {function_name} ({policy.scope}, {now - stored_at:.0f}s old)")
+        return _mark_cached(result, now - stored_at)
+
+    def put(
+        self,
+        function_name: str,
+        arguments: Dict[str, Any],
+        policy: Optional[ToolPolicy],
+        result: Any,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+    ) -> None:
+        if policy is None or not settings.TOOL_CACHE_ENABLED or not _is_cacheable(result):
+            return
+        store = self._store(policy, self.conversation_key(user_id, conversation_id), create=True)
+        if store is None:
+            return
+        now = time.monotonic()
+        store[self._key(function_name, arguments, policy)] = (now + policy.ttl, now, result)
+        if store is self._global:
+            self._global.move_to_end(self._key(function_name, arguments, policy))
+            while len(self._global) > settings.TOOL_CACHE_MAX_ENTRIES:
+                self._global.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[str]) -> None:
+        """Drop a user's conversation results, e.g. after their profile changed."""
+        if not user_id:
+            return
+        prefix = f"{user_id}:"
+        for conversation in [key for key in self._conversations if key.startswith(prefix)]:
+            del self._conversations[conversation]
+
+    def snapshot(self) -> Dict[str, Any]:
+        tools = set(self._hits) | set(self._misses)
+        return {
+            "enabled": settings.TOOL_CACHE_ENABLED,
+            "global_entries": len(self._global),
+            "conversations": len(self._conversations),
+            "tools": {
+                tool: {
+                    "hits": self._hits[tool],
+                    "misses": self._misses[tool],
+                    "hit_rate": round(self._hits[tool] / (self._hits[tool] + self._misses[tool]), 3),
+                }
+                for tool in sorted(tools)
+            },
+        }
+
+
+# Global instance
+tool_result_cache = ToolResultCache()
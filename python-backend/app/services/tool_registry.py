@@ -0,0 +1,142 @@
+"""
+Declarative registry of the tools the chat models can call.
+
+Each ToolSpec declares the tool's OpenAI schema, its async handler, a
+timeout, whether it only reads (safe to run in parallel and to prefetch) or
+mutates state (run one at a time, in the order the model asked), and an
+optional ToolPolicy for result memoization. ``ToolRegistry.execute`` applies
+all of that in one place, so adding a tool is a single registration.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.services.prompt_templates import CachedTools
+from app.services.tool_cache import ToolPolicy, tool_result_cache
+
+logger = logging.getLogger(__name__)
+
+# Side-effect classes
+READ_ONLY = "read_only"
+MUTATING = "mutating"
+
+
+class ToolContext:
+    """Who a tool call runs for and the budget it runs under."""
+
+    def __init__(
+        self,
+        user_id: Optional[str] = None,
+        token: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        conversation_id: Optional[str] = None,
+    ):
+        self.user_id = user_id
+        self.token = token
+        self.deadline = deadline
+        self.conversation_id = conversation_id
+
+
+ToolHandler = Callable[[Dict[str, Any], ToolContext], Awaitable[Any]]
+
+
+class ToolSpec:
+    """Schema, handler and execution rules for one tool."""
+
+    def __init__(
+        self,
+        name: str,
+        schema: Dict[str, Any],
+        handler: ToolHandler,
+        timeout: Optional[float] = None,
+        side_effect: str = READ_ONLY,
+        cache: Optional[ToolPolicy] = None,
+        requires_user: bool = False,
+    ):
+        self.name = name
+        self.schema = schema
+        self.handler = handler
+        self.timeout = timeout  # None: TOOL_CALL_TIMEOUT
+        self.side_effect = side_effect
+        self.cache = cache  # None: never memoized
+        self.requires_user = requires_user
+
+    @property
+    def mutating(self) -> bool:
+        return self.side_effect == MUTATING
+
+    def missing_arguments(self, arguments: Dict[str, Any]) -> List[str]:
+        """Required parameters (per the schema) absent from a call's arguments."""
+        required = self.schema.get("function", {}).get("parameters", {}).get("required", [])
+        return [param for param in required if param not in arguments]
+
+
+class ToolRegistry:
+    """Tools by name, with their schemas cached for the provider requests."""
+
+    def __init__(self):
+        self._specs: Dict[str, ToolSpec] = {}
+        self._schemas: Optional[CachedTools] = None
+
+    def register(self, spec: ToolSpec) -> None:
+        self._specs[spec.name] = spec
+        self._schemas = None
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._specs.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    @property
+    def schemas(self) -> CachedTools:
+        """Schemas in registration order, serialized once."""
+        if self._schemas is None:
+            self._schemas = CachedTools([spec.schema for spec in self._specs.values()])
+        return self._schemas
+
+    def is_mutating(self, name: str) -> bool:
+        spec = self._specs.get(name)
+        return spec is not None and spec.mutating
+
+    async def execute(self, name: str, arguments: Dict[str, Any], context: Optional[ToolContext] = None) -> Any:
+        """
+        Run a tool call.
+
+        Failures come back as ``{"success": False, "error": ...}`` payloads
+        rather than exceptions so the model can see and react to them.
+        """
+        context = context or ToolContext()
+        spec = self._specs.get(name)
+        if spec is None:
+            return {"error": f"Unknown function: {name}"}
+        if spec.requires_user and not context.user_id:
+            return {"error": "User ID required for profile updates"}
+        missing = spec.missing_arguments(arguments)
+        if missing:
+            return {"success": False, "error": f"Missing argument {', '.join(missing)} for {name}"}
+
+        cached = tool_result_cache.get(name, arguments, spec.cache, context.user_id, context.conversation_id)
+        if cached is not None:
+            return cached
+
+        timeout = spec.timeout or settings.TOOL_CALL_TIMEOUT
+        try:
+            if context.deadline is not None:
+                result = await context.deadline.run(f"tool:{name}", spec.handler(arguments, context), cap=timeout)
+            else:
+                result = await asyncio.wait_for(spec.handler(arguments, context), timeout=timeout)
+        except (DeadlineExceeded, asyncio.TimeoutError) as e:
+            logger.warning(f"Function {name} dropped: {e}")
+            return {"success": False, "error": f"{name} timed out", "timed_out": True}
+        except Exception as e:
+            logger.error(f"Function {name} failed: {e}")
+            return {"success": False, "error": f"{name} failed: {e}"}
+
+        tool_result_cache.put(name, arguments, spec.cache, result, context.user_id, context.conversation_id)
+        if spec.mutating and isinstance(result, dict) and not result.get("error"):
+            # Personalized results may depend on what just changed
+            tool_result_cache.invalidate_user(context.user_id)
+        return result
@@ -0,0 +1,249 @@
+"""
+Current-weather cache in front of wttr.in.
+
+Locations are normalized through the gazetteer (so "SF", "San Francisco"
+and "san francisco, ca" are one key) and mapped to a geohash cell
+(WEATHER_GEOHASH_PRECISION 5 is roughly 5 km across) from the gazetteer's
+coordinates, or, for places it does not know, from where the first fetch
+says they are, so nearby names end up sharing one entry.
+Entries are fresh for WEATHER_CACHE_TTL_SECONDS; concurrent misses for the
+same location share a single upstream fetch.
+
+A background refresher re-fetches entries that were requested within the
+last WEATHER_ACTIVE_WINDOW_SECONDS shortly before they expire, so active
+cities are always warm and a weather lookup is a dict read. Inactive
+entries are evicted. If upstream fails, a stale entry younger than
+WEATHER_STALE_SECONDS is served rather than the "unavailable" fallback.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from app.core.config import settings
+from app.services.gazetteer import gazetteer, normalize_location
+
+logger = logging.getLogger(__name__)
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """Standard base-32 geohash of a coordinate."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            value, interval = longitude, lon_range
+        else:
+            value, interval = latitude, lat_range
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+class _WeatherEntry:
+    def __init__(self, query: str, data: Dict[str, Any]):
+        self.query = query  # What to ask upstream when refreshing
+        self.data = data
+        self.fetched_at = time.monotonic()
+        self.requested_at = self.fetched_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class WeatherCache:
+    """Weather entries by geohash cell (or normalized name until the cell is known)."""
+
+    def __init__(self):
+        self._entries: Dict[str, _WeatherEntry] = {}
+        self._cells: Dict[str, str] = {}  # normalized location -> geohash cell
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        self.counts: Dict[str, int] = {
+            "hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "failures": 0,
+            "refreshes": 0, "stale_served": 0, "evicted": 0,
+        }
+
+    def _key(self, normalized: str) -> str:
+        cell = self._cells.get(normalized)
+        if cell is None:
+            place = gazetteer.lookup(normalized)
+            if place is not None:
+                cell = self._cells[normalized] = geohash_encode(place.latitude, place.longitude, precision=settings.WEATHER_GEOHASH_PRECISION)
+        return cell or f"name:{normalized}"
+
+    async def get(self, location: str) -> Optional[Dict[str, Any]]:
+        """Current weather for ``location``, or None when it cannot be fetched."""
+        normalized = normalize_location(location)
+        if not normalized:
+            return None
+
+        entry = self._entries.get(self._key(normalized))
+        if entry is not None:
+            entry.requested_at = time.monotonic()
+            if entry.age < settings.WEATHER_CACHE_TTL_SECONDS:
+                self.counts["hits"] += 1
+                return {"location": location, **entry.data}
+
+        self.counts["misses"] += 1
+        data = await self._fetch_coalesced(normalized, location)
+        if data is not None:
+            return {"location": location, **data}
+        if entry is not None and entry.age < settings.WEATHER_STALE_SECONDS:
+            self.counts["stale_served"] += 1
+            return {"location": location, **entry.data}
+        return None
+
+    async def _fetch_coalesced(self, normalized: str, query: str) -> Optional[Dict[str, Any]]:
+        """One upstream fetch per location at a time; later callers await the same result."""
+        inflight = self._inflight.get(normalized)
+        if inflight is not None:
+            self.counts["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._fetch_and_store(normalized, query))
+        self._inflight[normalized] = future
+        future.add_done_callback(lambda _: self._inflight.pop(normalized, None))
+        # Shielded so a cancelled request does not cancel the fetch other callers wait on
+        return await asyncio.shield(future)
+
+    async def _fetch_and_store(self, normalized: str, query: str) -> Optional[Dict[str, Any]]:
+        fetched = await self._fetch(query)
+        if fetched is None:
+            return None
+        data, coordinates = fetched
+
+        if coordinates is not None and self._key(normalized).startswith("name:"):
+            cell = geohash_encode(*coordinates, precision=settings.WEATHER_GEOHASH_PRECISION)
+            previous = self._key(normalized)
+            self._cells[normalized] = cell
+            if previous != cell:
+                self._entries.pop(previous, None)
+            key = cell
+        else:
+            key = self._key(normalized)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = _WeatherEntry(query, data)
+        else:
+            entry.data = data
+            entry.fetched_at = time.monotonic()
+        return data
+
+    async def _fetch(self, query: str) -> Optional[Tuple[Dict[str, Any], Optional[Tuple[float, float]]]]:
+        """Fetch from wttr.in (free, no API key); returns (weather fields, (lat, lon))."""
+        self.counts["fetches"] += 1
+        try:
+            async with aiohttp.ClientSession() as session:
+                # wttr.in provides weather data in JSON format
+                url = f"https://wttr.in/{query}?format=j1"
+                timeout = aiohttp.ClientTimeout(total=settings.WEATHER_FETCH_TIMEOUT)
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status != 200:
+                        self.counts["failures"] += 1
+                        return None
+                    payload = await response.json(content_type=None)
+        except Exception as e:
+            self.counts["failures"] += 1
+            logger.warning(f"Weather fetch failed for {query}: {e}")
+            return None
+
+        try:
+            current = payload["current_condition"][0]
+            data = {
+                "temperature": f"{current['temp_F']}°F ({current['temp_C']}°C)",
+                "condition": current["weatherDesc"][0]["value"],
+                "humidity": f"{current['humidity']}%",
+                "wind_speed": f"{current['windspeedMiles']} mph",
+                "feels_like": f"{current['FeelsLikeF']}°F"
+            }
+        except (KeyError, IndexError, TypeError) as e:
+            self.counts["failures"] += 1
+            logger.warning(f"Unexpected weather payload for {query}: {e}")
+            return None
+
+        coordinates = None
+        try:
+            area = payload["nearest_area"][0]
+            coordinates = (float(area["latitude"]), float(area["longitude"]))
+        except (KeyError, IndexError, TypeError, ValueError):
+            pass
+        return data, coordinates
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_event_loop().create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.WEATHER_REFRESH_INTERVAL_SECONDS)
+            try:
+                await self.refresh_active()
+            except Exception as e:
+                logger.error(f"Weather refresh pass failed: {e}")
+
+    async def refresh_active(self) -> None:
+        """Re-fetch soon-to-expire entries for recently requested locations; evict the rest."""
+        now = time.monotonic()
+        # Refresh anything that would expire before the next pass
+        refresh_after = settings.WEATHER_CACHE_TTL_SECONDS - settings.WEATHER_REFRESH_INTERVAL_SECONDS * 1.5
+        due = []
+        for key, entry in list(self._entries.items()):
+            if now - entry.requested_at > settings.WEATHER_ACTIVE_WINDOW_SECONDS:
+                if entry.age >= settings.WEATHER_STALE_SECONDS:
+                    del self._entries[key]
+                    self.counts["evicted"] += 1
+                continue
+            if entry.age >= refresh_after:
+                due.append(entry)
+
+        if len(self._cells) > settings.WEATHER_CACHE_MAX_LOCATIONS:
+            self._cells.clear()  # Relearned on the next miss for each name
+
+        semaphore = asyncio.Semaphore(settings.WEATHER_REFRESH_CONCURRENCY)
+
+        async def refresh(entry: _WeatherEntry) -> None:
+            async with semaphore:
+                if await self._fetch_coalesced(normalize_location(entry.query), entry.query) is not None:
+                    self.counts["refreshes"] += 1
+
+        if due:
+            await asyncio.gather(*(refresh(entry) for entry in due))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "known_cells": len(self._cells),
+            "refresher_running": self._refresher is not None and not self._refresher.done(),
+            **self.counts,
+        }
+
+
+# Global instance
+weather_cache = WeatherCache()
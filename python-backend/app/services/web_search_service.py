@@ -10,6 +10,8 @@ import json
 import re
 from urllib.parse import quote_plus
 
+from app.services.event_dedup import event_deduplicator
+
 logger = logging.getLogger(__name__)
 
 
@@ -276,18 +278,8 @@ class WebSearchService:
         return 'general'
     
     def _deduplicate_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate events based on title similarity."""
-        unique_events = []
-        seen_titles = set()
-        
-        for event in events:
-            title = event.get('title', '').lower()
-            # Simple deduplication - could be improved with fuzzy matching
-            if title not in seen_titles:
-                seen_titles.add(title)
-                unique_events.append(event)
-        
-        return unique_events
+        """Merge duplicate and near-duplicate events (same day, similar title)."""
+        return event_deduplicator.collapse(events)
 
 
 # Global instance
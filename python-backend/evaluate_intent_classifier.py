@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Evaluate the local intent classifier against the keyword routing rules.
+
+Reads a labeled JSONL chat log ({"message": ..., "query_type": ...} per line)
+and reports accuracy for keyword routing, the model alone, and the routing
+actually used in production (model above INTENT_MIN_CONFIDENCE, keywords
+below). It also shows how routing cost shifts: which provider each message
+would go to, how many Google Search grounding calls that triggers, and the
+estimated cost per 1,000 messages.
+
+    python evaluate_intent_classifier.py --data chat_log_holdout.jsonl
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.services.intent_classifier import QUERY_TYPES, LinearIntentModel, classify_by_keywords, query_classifier
+from train_intent_classifier import load_examples
+
+# Mirrors HybridAIService._choose_model with both providers enabled
+GPT_QUERY_TYPES = {"profile_matching", "creative_writing", "complex_reasoning"}
+
+
+def provider_for(query_type):
+    return "gpt" if query_type in GPT_QUERY_TYPES else "gemini"
+
+
+def routing_cost(labels, args):
+    """Provider mix, grounding calls and estimated cost for a list of routed labels."""
+    providers = Counter(provider_for(label) for label in labels)
+    grounding = sum(1 for label in labels if label == "realtime_events")
+    cost = providers["gpt"] * args.gpt_cost + providers["gemini"] * args.gemini_cost + grounding * args.grounding_cost
+    return providers, grounding, cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Labeled JSONL chat log (use data not seen in training)")
+    parser.add_argument("--model", default=str(query_classifier.model_path()), help="Trained .npz model")
+    parser.add_argument("--min-confidence", type=float, default=settings.INTENT_MIN_CONFIDENCE)
+    parser.add_argument("--gpt-cost", type=float, default=0.0009, help="Estimated $ per GPT chat call")
+    parser.add_argument("--gemini-cost", type=float, default=0.0002, help="Estimated $ per Gemini chat call")
+    parser.add_argument("--grounding-cost", type=float, default=0.035, help="Estimated $ per grounded search call")
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    if not examples:
+        print("❌ No labeled examples")
+        return
+    model = LinearIntentModel.load(args.model)
+
+    truth, keyword_labels, model_labels, routed_labels = [], [], [], []
+    below_threshold = 0
+    started = time.perf_counter()
+    for message, label in examples:
+        predicted, confidence = model.predict(message)
+        model_labels.append(predicted)
+        keyword_label = classify_by_keywords(message)
+        keyword_labels.append(keyword_label)
+        if confidence >= args.min_confidence:
+            routed_labels.append(predicted)
+        else:
+            routed_labels.append(keyword_label)
+            below_threshold += 1
+        truth.append(label)
+    per_message_us = (time.perf_counter() - started) / len(examples) * 1e6
+
+    def accuracy(labels):
+        return sum(1 for predicted, label in zip(labels, truth) if predicted == label) / len(truth)
+
+    print(f"📊 {len(examples)} messages, min confidence {args.min_confidence}")
+    print(f"   Keyword rules:      {accuracy(keyword_labels):.1%}")
+    print(f"   Model alone:        {accuracy(model_labels):.1%}")
+    print(f"   Routed (model+kw):  {accuracy(routed_labels):.1%}  ({below_threshold} fell back to keywords)")
+    print(f"   Classify time:      {per_message_us:.0f} µs/message (model + keywords)")
+
+    print("\n🔎 Per query type (routed): precision / recall")
+    for query_type in QUERY_TYPES:
+        predicted = sum(1 for label in routed_labels if label == query_type)
+        actual = sum(1 for label in truth if label == query_type)
+        hits = sum(1 for p, t in zip(routed_labels, truth) if p == t == query_type)
+        precision = hits / predicted if predicted else 0.0
+        recall = hits / actual if actual else 0.0
+        print(f"   {query_type:<18} {precision:6.1%} / {recall:6.1%}  (n={actual})")
+
+    print(f"\n💸 Routing cost per 1,000 messages")
+    scale = 1000 / len(examples)
+    for name, labels in (("Keyword rules", keyword_labels), ("Routed", routed_labels), ("Perfect labels", truth)):
+        providers, grounding, cost = routing_cost(labels, args)
+        misgrounded = sum(1 for p, t in zip(labels, truth) if p == "realtime_events" and t != "realtime_events")
+        print(
+            f"   {name:<15} gemini {providers['gemini'] * scale:6.0f}  gpt {providers['gpt'] * scale:6.0f}  "
+            f"grounding {grounding * scale:6.0f} (unneeded {misgrounded * scale:5.0f})  ${cost * scale:7.2f}"
+        )
+
+    _, _, keyword_cost = routing_cost(keyword_labels, args)
+    _, _, routed_cost = routing_cost(routed_labels, args)
+    print(f"\n   Shift vs keyword rules: ${(routed_cost - keyword_cost) * scale:+.2f} per 1,000 messages")
+
+
+if __name__ == "__main__":
+    main()
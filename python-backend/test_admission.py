@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Test script to verify provider admission control: bounded per-priority
+queues, fail-fast rejection and slot accounting on release.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.admission import AdmissionRejected, Priority, ProviderAdmission
+
+settings.ADMISSION_QUEUE_AUTHENTICATED = 2
+settings.ADMISSION_QUEUE_PUBLIC = 1
+settings.ADMISSION_QUEUE_BACKGROUND = 0
+settings.ADMISSION_MAX_WAIT_SECONDS = 0.2
+
+async def settle():
+    """Let woken waiters run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def rejection_reason(admission, priority):
+    try:
+        await admission.acquire(priority)
+    except AdmissionRejected as e:
+        return e.reason
+    admission.release()
+    return None
+
+async def queue_full_fails_fast():
+    admission = ProviderAdmission("test", limit=1)
+    await admission.acquire(Priority.AUTHENTICATED)
+    waiter = asyncio.ensure_future(admission.acquire(Priority.PUBLIC))
+    await settle()
+
+    # The public queue holds one waiter; the next public call is shed at once
+    started = asyncio.get_event_loop().time()
+    reason = await rejection_reason(admission, Priority.PUBLIC)
+    fast = asyncio.get_event_loop().time() - started < 0.05
+    # Background work has no queue at all
+    background = await rejection_reason(admission, Priority.BACKGROUND)
+
+    admission.release()
+    await waiter
+    admission.release()
+    return reason == "queue full" and background == "queue full" and fast and admission.rejected["public"] == 1
+
+async def queues_are_per_priority():
+    admission = ProviderAdmission("test", limit=1)
+    await admission.acquire(Priority.AUTHENTICATED)
+    public = asyncio.ensure_future(admission.acquire(Priority.PUBLIC))
+    await settle()
+
+    # A full public queue does not stop logged-in users from queueing
+    authenticated = asyncio.ensure_future(admission.acquire(Priority.AUTHENTICATED))
+    await settle()
+    queued = admission.snapshot()["queued"]
+
+    admission.release()
+    await settle()
+    order = [authenticated.done(), public.done()]
+    admission.release()
+    await asyncio.gather(public, authenticated)
+    admission.release()
+    return queued == {"authenticated": 1, "public": 1, "background": 0} and order == [True, False]
+
+async def wait_timeout_rejects():
+    admission = ProviderAdmission("test", limit=1)
+    await admission.acquire(Priority.AUTHENTICATED)
+    reason = await rejection_reason(admission, Priority.AUTHENTICATED)
+    admission.release()
+    return reason == "wait timed out" and admission.snapshot()["queued"]["authenticated"] == 0
+
+async def release_returns_every_slot():
+    admission = ProviderAdmission("test", limit=2)
+    await admission.acquire(Priority.AUTHENTICATED)
+    await admission.acquire(Priority.PUBLIC)
+    waiters = [asyncio.ensure_future(admission.acquire(Priority.AUTHENTICATED)) for _ in range(2)]
+    await settle()
+
+    # A waiter that is cancelled must not take a slot with it
+    waiters[0].cancel()
+    await settle()
+    admission.release()
+    await settle()
+    handed_over = admission.active == 2 and waiters[1].done()
+
+    admission.release()
+    admission.release()
+    return handed_over and admission.active == 0 and admission.snapshot()["queued"]["authenticated"] == 0
+
+def test_admission():
+    """Test ProviderAdmission queueing, shedding and release accounting"""
+
+    test_cases = [
+        ("full queue is rejected without waiting", queue_full_fails_fast),
+        ("queues are bounded per priority class", queues_are_per_priority),
+        ("waiters give up after the max wait", wait_timeout_rejects),
+        ("release returns every slot", release_returns_every_slot),
+    ]
+
+    print("Testing admission control...")
+    print("=" * 50)
+
+    all_passed = True
+
+    for description, case in test_cases:
+        passed = asyncio.run(case())
+        all_passed = all_passed and passed
+
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status} | {description}")
+
+    print("=" * 50)
+    if all_passed:
+        print("🎉 All tests passed!")
+    else:
+        print("❌ Some tests failed!")
+
+    assert all_passed
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_admission()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Test script to verify near-duplicate events are merged and distinct ones are not.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.event_dedup import EventDeduplicator
+
+def event(title, **fields):
+    return {'title': title, 'date': '2025-10-19', 'source': fields.pop('source', 'eventbrite'), **fields}
+
+def test_event_dedup():
+    """Test EventDeduplicator.collapse on pairs that must and must not merge"""
+
+    # (first event, second event, expected number of events after collapsing)
+    test_cases = [
+        (event("Comedy Night at The Loft"), event("Comedy Night at The Grove"), 2),
+        (event("Salsa Dance Night"), event("Salsa Dance Class"), 2),
+        (event("Yoga in the Park"), event("Yoga in the Park for Kids"), 2),
+        (event("Lakers vs Celtics"), event("Lakers vs Clippers"), 2),
+        (event("Jazz Jam", venue="Blue Note", time="19:00"), event("Jazz Jam", venue="Blue Note", time="21:00"), 2),
+        (event("Jazz Jam", venue="Blue Note"), event("Jazz Jam", venue="Jazz Standard"), 2),
+        (event("Taylor Swift | The Eras Tour - Vivint Arena", venue="Vivint Arena", time="7:00 PM"),
+         event("Taylor Swift: The Eras Tour", venue="Vivint Arena", time="19:00", source='ticketmaster'), 1),
+        (event("Lakers vs Celtics", location="Los Angeles"), event("Lakers v. Celtics", venue="Crypto.com Arena"), 1),
+    ]
+
+    print("Testing event deduplication...")
+    print("=" * 50)
+
+    all_passed = True
+
+    for first, second, expected in test_cases:
+        result = len(EventDeduplicator().collapse([first, second]))
+        passed = result == expected
+        all_passed = all_passed and passed
+
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status} | {first['title']!r} / {second['title']!r} -> {result} event(s)")
+        if not passed:
+            print(f"      Expected: {expected}")
+
+    print("=" * 50)
+    if all_passed:
+        print("🎉 All tests passed!")
+    else:
+        print("❌ Some tests failed!")
+
+    assert all_passed
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_event_dedup()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Test script to verify token-bucket rate limiting: bucket refill, per-user
+vs per-IP keys and X-Forwarded-For handling behind trusted proxies.
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import jwt
+
+from app.core.config import settings
+from app.core.rate_limit import InMemoryBucketStore, RateLimitMiddleware, parse_limit
+
+settings.RATE_LIMIT_ENABLED = True
+settings.RATE_LIMIT_ROUTES = {"/api/ai/": "llm", "/api/": "default"}
+settings.RATE_LIMITS = {"llm": "2/second", "default": "100/minute"}
+settings.RATE_LIMIT_TRUSTED_PROXIES = ["10.0.0.0/8"]
+
+def token_for(user_id):
+    return jwt.encode({"sub": user_id, "exp": int(time.time()) + 3600}, "test-secret", algorithm="HS256")
+
+def scope(path="/api/ai/chat", peer="203.0.113.7", token=None, forwarded=None):
+    headers = []
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return {"type": "http", "method": "POST", "path": path, "client": (peer, 50000), "headers": headers}
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def call(middleware, request_scope):
+    """Status code and headers the middleware sends for one request."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(request_scope, receive, send)
+    start = sent[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}
+
+async def bucket_refills():
+    store = InMemoryBucketStore()
+    first = await store.take("k", capacity=2, rate=20.0)
+    second = await store.take("k", capacity=2, rate=20.0)
+    denied, _, retry_after = await store.take("k", capacity=2, rate=20.0)
+    await asyncio.sleep(retry_after + 0.02)
+    refilled, _, _ = await store.take("k", capacity=2, rate=20.0)
+    return first[0] and second[0] and not denied and 0 < retry_after <= 0.05 and refilled
+
+async def limit_parses():
+    return parse_limit("20/minute") == (20, 20 / 60) and parse_limit("5/seconds") == (5, 5.0)
+
+async def users_keyed_by_token():
+    middleware = RateLimitMiddleware(ok_app, store=InMemoryBucketStore())
+    # The same user from two addresses shares one bucket
+    same_user = {
+        middleware._identity(scope(token=token_for("user-1"), peer="198.51.100.1")),
+        middleware._identity(scope(token=token_for("user-1"), peer="198.51.100.2")),
+    }
+    other_user = middleware._identity(scope(token=token_for("user-2")))
+    return same_user == {"user:user-1"} and other_user == "user:user-2"
+
+async def anonymous_keyed_by_ip():
+    middleware = RateLimitMiddleware(ok_app, store=InMemoryBucketStore())
+    anonymous = middleware._identity(scope(peer="198.51.100.1"))
+    invalid_token = middleware._identity(scope(peer="198.51.100.1", token="not-a-jwt"))
+    return anonymous == invalid_token == "ip:198.51.100.1"
+
+async def untrusted_forwarded_for_ignored():
+    middleware = RateLimitMiddleware(ok_app, store=InMemoryBucketStore())
+    spoofed = middleware._identity(scope(peer="198.51.100.1", forwarded="1.2.3.4"))
+    return spoofed == "ip:198.51.100.1"
+
+async def trusted_proxy_hops_skipped():
+    middleware = RateLimitMiddleware(ok_app, store=InMemoryBucketStore())
+    # Entries left of the nearest untrusted hop are client supplied
+    client = middleware._identity(scope(peer="10.0.0.5", forwarded="1.2.3.4, 203.0.113.9, 10.1.2.3"))
+    all_trusted = middleware._identity(scope(peer="10.0.0.5", forwarded="10.9.9.9, 10.1.2.3"))
+    no_header = middleware._identity(scope(peer="10.0.0.5"))
+    return client == "ip:203.0.113.9" and all_trusted == "ip:10.9.9.9" and no_header == "ip:10.0.0.5"
+
+async def buckets_are_separate():
+    middleware = RateLimitMiddleware(ok_app, store=InMemoryBucketStore())
+    statuses = [(await call(middleware, scope(peer="198.51.100.1")))[0] for _ in range(3)]
+    limited_status, limited_headers = await call(middleware, scope(peer="198.51.100.1"))
+    other_ip, _ = await call(middleware, scope(peer="198.51.100.2"))
+    other_bucket, _ = await call(middleware, scope(path="/api/strings", peer="198.51.100.1"))
+    return (
+        statuses == [200, 200, 429]
+        and limited_status == 429
+        and limited_headers.get("retry-after") == "1"
+        and other_ip == 200
+        and other_bucket == 200
+    )
+
+def test_rate_limit():
+    """Test the token-bucket store and RateLimitMiddleware keying"""
+
+    test_cases = [
+        ("bucket refills at its rate", bucket_refills),
+        ("limits parse as count/period", limit_parses),
+        ("authenticated requests are keyed by user", users_keyed_by_token),
+        ("anonymous and invalid-token requests are keyed by IP", anonymous_keyed_by_ip),
+        ("X-Forwarded-For from an untrusted peer is ignored", untrusted_forwarded_for_ignored),
+        ("trusted proxy hops are skipped right to left", trusted_proxy_hops_skipped),
+        ("each IP and route bucket is limited separately", buckets_are_separate),
+    ]
+
+    print("Testing rate limiting...")
+    print("=" * 50)
+
+    all_passed = True
+
+    for description, case in test_cases:
+        passed = asyncio.run(case())
+        all_passed = all_passed and passed
+
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status} | {description}")
+
+    print("=" * 50)
+    if all_passed:
+        print("🎉 All tests passed!")
+    else:
+        print("❌ Some tests failed!")
+
+    assert all_passed
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_rate_limit()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Train the local intent classifier used for hybrid model routing.
+
+Input is a labeled chat log in JSONL, one {"message": ..., "query_type": ...}
+object per line, where query_type is a QueryType value (realtime_events,
+general_chat, profile_matching, creative_writing, complex_reasoning,
+simple_question). The model is written to INTENT_MODEL_PATH by default.
+
+    python train_intent_classifier.py --data chat_log_labeled.jsonl
+
+The bundled model was trained on the hand-labeled seed set and checked
+against its holdout (retrain once real labeled chat logs are available):
+
+    python train_intent_classifier.py --data app/data/intent_seed.jsonl --holdout 0
+    python evaluate_intent_classifier.py --data app/data/intent_holdout.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.intent_classifier import DEFAULT_FEATURE_DIM, QUERY_TYPES, LinearIntentModel, query_classifier
+
+
+def load_examples(path):
+    """(message, query type) pairs from a labeled JSONL chat log."""
+    examples = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            label = record.get("query_type") or record.get("label")
+            if label not in QUERY_TYPES:
+                print(f"⚠️  Line {line_number}: unknown query type {label!r}, skipped")
+                continue
+            examples.append((record["message"], label))
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Labeled JSONL chat log")
+    parser.add_argument("--out", default=str(query_classifier.model_path()), help="Where to write the .npz model")
+    parser.add_argument("--dim", type=int, default=DEFAULT_FEATURE_DIM, help="Hashed feature space size")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of examples kept back for a quick accuracy check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, holdout = examples[:split], examples[split:]
+    print(f"📚 {len(train)} training / {len(holdout)} holdout examples")
+
+    model = LinearIntentModel.train(
+        train, dim=args.dim, epochs=args.epochs, learning_rate=args.learning_rate, seed=args.seed
+    )
+
+    if holdout:
+        correct = sum(1 for message, label in holdout if model.predict(message)[0] == label)
+        print(f"🎯 Holdout accuracy: {correct / len(holdout):.1%}")
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.out)
+    print(f"✅ Model written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()